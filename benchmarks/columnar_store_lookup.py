@@ -0,0 +1,125 @@
+import argparse
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+
+# Memory and lookup throughput of a MedDRA station held as an rdflib Graph
+# (queried with the granted SPARQL, as extractSideEFF does) vs the
+# dictionary-encoded scripts/columnar_store.py. Each backend loads the
+# station from a warm graph cache in a fresh process, so the RSS growth of
+# the load belongs to the station. Lookups are random drug sets (side effect
+# labels) and random UMLS codes (drugs with that side effect); the rows both
+# backends return are compared.
+#
+#   python benchmarks/columnar_store_lookup.py --lookups 200
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS_DIR = os.path.join(ROOT_DIR, "scripts")
+STATION = os.path.join(ROOT_DIR, "src", "main", "resources", "workflow", "RDF", "meddra_all_label_se.ttl")
+LABELS_QUERY = os.path.join(ROOT_DIR, "src", "main", "resources", "ODRL", "data", "extract_meddra_labels_suspect.txt")
+
+CHILD = """
+import hashlib, json, re, resource, sys, time
+sys.path.insert(0, sys.argv[1])
+backend, station, query_file, workload_file = sys.argv[2:6]
+with open(workload_file, encoding="utf-8") as f:
+    workload = json.load(f)
+with open(query_file, encoding="utf-8") as f:
+    template = f.read()
+DRUG = "http://identifiers.org/pubchem.compound/"
+UMLS = "http://linkedlifedata.com/resource/umls/id/"
+
+rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+if backend == "rdflib":
+    from rdflib import URIRef
+    from graph_cache import load_graph
+    from sparql_results import iter_rows
+    graph = load_graph(station)
+    has_side_effect = URIRef("http://example.org/hasSideEffect")
+else:
+    from columnar_store import ColumnarStore
+    store = ColumnarStore.load(station)
+load_s = time.perf_counter() - start
+rss_load = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before
+
+digest = hashlib.sha256()
+start = time.perf_counter()
+for drug_set in workload["drug_sets"]:
+    if backend == "rdflib":
+        values = " ".join(f'"{d}"' for d in drug_set)
+        query = re.sub(r"VALUES \\?drug_id \\{[^}]*\\}", lambda m: "VALUES ?drug_id {" + values + "}", template)
+        rows = list(iter_rows(graph.query(query), ("drug_id", "se", "umls")))
+    else:
+        rows = store.side_effect_labels(drug_set)
+    digest.update(repr(sorted(rows)).encode())
+drug_s = time.perf_counter() - start
+
+start = time.perf_counter()
+for code in workload["codes"]:
+    if backend == "rdflib":
+        found = [str(s)[len(DRUG):] for s in graph.subjects(has_side_effect, URIRef(UMLS + code))]
+    else:
+        found = store.drugs_with(code)
+    digest.update(repr(sorted(found)).encode())
+code_s = time.perf_counter() - start
+
+print(json.dumps({"load_s": load_s, "rss_load_kb": rss_load,
+                  "drug_sets_per_s": len(workload["drug_sets"]) / drug_s,
+                  "codes_per_s": len(workload["codes"]) / code_s, "rows_sha256": digest.hexdigest()}))
+"""
+
+BACKENDS = ("rdflib", "columnar")
+
+
+def make_workload(path, lookups, drugs_per_lookup, seed=11):
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    drugs = sorted(set(re.findall(r"drug:(CID\d+)", text)))
+    codes = sorted(set(re.findall(r"umls:(C\d+)", text)))
+    rng = random.Random(seed)
+    return {
+        "drug_sets": [rng.sample(drugs, min(drugs_per_lookup, len(drugs))) for _ in range(lookups)],
+        "codes": [rng.choice(codes) for _ in range(lookups)],
+    }
+
+
+def measure(backend, station, workload_file, cache_dir):
+    env = dict(os.environ, GRAPH_CACHE_DIR=cache_dir)
+    out = subprocess.run([sys.executable, "-c", CHILD, SCRIPTS_DIR, backend, station, LABELS_QUERY, workload_file],
+                         stdout=subprocess.PIPE, env=env, check=True).stdout
+    return json.loads(out)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="rdflib Graph vs dictionary-encoded store on a MedDRA station")
+    parser.add_argument("--station", default=STATION)
+    parser.add_argument("--lookups", type=int, default=200)
+    parser.add_argument("--drugs-per-lookup", type=int, default=16)
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workload_file = os.path.join(tmp, "workload.json")
+        with open(workload_file, "w", encoding="utf-8") as f:
+            json.dump(make_workload(args.station, args.lookups, args.drugs_per_lookup), f)
+        cache_dir = os.path.join(tmp, "cache")
+        measure("rdflib", args.station, workload_file, cache_dir)  # write the cache entry
+        results = {backend: measure(backend, args.station, workload_file, cache_dir) for backend in BACKENDS}
+
+    same = len({r["rows_sha256"] for r in results.values()}) == 1
+    if args.json:
+        print(json.dumps(dict(results, same_rows=same), indent=2))
+    else:
+        print(f"{os.path.basename(args.station)}: {args.lookups} lookups of {args.drugs_per_lookup} drugs "
+              f"and {args.lookups} of one UMLS code")
+        print(f"{'backend':<10}{'load s':>8}{'load RSS MB':>13}{'drug sets/s':>13}{'codes/s':>10}")
+        for backend, r in results.items():
+            print(f"{backend:<10}{r['load_s']:>8.2f}{r['rss_load_kb'] / 1024:>13.1f}"
+                  f"{r['drug_sets_per_s']:>13.0f}{r['codes_per_s']:>10.0f}")
+        print(f"same rows: {same}")
+    sys.exit(0 if same else 1)
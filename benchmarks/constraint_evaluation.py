@@ -0,0 +1,80 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+# Times a request carrying many constraint values against a policy with a
+# large prohibited-value list: is_access_allowed (re-reads and lower-cases the
+# rdf list on every call) vs the compiled predicates of the PolicyStore.
+#
+#   python benchmarks/constraint_evaluation.py --prohibited 20000 --request-values 500
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ODRL_DIR = os.path.join(ROOT_DIR, "src", "main", "resources", "ODRL")
+sys.path.insert(0, ODRL_DIR)
+
+from engine.policy_engine import is_access_allowed  # noqa: E402
+from engine.policy_store import PolicyStore  # noqa: E402
+
+POLICY = """@prefix odrl: <http://www.w3.org/ns/odrl/2/> .
+@prefix ex:   <http://example.org/> .
+
+<http://example.org/policy/large>
+    a odrl:Offer ;
+    odrl:permission [
+        odrl:assignee ex:researcher ;
+        odrl:action odrl:read ;
+        odrl:target <http://example.org/graph/large_prohibition> ,
+                    <http://example.org/sparql/large_prohibition>
+    ] ;
+    odrl:prohibition [
+        odrl:action odrl:read ;
+        odrl:constraint [
+            odrl:leftOperand ex:drugIDs ;
+            odrl:operator odrl:isAnyOf ;
+            odrl:rightOperand ({values})
+        ]
+    ] .
+"""
+
+ASSIGNEE = "http://example.org/researcher"
+ACTION = "http://www.w3.org/ns/odrl/2/read"
+TARGET = "http://example.org/graph/large_prohibition"
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compiled vs per-request constraint evaluation")
+    parser.add_argument("--prohibited", type=int, default=20000)
+    parser.add_argument("--request-values", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as policy_dir:
+        policy_path = os.path.join(policy_dir, "large_prohibition.ttl")
+        with open(policy_path, "w", encoding="utf-8") as f:
+            f.write(POLICY.format(values=" ".join(f'"CID{i:09d}"' for i in range(args.prohibited))))
+
+        # request values that are all allowed, so every value has to be checked
+        constraints = {"drugIDs": [f"cid{i:09d}" for i in range(args.prohibited, args.prohibited + args.request_values)]}
+
+        store = PolicyStore(policy_dir)
+        start = time.perf_counter()
+        store.refresh()
+        compile_ms = (time.perf_counter() - start) * 1000
+
+        legacy_ms, legacy = timed(lambda: is_access_allowed(policy_path, ASSIGNEE, ACTION, TARGET, constraints), args.repeat)
+        compiled_ms, compiled = timed(lambda: store.decide(ASSIGNEE, ACTION, TARGET, constraints), args.repeat * 100)
+
+    print(f"prohibited values: {args.prohibited}, request values: {args.request_values}")
+    print(f"is_access_allowed:  {legacy_ms:10.3f} ms/decision")
+    print(f"compiled store:     {compiled_ms:10.3f} ms/decision (one-off compile {compile_ms:.1f} ms)")
+    print(f"same decision:      {legacy == compiled}")
+    sys.exit(0 if legacy == compiled else 1)
@@ -0,0 +1,80 @@
+import argparse
+import glob
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+# Parse vs cached load of the RDF data stations (scripts/graph_cache.py). Each
+# measurement runs in a fresh process so its peak RSS belongs to one load.
+#
+#   python benchmarks/graph_cache_load.py
+#   python benchmarks/graph_cache_load.py src/main/resources/workflow/RDF/SideEff.ttl --json
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS_DIR = os.path.join(ROOT_DIR, "scripts")
+STATIONS = os.path.join(ROOT_DIR, "src", "main", "resources", "workflow", "RDF", "*.ttl")
+
+# Runs in the child: "parse" is what the scripts did before, "load" goes
+# through the cache (a miss parses and writes the entry)
+CHILD = """
+import json, resource, sys, time
+sys.path.insert(0, sys.argv[1])
+mode, path = sys.argv[2], sys.argv[3]
+from rdflib import Graph
+from graph_cache import load_graph
+rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+if mode == "parse":
+    g = Graph()
+    g.parse(path, format="turtle")
+else:
+    g = load_graph(path)
+elapsed = time.perf_counter() - start
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({"seconds": elapsed, "triples": len(g), "peak_rss_kb": rss, "rss_growth_kb": rss - rss_before}))
+"""
+
+
+def measure(mode, path, cache_dir):
+    env = dict(os.environ, GRAPH_CACHE_DIR=cache_dir)
+    out = subprocess.run([sys.executable, "-c", CHILD, SCRIPTS_DIR, mode, path],
+                         stdout=subprocess.PIPE, env=env, check=True).stdout
+    return json.loads(out)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Turtle parse vs parsed-graph cache load per station file")
+    parser.add_argument("files", nargs="*", help="station files (default: workflow/RDF/*.ttl)")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+
+    files = args.files or sorted(glob.glob(STATIONS))
+    results = []
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for path in files:
+            parse = measure("parse", path, cache_dir)
+            first = measure("load", path, cache_dir)  # miss: parse and write the entry
+            cached = measure("load", path, cache_dir)
+            results.append({
+                "file": os.path.basename(path),
+                "bytes": os.path.getsize(path),
+                "triples": parse["triples"],
+                "parse": parse,
+                "cache_miss": first,
+                "cache_hit": cached,
+                "same_triples": parse["triples"] == cached["triples"],
+            })
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'file':<26}{'KB':>8}{'triples':>9}{'parse s':>9}{'miss s':>9}{'load s':>9}{'speedup':>9}"
+              f"{'parse RSS MB':>14}{'load RSS MB':>13}")
+        for r in results:
+            print(f"{r['file']:<26}{r['bytes'] / 1024:>8.0f}{r['triples']:>9}{r['parse']['seconds']:>9.3f}"
+                  f"{r['cache_miss']['seconds']:>9.3f}{r['cache_hit']['seconds']:>9.3f}"
+                  f"{r['parse']['seconds'] / max(r['cache_hit']['seconds'], 1e-9):>8.1f}x"
+                  f"{r['parse']['peak_rss_kb'] / 1024:>14.1f}{r['cache_hit']['peak_rss_kb'] / 1024:>13.1f}")
+    sys.exit(0 if all(r["same_triples"] for r in results) else 1)
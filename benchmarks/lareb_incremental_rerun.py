@@ -0,0 +1,80 @@
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+# Incremental Lareb matching with the persisted match index: a first run
+# against an empty index, an unchanged rerun, a rerun after a share of the
+# Lareb records changed, were added or were removed, and a run for a changed
+# ADR case. Every run is checked against a full match_records run over the
+# same data, and the index counters show what was skipped.
+#
+#   python benchmarks/lareb_incremental_rerun.py --rows 100000 --churn 0.01
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS_DIR = os.path.join(ROOT_DIR, "scripts")
+sys.path.insert(0, SCRIPTS_DIR)
+
+import pandas as pd  # noqa: E402
+from lareb_linkage_scaling import COMPARE_COLUMNS, Synthesizer, synthesize  # noqa: E402
+from match_index import MatchIndex  # noqa: E402
+from record_linkage import match_records  # noqa: E402
+
+KEY_COLUMN = "WorldwideUniqueCaseIdentification"
+
+
+def churn(lareb, share, seed=1):
+    # a copy of lareb with share of the records changed, share removed and
+    # share new ones appended
+    rng = random.Random(seed)
+    synth = Synthesizer(seed)
+    count = int(len(lareb) * share)
+    changed = lareb.copy()
+    for position in rng.sample(range(len(changed)), count):
+        column = rng.choice(COMPARE_COLUMNS)
+        changed.iat[position, changed.columns.get_loc(column)] = synth.record()[column]
+    changed = changed.drop(changed.index[rng.sample(range(len(changed)), count)])
+    added = [dict(synth.record(), **{KEY_COLUMN: f"NL-LRB-N{i:07d}"}) for i in range(count)]
+    return pd.concat([changed, pd.DataFrame(added).reindex(columns=changed.columns)], ignore_index=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Incremental Lareb matching with a persisted match index")
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--adr-rows", type=int, default=20)
+    parser.add_argument("--churn", type=float, default=0.01, help="share of records changed, removed and added")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    adr, lareb, _ = synthesize(args.rows, args.adr_rows, 3)
+    churned = churn(lareb, args.churn)
+    other_case, _, _ = synthesize(1000, args.adr_rows, 0, seed=5)
+    runs = [("first run", adr, lareb), ("unchanged rerun", adr, lareb), ("churned rerun", adr, churned),
+            ("changed ADR case", other_case, churned)]
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        index = MatchIndex(tmp)
+        for name, left, right in runs:
+            start = time.perf_counter()
+            full = match_records(left, right, COMPARE_COLUMNS)
+            full_s = time.perf_counter() - start
+            start = time.perf_counter()
+            matches = index.match(left, right, COMPARE_COLUMNS, KEY_COLUMN)
+            incremental_s = time.perf_counter() - start
+            results.append(dict(index.runs[-1], run=name, full_s=full_s, incremental_s=incremental_s,
+                                matches=len(matches), identical=matches == full))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{args.rows} Lareb records, {args.adr_rows} ADR rows, churn {args.churn:.1%}")
+        print(f"{'run':<18}{'full s':>8}{'incr s':>8}{'skipped':>9}{'scored':>8}{'new':>7}{'changed':>9}"
+              f"{'removed':>9}{'matches':>9}{'identical':>11}")
+        for r in results:
+            print(f"{r['run']:<18}{r['full_s']:>8.2f}{r['incremental_s']:>8.2f}{r['skipped']:>9}{r['scored']:>8}"
+                  f"{r['new']:>7}{r['changed']:>9}{r['removed']:>9}{r['matches']:>9}{str(r['identical']):>11}")
+    sys.exit(0 if all(r["identical"] for r in results) else 1)
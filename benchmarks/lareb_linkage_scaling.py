@@ -0,0 +1,196 @@
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+import warnings
+
+# Lareb-to-ADR matching on synthetic Lareb sets: the nested iterrows() loop
+# of extractData_RDF.py against record_linkage.match_records, serial and on
+# the process pool. Lareb rows draw drug names from the ATC station and
+# preferred terms from a MedDRA-style vocabulary, and a share of them are
+# perturbed copies of ADR rows (typos, dropped or reordered terms), so every
+# size has real matches. The loop runs on the whole set up to --legacy-max
+# rows; beyond that it runs on a sample of the rows (with every planted copy)
+# and the two must agree on it. Loop times above --legacy-max are
+# extrapolated from the largest measured size.
+#
+#   python benchmarks/lareb_linkage_scaling.py --sizes 10000,100000,1000000
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS_DIR = os.path.join(ROOT_DIR, "scripts")
+RDF_DIR = os.path.join(ROOT_DIR, "src", "main", "resources", "workflow", "RDF")
+sys.path.insert(0, SCRIPTS_DIR)
+
+warnings.filterwarnings("ignore", module="fuzzywuzzy")
+import pandas as pd  # noqa: E402
+from fuzzywuzzy import fuzz  # noqa: E402
+from record_linkage import match_records  # noqa: E402
+
+COMPARE_COLUMNS = ["ATCText", "Other_suspect_ATCText", "Concomitant_ATCText", "Reaction_PT", "Other_Reported_PTs",
+                   "Medical_history_PT"]
+
+PREFERRED_TERMS = [
+    "Acute kidney injury", "Acute myeloid leukaemia", "Cystitis haemorrhagic", "JC virus infection", "Off label use",
+    "Renal failure", "Stress", "Thrombotic microangiopathy", "Drug ineffective", "Hangover", "Malaise",
+    "Progressive multifocal leukoencephalopathy", "Headache", "Nausea", "Vomiting", "Diarrhoea", "Fatigue",
+    "Dizziness", "Rash", "Pruritus", "Pyrexia", "Arthralgia", "Myalgia", "Back pain", "Abdominal pain",
+    "Dyspnoea", "Cough", "Insomnia", "Anxiety", "Depression", "Hypertension", "Hypotension", "Tachycardia",
+    "Bradycardia", "Lymphopenia", "Neutropenia", "Anaemia", "Thrombocytopenia", "Hepatic enzyme increased",
+    "Liver injury", "Urinary tract infection", "Nasopharyngitis", "Herpes zoster", "Pneumonia", "Sepsis",
+    "Macular oedema", "Visual impairment", "Paraesthesia", "Hypoaesthesia", "Tremor", "Seizure", "Syncope",
+    "Alopecia", "Injection site reaction", "Infusion related reaction", "Multiple sclerosis relapse",
+    "Basal cell carcinoma", "Weight increased", "Weight decreased", "Oedema peripheral", "Chest pain",
+]
+
+
+def atc_names():
+    with open(os.path.join(RDF_DIR, "atc_hierarchy.ttl"), encoding="utf-8") as f:
+        return sorted({label.upper() for label in re.findall(r'rdfs:label "([^"\\]+)"@en', f.read())})
+
+
+def typo(rng, text):
+    if len(text) < 4:
+        return text
+    i = rng.randrange(len(text))
+    return text[:i] + rng.choice("abcdefghilmnorstu") + text[i + 1:]
+
+
+class Synthesizer:
+
+    def __init__(self, seed=0):
+        self.rng = random.Random(seed)
+        self.drugs = atc_names()
+
+    def terms(self, low, high):
+        return "; ".join(self.rng.choice(PREFERRED_TERMS) for _ in range(self.rng.randint(low, high)))
+
+    def drug_list(self, share):
+        if self.rng.random() > share:
+            return "unknown"
+        return "; ".join(self.rng.choice(self.drugs) for _ in range(self.rng.randint(1, 2)))
+
+    def record(self):
+        return {
+            "ATCText": self.rng.choice(self.drugs),
+            "Other_suspect_ATCText": self.drug_list(0.2),
+            "Concomitant_ATCText": self.drug_list(0.4),
+            "Reaction_PT": self.terms(1, 2),
+            "Other_Reported_PTs": self.terms(1, 4) if self.rng.random() < 0.7 else "unknown",
+            "Medical_history_PT": self.terms(1, 3) if self.rng.random() < 0.6 else "nan",
+        }
+
+    def perturb(self, record):
+        copy = dict(record)
+        for column in self.rng.sample(COMPARE_COLUMNS, 2):
+            value = copy[column]
+            if value in ("unknown", "nan"):
+                continue
+            terms = value.split("; ")
+            choice = self.rng.random()
+            if choice < 0.4:
+                terms[0] = typo(self.rng, terms[0])
+            elif choice < 0.7 and len(terms) > 1:
+                terms.pop(self.rng.randrange(len(terms)))
+            else:
+                self.rng.shuffle(terms)
+            copy[column] = "; ".join(terms)
+        return copy
+
+
+def synthesize(size, adr_rows, copies_per_adr, seed=0):
+    # (ADR frame, Lareb frame, positions of the planted copies)
+    synth = Synthesizer(seed)
+    adr = [dict(synth.record(), ID=f"patient {i}") for i in range(adr_rows)]
+    lareb = [synth.record() for _ in range(size)]
+    planted = set()
+    for i, record in enumerate(adr):
+        for _ in range(copies_per_adr):
+            position = synth.rng.randrange(size)
+            lareb[position] = synth.perturb(record)
+            planted.add(position)
+    frame = pd.DataFrame(lareb)
+    frame.insert(0, "WorldwideUniqueCaseIdentification", [f"NL-LRB-{i:07d}" for i in range(size)])
+    return pd.DataFrame(adr), frame, planted
+
+
+def legacy_matches(df_json, final_excel_df):
+    # the nested loop of extractData_RDF.py, as (ADR position, Lareb position)
+    found = []
+    for i, (_, json_row) in enumerate(df_json.iterrows()):
+        for j, (_, excel_row) in enumerate(final_excel_df.iterrows()):
+            match_score = 0
+            valid_comparisons = 0
+            for col in COMPARE_COLUMNS:
+                json_val = str(json_row.get(col, "unknown"))
+                excel_val = str(excel_row.get(col, "unknown"))
+                if json_val.lower() == "unknown" or excel_val.lower() == "unknown":
+                    continue
+                if not json_val.strip() or not excel_val.strip():
+                    continue
+                valid_comparisons += 1
+                if fuzz.token_set_ratio(json_val, excel_val) >= 70:
+                    match_score += 1
+            if valid_comparisons >= 2 and match_score / valid_comparisons >= 0.8:
+                found.append((i, j))
+    return found
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Nested-loop vs blocked Lareb-to-ADR record linkage")
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="comma-separated Lareb row counts")
+    parser.add_argument("--adr-rows", type=int, default=20)
+    parser.add_argument("--copies", type=int, default=3, help="perturbed Lareb copies planted per ADR row")
+    parser.add_argument("--legacy-max", type=int, default=10000, help="largest set the loop runs on in full")
+    parser.add_argument("--sample", type=int, default=2000, help="rows the loop checks on larger sets")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    results = []
+    legacy_rate = None
+    for size in (int(n) for n in args.sizes.split(",")):
+        adr, lareb, planted = synthesize(size, args.adr_rows, args.copies)
+        serial_s, matches = timed(match_records, adr, lareb, COMPARE_COLUMNS, workers=1)
+        pool_s, pooled = timed(match_records, adr, lareb, COMPARE_COLUMNS, workers=args.workers)
+
+        if size <= args.legacy_max:
+            legacy_s, expected = timed(legacy_matches, adr, lareb)
+            legacy_rate = legacy_s / size
+            identical = expected == matches
+            checked = size
+        else:
+            rng = random.Random(size)
+            sample = sorted(planted | set(rng.sample(range(size), min(size, args.sample))))
+            positions = {position: k for k, position in enumerate(sample)}
+            expected = legacy_matches(adr, lareb.iloc[sample])
+            restricted = [(i, positions[j]) for i, j in matches if j in positions]
+            identical = expected == restricted
+            legacy_s = legacy_rate * size if legacy_rate is not None else None
+            checked = len(sample)
+        results.append({"rows": size, "matches": len(matches), "legacy_s": legacy_s,
+                        "legacy_estimated": size > args.legacy_max, "serial_s": serial_s, "pool_s": pool_s,
+                        "workers": args.workers, "rows_checked": checked,
+                        "identical": identical and pooled == matches})
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{args.adr_rows} ADR rows, {args.copies} planted copies each, pool of {args.workers}")
+        print(f"{'rows':>9}{'matches':>9}{'loop s':>12}{'serial s':>10}{'pool s':>9}{'speedup':>9}{'checked':>9}"
+              f"{'identical':>11}")
+        for r in results:
+            loop = "" if r["legacy_s"] is None else f"{r['legacy_s']:.1f}" + ("~" if r["legacy_estimated"] else "")
+            speedup = "" if r["legacy_s"] is None else f"{r['legacy_s'] / min(r['serial_s'], r['pool_s']):.0f}x"
+            print(f"{r['rows']:>9}{r['matches']:>9}{loop:>12}{r['serial_s']:>10.2f}{r['pool_s']:>9.2f}{speedup:>9}"
+                  f"{r['rows_checked']:>9}{str(r['identical']):>11}")
+        print("~ extrapolated from the largest fully measured size")
+    sys.exit(0 if all(r["identical"] for r in results) else 1)
@@ -0,0 +1,149 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Writing extractData_RDF.py's output: the rdflib Graph built over
+# output_df.iterrows() and serialized once, against rdf_writer.write_frame
+# streaming Turtle and N-Triples in chunks. Frames are Lareb-shaped, with NaN
+# and "unknown" cells (any case, padded) and values that need escaping:
+# quotes, backslashes, line breaks, tabs, non-ASCII text and numbers. Times
+# are untraced; peak memory is the tracemalloc peak of a second, traced run,
+# beyond the frame itself. Every written file is parsed back with rdflib and
+# must hold the graph the loop builds; the loop runs up to --legacy-max rows,
+# larger sizes are checked against the loop's triples collected without a
+# graph.
+#
+#   python benchmarks/lareb_output_writer.py --sizes 10000,100000,1000000
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS_DIR = os.path.join(ROOT_DIR, "scripts")
+sys.path.insert(0, SCRIPTS_DIR)
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+from rdflib import Graph, Literal, Namespace, URIRef  # noqa: E402
+from rdf_writer import write_frame  # noqa: E402
+
+BASE = "http://example.org/"
+COLUMNS = ["WorldwideUniqueCaseIdentification", "ATCText", "Other_suspect_ATCText", "Reaction_PT",
+           "Other_Reported_PTs", "Medical_history_PT", "Age", "Weight", "Sex", "Seriousness criteria",
+           "Narrative", "10 latest historical UMC report ID(s)"]
+VALUES = ["NATALIZUMAB", "FINGOLIMOD; OCRELIZUMAB", "Progressive multifocal leukoencephalopathy",
+          "Headache; Nausea", 'Patient said "worse than before"', "C:\\reports\\case.txt", "line one\nline two",
+          "tab\tseparated", "crlf\r\nend", "Ménière's disease", "腎不全", "  padded  ", "unknownish"]
+MISSING = [np.nan, None, "unknown", "Unknown", " UNKNOWN ", "unknown\n"]
+
+
+def synthesize(size, seed=0):
+    rng = np.random.default_rng(seed)
+    frame = {}
+    for column in COLUMNS:
+        values = np.array(VALUES, dtype=object)[rng.integers(0, len(VALUES), size)]
+        missing = rng.random(size) < 0.25
+        values[missing] = np.array(MISSING, dtype=object)[rng.integers(0, len(MISSING), int(missing.sum()))]
+        frame[column] = values
+    frame["WorldwideUniqueCaseIdentification"] = [f"NL-LRB-{i:07d}" for i in range(size)]
+    frame["Age"] = np.where(rng.random(size) < 0.2, np.nan, rng.integers(1, 99, size).astype(float))
+    frame["Weight"] = rng.integers(40, 140, size)
+    return pd.DataFrame(frame)
+
+
+def legacy_graph(output_df):
+    # the loop extractData_RDF.py ran
+    output_graph = Graph()
+    base = Namespace(BASE)
+    output_graph.bind("ex", base)
+    for idx, row in output_df.iterrows():
+        subj = URIRef(f"{base}row/{idx + 1}")
+        for col in output_df.columns:
+            val = row[col]
+            if pd.isna(val) or str(val).strip().lower() == "unknown":
+                continue
+            pred = URIRef(f"{base}{col.strip().replace(' ', '_')}")
+            output_graph.add((subj, pred, Literal(str(val))))
+    return output_graph
+
+
+def expected_triples(output_df):
+    # the loop's triples, without the graph
+    found = set()
+    for position, col in enumerate(output_df.columns):
+        pred = URIRef(f"{BASE}{col.strip().replace(' ', '_')}")
+        for idx, val in zip(output_df.index, output_df.iloc[:, position].tolist()):
+            if pd.isna(val) or str(val).strip().lower() == "unknown":
+                continue
+            found.add((URIRef(f"{BASE}row/{idx + 1}"), pred, Literal(str(val))))
+    return found
+
+
+def measured(fn, *args, **kwargs):
+    # (seconds, peak bytes allocated, result)
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    fn(*args, **kwargs)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak, result
+
+
+def parsed(path, format):
+    graph = Graph()
+    graph.parse(path, format=format)
+    return set(graph)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="rdflib graph loop vs streaming writer for extractDataFromL.ttl")
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="comma-separated row counts")
+    parser.add_argument("--legacy-max", type=int, default=10000, help="largest frame the graph loop runs on")
+    parser.add_argument("--check-max", type=int, default=100000, help="largest output parsed back with rdflib")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in (int(n) for n in args.sizes.split(",")):
+            frame = synthesize(size)
+            result = {"rows": size, "legacy_s": None, "legacy_peak_mb": None}
+            expected = None
+            if size <= args.legacy_max:
+                legacy_path = os.path.join(tmp, "legacy.ttl")
+                seconds, peak, _ = measured(
+                    lambda: legacy_graph(frame).serialize(destination=legacy_path, format="turtle"))
+                result.update(legacy_s=seconds, legacy_peak_mb=peak / 2 ** 20)
+                if size <= args.check_max:
+                    expected = parsed(legacy_path, "turtle")
+            elif size <= args.check_max:
+                expected = expected_triples(frame)
+
+            identical = True
+            for format in ("turtle", "nt"):
+                path = os.path.join(tmp, f"stream.{format}")
+                seconds, peak, written = measured(write_frame, frame, path, f"{BASE}row/", BASE, format=format)
+                result.update({f"{format}_s": seconds, f"{format}_peak_mb": peak / 2 ** 20, "triples": written,
+                               f"{format}_mb": os.path.getsize(path) / 2 ** 20})
+                if expected is not None:
+                    identical = identical and parsed(path, format) == expected
+            result.update(checked=expected is not None, identical=identical)
+            results.append(result)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{len(COLUMNS)} columns; peak MB allocated while writing")
+        print(f"{'rows':>9}{'triples':>10}{'loop s':>9}{'loop MB':>9}{'ttl s':>8}{'ttl MB':>8}{'nt s':>8}{'nt MB':>8}"
+              f"{'speedup':>9}{'identical':>11}")
+        for r in results:
+            loop_s = "" if r["legacy_s"] is None else f"{r['legacy_s']:.2f}"
+            loop_mb = "" if r["legacy_peak_mb"] is None else f"{r['legacy_peak_mb']:.0f}"
+            speedup = "" if r["legacy_s"] is None else f"{r['legacy_s'] / r['turtle_s']:.0f}x"
+            identical = str(r["identical"]) if r["checked"] else "-"
+            print(f"{r['rows']:>9}{r['triples']:>10}{loop_s:>9}{loop_mb:>9}{r['turtle_s']:>8.2f}"
+                  f"{r['turtle_peak_mb']:>8.1f}{r['nt_s']:>8.2f}{r['nt_peak_mb']:>8.1f}{speedup:>9}{identical:>11}")
+    sys.exit(0 if all(r["identical"] for r in results) else 1)
@@ -0,0 +1,126 @@
+import argparse
+import http.client
+import os
+import socket
+import subprocess
+import sys
+import time
+
+# Compares ODRL decision latency of the spawn-per-request path
+# (python ODRL/main.py, what ODRLService used to do for every call) against the
+# resident decision server (ODRL/server.py).
+#
+#   python benchmarks/odrl_decision_latency.py --requests 50
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ODRL_DIR = os.path.join(ROOT_DIR, "src", "main", "resources", "ODRL")
+
+TARGETS = [
+    "extract_drug_names_suspect",
+    "extract_meddra_labels_suspect",
+    "extract_meddra_freq_suspect",
+    "extract_meddra_indication_suspect",
+    "extract_atc_data",
+    "extract_vigi_data",
+]
+
+REQUEST_TEMPLATE = """
+@prefix odrl:   <http://www.w3.org/ns/odrl/2/> .
+@prefix ex:     <http://example.org/> .
+
+<http://example.org/request:se-query>
+    a odrl:Request ;
+    odrl:uid <https://www.wikidata.org/wiki/Q25670> ;
+    odrl:profile <https://www.wikidata.org/wiki/Q4382010> ;
+
+    odrl:permission [
+        odrl:target <http://example.org/graph/{target}> ;
+        odrl:assignee ex:researcher ;
+        odrl:action odrl:read
+    ] .
+"""
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(name, samples):
+    return {
+        "path": name,
+        "requests": len(samples),
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+        "mean_ms": sum(samples) / len(samples) * 1000,
+    }
+
+
+def bench_spawn(payloads):
+    main_py = os.path.join(ODRL_DIR, "main.py")
+    samples = []
+    for payload in payloads:
+        start = time.perf_counter()
+        subprocess.run([sys.executable, main_py], input=payload.encode("utf-8"),
+                       stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for_server(port, timeout=15.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/health")
+            if conn.getresponse().status == 200:
+                conn.close()
+                return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError("ODRL server did not start")
+
+
+def bench_server(payloads):
+    port = free_port()
+    server = subprocess.Popen([sys.executable, os.path.join(ODRL_DIR, "server.py"), "--port", str(port)],
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_for_server(port)
+        conn = http.client.HTTPConnection("127.0.0.1", port)
+        samples = []
+        for payload in payloads:
+            start = time.perf_counter()
+            conn.request("POST", "/decide", body=payload.encode("utf-8"),
+                         headers={"Content-Type": "text/turtle"})
+            response = conn.getresponse()
+            response.read()
+            samples.append(time.perf_counter() - start)
+        conn.close()
+        return samples
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ODRL decision latency: spawn vs resident server")
+    parser.add_argument("--requests", type=int, default=60, help="decisions per path")
+    args = parser.parse_args()
+
+    payloads = [REQUEST_TEMPLATE.format(target=TARGETS[i % len(TARGETS)]) for i in range(args.requests)]
+
+    results = [
+        summarize("spawn-per-request", bench_spawn(payloads)),
+        summarize("resident-server", bench_server(payloads)),
+    ]
+    print(f"{'path':<20}{'requests':>10}{'p50 ms':>10}{'p99 ms':>10}{'mean ms':>10}")
+    for r in results:
+        print(f"{r['path']:<20}{r['requests']:>10}{r['p50_ms']:>10.2f}{r['p99_ms']:>10.2f}{r['mean_ms']:>10.2f}")
@@ -0,0 +1,451 @@
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+# Benchmark suite for the ODRL engine over synthetic policy corpora. For every
+# corpus size it generates a policies/ and data/ directory, then measures in a
+# fresh worker process:
+#
+#   cold    engine import, then the first process_odrl_request (which
+#           compiles every policy file)
+#   warm    parse_request, PolicyStore.decide and process_odrl_request per
+#           request (latency percentiles and throughput)
+#   legacy  is_access_allowed filename scan on a sample of the requests
+#   memory  peak RSS of the worker before and after compiling the corpus
+#
+# Every request carries its expected decision, so a wrong allow/deny shows up
+# as a mismatch. Results are written as JSON; --compare reports the change
+# against an earlier run.
+#
+#   python benchmarks/odrl_engine_suite.py --sizes 10 100 1000 --output odrl-bench.json
+#   python benchmarks/odrl_engine_suite.py --sizes 10 100 1000 --compare odrl-bench.json
+#   python benchmarks/odrl_engine_suite.py --sizes 100000 --requests 2000 --legacy-sample 0
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ODRL_DIR = os.path.join(ROOT_DIR, "src", "main", "resources", "ODRL")
+
+ODRL_NS = "http://www.w3.org/ns/odrl/2/"
+EX_NS = "http://example.org/"
+QUERY_FILES = 10
+
+POLICY_TEMPLATE = """@prefix odrl: <http://www.w3.org/ns/odrl/2/> .
+@prefix ex:   <http://example.org/> .
+
+<http://example.org/policy/{name}>
+    a odrl:Offer ;
+    odrl:permission {permissions}{prohibition} .
+"""
+
+PERMISSION_TEMPLATE = """[
+        odrl:assignee ex:{assignee} ;
+        odrl:action odrl:read ;
+        odrl:target <http://example.org/graph/{target}> ,
+                    <http://example.org/sparql/query_{query}>{constraint}
+    ]"""
+
+PERMISSION_CONSTRAINT = """ ;
+        odrl:constraint [
+            odrl:leftOperand ex:drugIDs ;
+            odrl:operator odrl:isAnyOf ;
+            odrl:rightOperand ({values})
+        ]"""
+
+PROHIBITION_TEMPLATE = """ ;
+    odrl:prohibition [
+        odrl:action odrl:read ;
+        odrl:constraint [
+            odrl:leftOperand ex:drugIDs ;
+            odrl:operator odrl:eq ;
+            odrl:rightOperand ({values})
+        ]
+    ]"""
+
+REQUEST_TEMPLATE = """
+@prefix odrl:   <http://www.w3.org/ns/odrl/2/> .
+@prefix ex:     <http://example.org/> .
+
+<http://example.org/request:bench>
+    a odrl:Request ;
+    odrl:permission [
+        odrl:target <http://example.org/graph/{target}> ;
+        odrl:assignee ex:{assignee} ;
+        odrl:action odrl:read{constraint}
+    ] .
+"""
+
+REQUEST_CONSTRAINT = """ ;
+        odrl:constraint [
+            odrl:leftOperand ex:drugIDs ;
+            odrl:operator odrl:isAnyOf ;
+            odrl:rightOperand ({values})
+        ]"""
+
+
+def cid(i):
+    return f"CID{i:09d}"
+
+
+def literals(values):
+    return " ".join(f'"{v}"' for v in values)
+
+
+def write_corpus(directory, args, size, rng):
+    # Writes policies/ and data/ and returns the permissions that can be
+    # requested: (target, assignee, permission values or None, prohibited values)
+    policy_dir = os.path.join(directory, "policies")
+    query_dir = os.path.join(directory, "data")
+    os.makedirs(policy_dir)
+    os.makedirs(query_dir)
+
+    for k in range(QUERY_FILES):
+        with open(os.path.join(query_dir, f"query_{k}.txt"), "w", encoding="utf-8") as f:
+            f.write(f"SELECT ?s WHERE {{ ?s ?p \"query_{k}\" }}\n")
+
+    pool = max(1000, args.constraint_values * 10)
+    permissions = []
+    for i in range(size):
+        name = f"policy_{i:06d}"
+        prohibited = set()
+        prohibition = ""
+        if rng.random() < args.prohibition_rate:
+            prohibited = set(cid(v) for v in rng.sample(range(pool), args.constraint_values))
+            prohibition = PROHIBITION_TEMPLATE.format(values=literals(sorted(prohibited)))
+
+        blocks = []
+        for p in range(args.permissions):
+            # the engine only consults policy files named after the target, so
+            # the permissions of a policy share its target and differ by assignee
+            assignee = "researcher" if p == 0 else f"role_{p}"
+            allowed = None
+            constraint = ""
+            if rng.random() < args.constrained_rate:
+                allowed = set(cid(v) for v in rng.sample(range(pool), args.constraint_values))
+                constraint = PERMISSION_CONSTRAINT.format(values=literals(sorted(allowed)))
+            blocks.append(PERMISSION_TEMPLATE.format(assignee=assignee, target=name,
+                                                     query=rng.randrange(QUERY_FILES), constraint=constraint))
+            permissions.append((name, assignee, allowed, prohibited))
+
+        with open(os.path.join(policy_dir, name + ".ttl"), "w", encoding="utf-8") as f:
+            f.write(POLICY_TEMPLATE.format(name=name, permissions=" , ".join(blocks), prohibition=prohibition))
+
+    return policy_dir, query_dir, permissions, pool
+
+
+def make_request(permission, deny, pool, rng):
+    # One request for a permission with a known decision
+    target, assignee, allowed, prohibited = permission
+    values = None
+    if not deny:
+        if allowed is not None:
+            candidates = sorted(allowed - prohibited)
+            if not candidates:
+                return None
+            values = rng.sample(candidates, min(len(candidates), rng.randrange(1, 5)))
+        elif prohibited:
+            values = [cid(pool + rng.randrange(pool)) for _ in range(rng.randrange(1, 5))]
+    elif prohibited:
+        values = [rng.choice(sorted(prohibited))]
+    elif allowed is not None:
+        values = [cid(pool + rng.randrange(pool))]
+    else:
+        assignee = "nobody"
+
+    constraints = {"drugIDs": values} if values is not None else {}
+    turtle = REQUEST_TEMPLATE.format(
+        target=target,
+        assignee=assignee,
+        constraint=REQUEST_CONSTRAINT.format(values=literals(values)) if values is not None else ""
+    )
+    return {
+        "turtle": turtle,
+        "assignee": EX_NS + assignee,
+        "action": ODRL_NS + "read",
+        "target": f"http://example.org/graph/{target}",
+        "constraints": constraints,
+        "allowed": not deny,
+    }
+
+
+def make_requests(permissions, args, pool, rng):
+    requests = []
+    while len(requests) < args.requests:
+        request = make_request(rng.choice(permissions), rng.random() < args.deny_rate, pool, rng)
+        if request:
+            requests.append(request)
+    return requests
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def latency_stats(samples):
+    if not samples:
+        return None
+    total = sum(samples)
+    return {
+        "count": len(samples),
+        "p50_us": percentile(samples, 50) * 1e6,
+        "p90_us": percentile(samples, 90) * 1e6,
+        "p99_us": percentile(samples, 99) * 1e6,
+        "max_us": max(samples) * 1e6,
+        "mean_us": total / len(samples) * 1e6,
+        "throughput_per_s": len(samples) / total if total else None,
+    }
+
+
+def peak_rss_mb():
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def timed_calls(fn, items):
+    samples = []
+    results = []
+    for item in items:
+        start = time.perf_counter()
+        results.append(fn(item))
+        samples.append(time.perf_counter() - start)
+    return samples, results
+
+
+def legacy_decide(policy_dir, request):
+    # The filename scan process_odrl_request used before the PolicyStore
+    from engine.policy_engine import is_access_allowed
+    target_name = request["target"].split("/")[-1]
+    for filename in sorted(os.listdir(policy_dir)):
+        if not filename.endswith(".ttl") or not filename.startswith(target_name):
+            continue
+        result = is_access_allowed(os.path.join(policy_dir, filename), request["assignee"],
+                                   request["action"], request["target"], request["constraints"])
+        if result:
+            return result
+    return None
+
+
+def worker(corpus_dir, legacy_sample):
+    # Runs in a fresh process so cold-start time and peak memory belong to
+    # one corpus
+    start = time.perf_counter()
+    policy_dir = os.path.join(corpus_dir, "policies")
+    os.environ["ODRL_POLICY_DIR"] = policy_dir
+    os.environ["ODRL_QUERY_DIR"] = os.path.join(corpus_dir, "data")
+    os.environ["ODRL_POLICY_BUNDLE"] = os.path.join(corpus_dir, "no.bundle")
+    sys.path.insert(0, ODRL_DIR)
+
+    with open(os.path.join(corpus_dir, "requests.json"), encoding="utf-8") as f:
+        requests = json.load(f)
+
+    import odrl_executor
+    from engine.request_parser import parse_request
+    import_ms = (time.perf_counter() - start) * 1000
+    rss_before_mb = peak_rss_mb()
+
+    # the first request compiles every policy file
+    first_start = time.perf_counter()
+    first = odrl_executor.process_odrl_request(requests[0]["turtle"])
+    first_request_ms = (time.perf_counter() - first_start) * 1000
+    cold_ms = (time.perf_counter() - start) * 1000
+    rss_compiled_mb = peak_rss_mb()
+
+    # the engine's own store, so a large corpus is compiled only once
+    store = odrl_executor._policy_store
+
+    turtles = [r["turtle"] for r in requests]
+    parse_samples, _ = timed_calls(parse_request, turtles)
+    decide_samples, decisions = timed_calls(
+        lambda r: store.decide(r["assignee"], r["action"], r["target"], r["constraints"]), requests)
+    request_samples, queries = timed_calls(odrl_executor.process_odrl_request, turtles)
+
+    mismatches = sum(1 for r, d in zip(requests, decisions) if (d is not None) != r["allowed"])
+    mismatches += sum(1 for r, q in zip(requests, queries) if (q is not None) != r["allowed"])
+    mismatches += int((first is not None) != requests[0]["allowed"])
+
+    legacy_samples, legacy_decisions = timed_calls(lambda r: legacy_decide(policy_dir, r), requests[:legacy_sample])
+    # is_access_allowed ignores permission constraints, so it may allow what
+    # the store denies; reported, not counted as a mismatch
+    legacy_disagreements = sum(1 for d, l in zip(decisions, legacy_decisions) if d != l)
+
+    return {
+        "cold": {
+            "import_ms": import_ms,
+            "first_request_ms": first_request_ms,
+            "first_decision_ms": cold_ms,
+        },
+        "warm": {
+            "parse_request": latency_stats(parse_samples),
+            "policy_store_decide": latency_stats(decide_samples),
+            "process_odrl_request": latency_stats(request_samples),
+        },
+        "legacy": {
+            "is_access_allowed": latency_stats(legacy_samples),
+            "disagreements": legacy_disagreements,
+        },
+        "memory": {
+            "peak_rss_before_compile_mb": rss_before_mb,
+            "peak_rss_after_compile_mb": rss_compiled_mb,
+            "peak_rss_mb": peak_rss_mb(),
+        },
+        "decision_cache": odrl_executor.cache_stats(),
+        "mismatches": mismatches,
+        "allowed": sum(1 for r in requests if r["allowed"]),
+    }
+
+
+def run_size(size, args):
+    rng = random.Random(args.seed + size)
+    with tempfile.TemporaryDirectory() as corpus_dir:
+        start = time.perf_counter()
+        _, _, permissions, pool = write_corpus(corpus_dir, args, size, rng)
+        requests = make_requests(permissions, args, pool, rng)
+        with open(os.path.join(corpus_dir, "requests.json"), "w", encoding="utf-8") as f:
+            json.dump(requests, f)
+        generate_s = time.perf_counter() - start
+
+        env = dict(os.environ, ODRL_DECISION_CACHE_SIZE=str(args.decision_cache_size),
+                   ODRL_POLICY_REFRESH_INTERVAL=str(args.refresh_interval))
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--worker", corpus_dir,
+             "--legacy-sample", str(args.legacy_sample)],
+            stdout=subprocess.PIPE, env=env, check=True
+        ).stdout
+        result = json.loads(out)
+
+    result["policies"] = size
+    result["permissions"] = len(permissions)
+    result["requests"] = len(requests)
+    result["generate_s"] = generate_s
+    return result
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT_DIR, stdout=subprocess.PIPE,
+                              stderr=subprocess.DEVNULL, check=True).stdout.decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# (path in a result, True when higher is better) checked by --compare
+COMPARED_METRICS = [
+    (("cold", "first_decision_ms"), False),
+    (("cold", "first_request_ms"), False),
+    (("warm", "process_odrl_request", "p50_us"), False),
+    (("warm", "process_odrl_request", "p99_us"), False),
+    (("warm", "process_odrl_request", "throughput_per_s"), True),
+    (("warm", "policy_store_decide", "p99_us"), False),
+    (("warm", "parse_request", "p99_us"), False),
+    (("memory", "peak_rss_mb"), False),
+]
+
+
+def lookup(result, path):
+    for key in path:
+        if not isinstance(result, dict) or result.get(key) is None:
+            return None
+        result = result[key]
+    return result
+
+
+def compare(baseline, report, tolerance):
+    # Prints the relative change per metric; returns the regressions beyond
+    # the tolerance
+    previous = {r["policies"]: r for r in baseline["results"]}
+    regressions = []
+    for result in report["results"]:
+        old = previous.get(result["policies"])
+        if old is None:
+            continue
+        for path, higher_is_better in COMPARED_METRICS:
+            before, after = lookup(old, path), lookup(result, path)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            worse = -change if higher_is_better else change
+            flag = "REGRESSION" if worse > tolerance else ""
+            print(f"{result['policies']:>8} {'.'.join(path):<45}{before:>14.2f}{after:>14.2f}{change:>+9.1%} {flag}",
+                  file=sys.stderr)
+            if flag:
+                regressions.append((result["policies"], ".".join(path)))
+    return regressions
+
+
+def print_summary(report):
+    print(f"{'policies':>9}{'cold ms':>10}{'1st req ms':>12}{'parse p99':>11}{'decide p99':>12}"
+          f"{'request p50':>13}{'request p99':>13}{'req/s':>10}{'legacy p50':>12}{'rss MB':>9}{'mism.':>7}",
+          file=sys.stderr)
+    for r in report["results"]:
+        request = r["warm"]["process_odrl_request"]
+        legacy = r["legacy"]["is_access_allowed"]
+        print(f"{r['policies']:>9}{r['cold']['first_decision_ms']:>10.1f}{r['cold']['first_request_ms']:>12.1f}"
+              f"{r['warm']['parse_request']['p99_us']:>11.1f}{r['warm']['policy_store_decide']['p99_us']:>12.1f}"
+              f"{request['p50_us']:>13.1f}{request['p99_us']:>13.1f}{request['throughput_per_s']:>10.0f}"
+              f"{legacy['p50_us'] / 1000 if legacy else float('nan'):>12.2f}{r['memory']['peak_rss_mb']:>9.1f}"
+              f"{r['mismatches']:>7}", file=sys.stderr)
+    print("latencies in us, legacy in ms", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ODRL engine benchmark suite over synthetic policy corpora")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000],
+                        help="number of policy files per corpus (up to 100000)")
+    parser.add_argument("--permissions", type=int, default=2, help="permissions per policy")
+    parser.add_argument("--prohibition-rate", type=float, default=0.3, help="share of policies with a prohibition")
+    parser.add_argument("--constrained-rate", type=float, default=0.3,
+                        help="share of permissions with an isAnyOf constraint")
+    parser.add_argument("--constraint-values", type=int, default=20, help="values per constraint list")
+    parser.add_argument("--deny-rate", type=float, default=0.3, help="share of requests that must be denied")
+    parser.add_argument("--requests", type=int, default=5000, help="requests per corpus")
+    parser.add_argument("--legacy-sample", type=int, default=100,
+                        help="requests also timed with is_access_allowed (0 to skip)")
+    parser.add_argument("--decision-cache-size", type=int, default=0,
+                        help="ODRL_DECISION_CACHE_SIZE for the engine (0 measures uncached decisions)")
+    parser.add_argument("--refresh-interval", type=float, default=0.0,
+                        help="ODRL_POLICY_REFRESH_INTERVAL for the engine (0 rescans policies/ and data/ on every request)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="write the JSON report here (default: stdout)")
+    parser.add_argument("--compare", help="earlier JSON report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="relative slowdown that --compare reports as a regression")
+    parser.add_argument("--worker", metavar="CORPUS_DIR", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(worker(args.worker, args.legacy_sample)))
+        sys.exit(0)
+
+    report = {
+        "benchmark": "odrl_engine_suite",
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": {k: v for k, v in vars(args).items() if k not in ("output", "compare", "worker")},
+        "results": [],
+    }
+    for size in args.sizes:
+        report["results"].append(run_size(size, args))
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    print_summary(report)
+
+    failed = any(r["mismatches"] for r in report["results"])
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            failed = bool(compare(json.load(f), report, args.tolerance)) or failed
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,85 @@
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+# Cold start to the first ODRL decision: a fresh engine process that compiles
+# policies/*.ttl at start-up vs one that loads a policy bundle
+# (compile_policies.py). Each run is a new interpreter, like the spawn path of
+# ODRLService or a restart of server.py.
+#
+#   python benchmarks/policy_bundle_cold_start.py --runs 10
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ODRL_DIR = os.path.join(ROOT_DIR, "src", "main", "resources", "ODRL")
+
+REQUEST = """
+@prefix odrl:   <http://www.w3.org/ns/odrl/2/> .
+@prefix ex:     <http://example.org/> .
+
+<http://example.org/request:se-query>
+    a odrl:Request ;
+    odrl:permission [
+        odrl:target <http://example.org/graph/extract_meddra_freq_suspect> ;
+        odrl:assignee ex:researcher ;
+        odrl:action odrl:read
+    ] .
+"""
+
+# Runs in the child: time from the first line of the script to the first
+# decision, plus whether rdflib had to be imported on the way
+CHILD = """
+import time
+start = time.perf_counter()
+import sys
+sys.path.insert(0, sys.argv[1])
+from odrl_executor import bundle_info, process_odrl_request
+query = process_odrl_request(sys.stdin.read())
+elapsed = time.perf_counter() - start
+print(elapsed, bundle_info()["loaded"], "rdflib" in sys.modules, query is not None)
+"""
+
+
+def cold_start(bundle_path, runs):
+    env = dict(os.environ, ODRL_POLICY_BUNDLE=bundle_path)
+    first_decision, process = [], []
+    for _ in range(runs):
+        start = time.perf_counter()
+        out = subprocess.run([sys.executable, "-c", CHILD, ODRL_DIR], input=REQUEST.encode("utf-8"),
+                             stdout=subprocess.PIPE, env=env, check=True).stdout.decode().split()
+        process.append(time.perf_counter() - start)
+        first_decision.append(float(out[0]))
+        loaded, rdflib_loaded, allowed = (v == "True" for v in out[1:])
+    return {
+        "first_decision_ms": sorted(first_decision)[len(first_decision) // 2] * 1000,
+        "process_ms": sorted(process)[len(process) // 2] * 1000,
+        "bundle_loaded": loaded,
+        "rdflib_imported": rdflib_loaded,
+        "allowed": allowed,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ODRL engine cold start: .ttl policies vs policy bundle")
+    parser.add_argument("--runs", type=int, default=10, help="processes per path (median is reported)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        bundle_path = os.path.join(tmp, "policies.bundle")
+        subprocess.run([sys.executable, os.path.join(ODRL_DIR, "compile_policies.py"), "--output", bundle_path],
+                       stdout=subprocess.DEVNULL, check=True)
+
+        results = [
+            ("ttl", cold_start(os.path.join(tmp, "missing.bundle"), args.runs)),
+            ("bundle", cold_start(bundle_path, args.runs)),
+        ]
+
+    print(f"{'path':<8}{'first decision ms':>19}{'process ms':>12}{'bundle':>8}{'rdflib':>8}")
+    for name, r in results:
+        print(f"{name:<8}{r['first_decision_ms']:>19.1f}{r['process_ms']:>12.1f}"
+              f"{str(r['bundle_loaded']):>8}{str(r['rdflib_imported']):>8}")
+    same = results[0][1]["allowed"] == results[1][1]["allowed"]
+    print(f"same decision: {same}")
+    sys.exit(0 if same else 1)
@@ -0,0 +1,136 @@
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+# Checks that the compiled PolicyStore takes the same decisions as the
+# per-request policy_engine.is_access_allowed scan, and that its lookup cost
+# stays flat as the number of policy files grows.
+#
+#   python benchmarks/policy_store_lookup.py --sizes 100 1000 10000
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ODRL_DIR = os.path.join(ROOT_DIR, "src", "main", "resources", "ODRL")
+sys.path.insert(0, ODRL_DIR)
+
+from engine.policy_engine import is_access_allowed  # noqa: E402
+from engine.policy_store import PolicyStore  # noqa: E402
+
+ODRL_NS = "http://www.w3.org/ns/odrl/2/"
+ASSIGNEES = ["http://example.org/researcher", "http://example.org/user"]
+
+POLICY_TEMPLATE = """@prefix odrl: <http://www.w3.org/ns/odrl/2/> .
+@prefix ex:   <http://example.org/> .
+
+<http://example.org/policy/{name}>
+    a odrl:Offer ;
+    odrl:permission [
+        odrl:assignee ex:{assignee} ;
+        odrl:action odrl:read ;
+        odrl:target <http://example.org/graph/{name}> ,
+                    <http://example.org/sparql/{name}>
+    ]{prohibition} .
+"""
+
+PROHIBITION_TEMPLATE = """ ;
+    odrl:prohibition [
+        odrl:action odrl:read ;
+        odrl:constraint [
+            odrl:leftOperand ex:drugIDs ;
+            odrl:operator odrl:eq ;
+            odrl:rightOperand ({values})
+        ]
+    ]"""
+
+
+def write_policies(policy_dir, count, rng):
+    names = []
+    for i in range(count):
+        name = f"policy_{i:06d}"
+        prohibition = ""
+        if rng.random() < 0.3:
+            values = " ".join(f'"CID{rng.randrange(1000):09d}"' for _ in range(rng.randrange(1, 20)))
+            prohibition = PROHIBITION_TEMPLATE.format(values=values)
+        with open(os.path.join(policy_dir, name + ".ttl"), "w", encoding="utf-8") as f:
+            f.write(POLICY_TEMPLATE.format(
+                name=name,
+                assignee=rng.choice(["researcher", "user"]),
+                prohibition=prohibition
+            ))
+        names.append(name)
+    return names
+
+
+def random_requests(names, rng, count):
+    requests = []
+    for _ in range(count):
+        name = rng.choice(names)
+        constraints = {}
+        if rng.random() < 0.5:
+            constraints["drugIDs"] = [f"CID{rng.randrange(1000):09d}" for _ in range(rng.randrange(1, 5))]
+        requests.append((rng.choice(ASSIGNEES), ODRL_NS + "read", f"http://example.org/graph/{name}", constraints))
+    return requests
+
+
+def legacy_decide(policy_dir, assignee, action, target, constraints):
+    # The filename scan process_odrl_request used before the PolicyStore
+    target_name = target.split("/")[-1]
+    for filename in sorted(os.listdir(policy_dir)):
+        if not filename.endswith(".ttl") or not filename.startswith(target_name):
+            continue
+        result = is_access_allowed(os.path.join(policy_dir, filename), assignee, action, target, constraints)
+        if result:
+            return result
+    return None
+
+
+def run(size, lookups, checks, seed):
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory() as policy_dir:
+        names = write_policies(policy_dir, size, rng)
+        store = PolicyStore(policy_dir)
+
+        start = time.perf_counter()
+        store.refresh()
+        compile_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        store.refresh()
+        noop_refresh_ms = (time.perf_counter() - start) * 1000
+
+        requests = random_requests(names, rng, lookups)
+        start = time.perf_counter()
+        for assignee, action, target, constraints in requests:
+            store.decide(assignee, action, target, constraints)
+        decide_us = (time.perf_counter() - start) / lookups * 1e6
+
+        mismatches = 0
+        legacy_total = 0.0
+        for assignee, action, target, constraints in requests[:checks]:
+            start = time.perf_counter()
+            expected = legacy_decide(policy_dir, assignee, action, target, constraints)
+            legacy_total += time.perf_counter() - start
+            if store.decide(assignee, action, target, constraints) != expected:
+                mismatches += 1
+        legacy_ms = legacy_total / max(1, checks) * 1000
+
+    return size, compile_s, noop_refresh_ms, decide_us, legacy_ms, mismatches
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="PolicyStore lookup cost and equivalence check")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--lookups", type=int, default=100000)
+    parser.add_argument("--checks", type=int, default=200, help="requests compared against is_access_allowed")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"{'policies':>10}{'compile s':>12}{'rescan ms':>12}{'decide us':>12}{'legacy ms':>12}{'mismatches':>12}")
+    failed = False
+    for size in args.sizes:
+        row = run(size, args.lookups, args.checks, args.seed)
+        print(f"{row[0]:>10}{row[1]:>12.2f}{row[2]:>12.2f}{row[3]:>12.2f}{row[4]:>12.2f}{row[5]:>12}")
+        failed = failed or row[5] > 0
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,136 @@
+import argparse
+import os
+import sys
+import time
+
+# Checks the fast-path request parser against the rdflib parser on a corpus
+# of ODRL requests and reports requests per second for both.
+#
+#   python benchmarks/request_parser_fast_path.py --iterations 2000
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ODRL_DIR = os.path.join(ROOT_DIR, "src", "main", "resources", "ODRL")
+sys.path.insert(0, ODRL_DIR)
+
+from engine.fast_request_parser import parse_request_fast  # noqa: E402
+from engine.request_parser import parse_request, parse_request_rdflib  # noqa: E402
+
+PREFIXES = """
+@prefix odrl:   <http://www.w3.org/ns/odrl/2/> .
+@prefix ex:     <http://example.org/> .
+"""
+
+TRAIN_TEMPLATE = PREFIXES + """
+<http://example.org/request:se-query>
+    a odrl:Request ;
+    odrl:uid <https://www.wikidata.org/wiki/Q25670> ;
+    odrl:profile <https://www.wikidata.org/wiki/Q4382010> ;
+
+    odrl:permission [
+        odrl:target <http://example.org/graph/{target}> ;
+        odrl:assignee ex:researcher ;
+        odrl:action odrl:read
+
+    ] .
+"""
+
+CONSTRAINED = PREFIXES + """
+<http://example.org/request:se-query> a odrl:Request ;
+    odrl:permission [
+        odrl:target <http://example.org/graph/meddra_freq> ;
+        odrl:assignee ex:researcher ;
+        odrl:action odrl:read ;
+        odrl:constraint [
+            odrl:leftOperand ex:drugIDs ;
+            odrl:operator odrl:isAnyOf ;
+            odrl:rightOperand ("CID100004902" "CID100107969" ex:other)
+        ] , [
+            odrl:leftOperand ex:sideEffects ;
+            odrl:operator odrl:eq ;
+            odrl:rightOperand ("Tremor")  # trailing comment
+        ] ;
+        odrl:constraint [ odrl:leftOperand ex:empty ; odrl:rightOperand () ] ;
+    ] .
+"""
+
+CORPUS = [
+    TRAIN_TEMPLATE.format(target=target) for target in (
+        "extract_adr_data", "extract_l_data", "extract_vigi_data", "extract_atc_data",
+        "extract_drug_names_suspect", "extract_meddra_labels_suspect",
+        "extract_meddra_freq_suspect", "extract_meddra_indication_concomitant",
+    )
+] + [
+    CONSTRAINED,
+    # SPARQL-style prefixes, compact layout, literal right operand
+    """PREFIX odrl: <http://www.w3.org/ns/odrl/2/>
+PREFIX ex: <http://example.org/>
+ex:req a odrl:Request ; odrl:permission [ odrl:target ex:t ; odrl:assignee ex:u ; odrl:action odrl:use ;
+odrl:constraint [ odrl:leftOperand ex:k ; odrl:rightOperand "x" ] ] .""",
+    # query parameter bindings
+    PREFIXES + """ex:req a odrl:Request ;
+    odrl:permission [ odrl:target ex:t ; odrl:assignee ex:u ; odrl:action odrl:read ] ;
+    ex:binding [ ex:parameter "drug_id" ; ex:values ("CID100107969" "CID100004902") ] ,
+               [ ex:parameter "drug_name" ; ex:values () ] .""",
+    # missing action
+    PREFIXES + "ex:req a odrl:Request ; odrl:permission [ odrl:target ex:t ; odrl:assignee ex:u ] .",
+    # shapes the fast path must hand over to rdflib
+    PREFIXES + 'ex:req a odrl:Request ; odrl:permission [ odrl:target ex:t ; odrl:assignee "r\\u00e9" ] .',
+    PREFIXES + 'ex:req a odrl:Request ; odrl:permission [ odrl:target ex:t ; odrl:assignee "r"@en ] .',
+    PREFIXES + 'ex:req a odrl:Request ; odrl:permission [ odrl:constraint [ odrl:leftOperand ex:k ; odrl:rightOperand ("""x""") ] ] .',
+    # invalid turtle, must not be read as two adjacent literals
+    PREFIXES + 'ex:req a odrl:Request ; odrl:permission [ odrl:constraint [ odrl:leftOperand ex:k ; odrl:rightOperand ("a""b") ] ] .',
+    PREFIXES + "ex:req a odrl:Request ; odrl:permission _:p . _:p odrl:target ex:t .",
+    PREFIXES + "ex:req a odrl:Request ; odrl:permission [ odrl:target ex:t , ex:s ] .",
+    PREFIXES + "ex:a a odrl:Request ; odrl:permission [ odrl:target ex:t ] . ex:b a odrl:Offer .",
+    PREFIXES + "ex:req a odrl:Offer ; odrl:permission [ odrl:target ex:t ] .",
+    PREFIXES + "ex:req a odrl:Request .",
+    PREFIXES + "ex:req a odrl:Request ; odrl:permission [ odrl:target ex:t ; odrl:duty [ odrl:action ex:x ] ] .",
+    PREFIXES + "ex:req a odrl:Request ; odrl:permission [ odrl:constraint [ odrl:leftOperand ex:k ; odrl:rightOperand ( 1 2 ) ] ] .",
+]
+
+
+def _outcome(parser, payload):
+    # Invalid turtle must fail the same way on both paths
+    try:
+        return parser(payload)
+    except Exception as e:
+        return type(e).__name__
+
+
+def check_corpus():
+    mismatches = 0
+    fast_hits = 0
+    for payload in CORPUS:
+        expected = _outcome(parse_request_rdflib, payload)
+        fast = parse_request_fast(payload)
+        if fast is not None:
+            fast_hits += 1
+            if fast != expected:
+                mismatches += 1
+                print("fast path mismatch:\n", payload, "\n", fast, "\n", expected)
+        if _outcome(parse_request, payload) != expected:
+            mismatches += 1
+            print("parse_request mismatch:\n", payload)
+    return fast_hits, mismatches
+
+
+def requests_per_second(parser, payloads, iterations):
+    start = time.perf_counter()
+    for i in range(iterations):
+        parser(payloads[i % len(payloads)])
+    return iterations / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Fast-path vs rdflib ODRL request parsing")
+    arg_parser.add_argument("--iterations", type=int, default=2000)
+    args = arg_parser.parse_args()
+
+    fast_hits, mismatches = check_corpus()
+    print(f"corpus: {len(CORPUS)} requests, {fast_hits} on the fast path, {mismatches} mismatches")
+
+    templates = CORPUS[:9]
+    print(f"{'parser':<10}{'requests/s':>14}")
+    print(f"{'rdflib':<10}{requests_per_second(parse_request_rdflib, templates, args.iterations):>14.0f}")
+    print(f"{'fast':<10}{requests_per_second(parse_request_fast, templates, args.iterations):>14.0f}")
+    sys.exit(1 if mismatches else 0)
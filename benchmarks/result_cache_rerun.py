@@ -0,0 +1,96 @@
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+# Wall-clock time of the four train scripts run as a pipeline against the
+# ODRL engine server: cold (empty graph and result caches), with the graph
+# cache only (RESULT_CACHE_MAX_BYTES=0) and with a warm result cache, which
+# answers every approved query without loading a station. rdflib's row order
+# (and so the order of joined values in some outputs) depends on how a graph
+# was loaded, so result-cache runs are checked to reproduce the cold run that
+# wrote the entries, and graph-cache runs to agree with each other.
+#
+#   python benchmarks/result_cache_rerun.py --repeat 2
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS_DIR = os.path.join(ROOT_DIR, "scripts")
+ODRL_DIR = os.path.join(ROOT_DIR, "src", "main", "resources", "ODRL")
+RDF_DIR = os.path.join(ROOT_DIR, "src", "main", "resources", "workflow", "RDF")
+SAMPLE_DIR = os.path.join(ROOT_DIR, "output")
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def pipeline():
+    rdf = lambda name: os.path.join(RDF_DIR, name)  # noqa: E731
+    sample = lambda name: os.path.join(SAMPLE_DIR, name)  # noqa: E731
+    freq = rdf("meddra_freq.ttl") if os.path.exists(rdf("meddra_freq.ttl")) else rdf("meddra_all_label_se.ttl")
+    return [
+        ["extractADR_RDF.py", rdf("ADRCase.ttl")],
+        ["extractData_RDF.py", sample("ADRData.json"), rdf("LData.ttl")],
+        ["extractVigi_RDF.py", rdf("ViData.ttl"), sample("ADRData.json"), rdf("atc_hierarchy.ttl")],
+        ["extractSideEFF_RDF.py", rdf("drug_names.ttl"), freq, rdf("meddra_all_label_se.ttl"), rdf("SideEff.ttl"),
+         sample("ADRData.json"), sample("vigiData.json")],
+    ]
+
+
+def run_pipeline(env):
+    with tempfile.TemporaryDirectory() as workdir:
+        start = time.perf_counter()
+        for script, *args in pipeline():
+            subprocess.run([sys.executable, os.path.join(SCRIPTS_DIR, script), *args], cwd=workdir, env=env,
+                           check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        elapsed = time.perf_counter() - start
+        outputs = {}
+        for name in sorted(os.listdir(os.path.join(workdir, "Output"))):
+            with open(os.path.join(workdir, "Output", name), "rb") as f:
+                outputs[name] = f.read()
+    return elapsed, outputs
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pipeline reruns with and without the SPARQL result cache")
+    parser.add_argument("--repeat", type=int, default=2, help="warm runs per mode")
+    args = parser.parse_args()
+
+    port = free_port()
+    engine = subprocess.Popen([sys.executable, os.path.join(ODRL_DIR, "server.py"), "--port", str(port)],
+                              cwd=ODRL_DIR, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    engine.stdout.readline()  # listening
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ, ODRL_ENDPOINT=f"http://127.0.0.1:{port}/decide",
+                       GRAPH_CACHE_DIR=os.path.join(tmp, "graphs"), RESULT_CACHE_DIR=os.path.join(tmp, "results"),
+                       # the scripts join drug names from sets; fix their order across runs
+                       PYTHONHASHSEED="0")
+            runs = {"cold": [run_pipeline(env)]}
+            no_results = dict(env, RESULT_CACHE_MAX_BYTES="0")
+            runs["graph cache only"] = [run_pipeline(no_results) for _ in range(args.repeat)]
+            runs["result cache"] = [run_pipeline(env) for _ in range(args.repeat)]
+            totals = json.loads(subprocess.run([sys.executable, os.path.join(SCRIPTS_DIR, "result_cache.py")],
+                                               env=env, stdout=subprocess.PIPE, check=True).stdout)
+    finally:
+        engine.terminate()
+        engine.wait()
+
+    print(f"{'mode':<18}{'best s':>8}")
+    for mode, results in runs.items():
+        print(f"{mode:<18}{min(elapsed for elapsed, _ in results):>8.2f}")
+    cold = runs["cold"][0][1]
+    replayed = all(output == cold for _, output in runs["result cache"])
+    graph_only = [output for _, output in runs["graph cache only"]]
+    consistent = all(output == graph_only[0] for output in graph_only)
+    print(f"result cache: {totals['hits']} hits, {totals['misses']} misses over {totals['runs']} script runs, "
+          f"{totals['entries']} entries, {totals['bytes'] / 1024:.0f} KB")
+    print(f"result cache runs reproduce the cold run: {replayed}")
+    print(f"graph cache runs agree: {consistent}")
+    sys.exit(0 if replayed and consistent else 1)
@@ -0,0 +1,96 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+# Query time and peak memory of the SPARQL steps of a full extractSideEFF run
+# (suspect and concomitant pass): one global Graph that every station file is
+# parsed into, once per pass, vs the per-dataset GraphRegistry. Queries are
+# the ODRL data/*.txt files with their default values.
+#
+#   python benchmarks/sideeff_graph_registry.py
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS_DIR = os.path.join(ROOT_DIR, "scripts")
+RDF_DIR = os.path.join(ROOT_DIR, "src", "main", "resources", "workflow", "RDF")
+QUERY_DIR = os.path.join(ROOT_DIR, "src", "main", "resources", "ODRL", "data")
+
+# (station, query) in the order extractSideEFF runs them, per pass
+STEPS = [
+    ("drug_names", "extract_drug_names_{role}.txt"),
+    ("meddra_all_label_se", "extract_meddra_labels_{role}.txt"),
+    ("meddra_freq", "extract_meddra_freq_{role}.txt"),
+    ("SideEff", "extract_meddra_indication_{role}.txt"),
+]
+
+CHILD = """
+import json, resource, sys, time
+sys.path.insert(0, sys.argv[1])
+mode, stations, steps = sys.argv[2], json.loads(sys.argv[3]), json.loads(sys.argv[4])
+from rdflib import Graph
+from graph_cache import GraphRegistry
+
+g = Graph()
+datasets = GraphRegistry()
+load_s = query_s = 0.0
+rows = []
+for role in ("suspect", "concomitant"):
+    for station, query_file in steps:
+        start = time.perf_counter()
+        if mode == "global":
+            g.parse(stations[station], format="turtle")
+            graph = g
+        else:
+            graph = datasets.get(stations[station])
+        load_s += time.perf_counter() - start
+        with open(query_file.format(role=role), encoding="utf-8") as f:
+            query = f.read()
+        start = time.perf_counter()
+        result = sorted(tuple(str(v) for v in row) for row in graph.query(query))
+        query_s += time.perf_counter() - start
+        rows.append(result)
+print(json.dumps({
+    "load_s": load_s,
+    "query_s": query_s,
+    "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "triples_queried": len(g) if mode == "global" else None,
+    "rows": rows,
+}))
+"""
+
+
+def run(mode, stations):
+    steps = [(station, os.path.join(QUERY_DIR, query)) for station, query in STEPS]
+    with tempfile.TemporaryDirectory() as cache_dir:
+        # empty graph cache, so both modes parse every file
+        env = dict(os.environ, GRAPH_CACHE_DIR=cache_dir)
+        out = subprocess.run([sys.executable, "-c", CHILD, SCRIPTS_DIR, mode, json.dumps(stations), json.dumps(steps)],
+                             stdout=subprocess.PIPE, env=env, check=True).stdout
+    return json.loads(out)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="extractSideEFF: global Graph vs per-dataset registry")
+    parser.add_argument("--rdf-dir", default=RDF_DIR)
+    args = parser.parse_args()
+
+    stations = {}
+    for station, _ in STEPS:
+        path = os.path.join(args.rdf_dir, station + ".ttl")
+        if not os.path.exists(path):
+            # meddra_freq.ttl is not shipped with the repository
+            print(f"{station}.ttl not found, using meddra_all_label_se.ttl in its place")
+            path = os.path.join(args.rdf_dir, "meddra_all_label_se.ttl")
+        stations[station] = path
+
+    global_run = run("global", stations)
+    registry_run = run("registry", stations)
+
+    print(f"{'mode':<10}{'load s':>9}{'query s':>9}{'peak RSS MB':>13}")
+    for name, r in (("global", global_run), ("registry", registry_run)):
+        print(f"{name:<10}{r['load_s']:>9.2f}{r['query_s']:>9.2f}{r['peak_rss_mb']:>13.1f}")
+    same = global_run["rows"] == registry_run["rows"]
+    print(f"same query results: {same}")
+    sys.exit(0 if same else 1)
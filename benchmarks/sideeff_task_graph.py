@@ -0,0 +1,118 @@
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Wall-clock time of a full extractSideEFF run with its steps one after
+# another (TRAIN_WORKERS=1) vs on the task graph, and a check that both write
+# the same Output/SideEff.json. The script talks to the ODRL engine server
+# through a proxy that adds --odrl-delay ms per decision, standing in for the
+# coordinator hop. Station files come from workflow/RDF; the graph cache is
+# warmed first so both modes load from it.
+#
+#   python benchmarks/sideeff_task_graph.py --odrl-delay 50 --repeat 3
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT = os.path.join(ROOT_DIR, "scripts", "extractSideEFF_RDF.py")
+ODRL_DIR = os.path.join(ROOT_DIR, "src", "main", "resources", "ODRL")
+RDF_DIR = os.path.join(ROOT_DIR, "src", "main", "resources", "workflow", "RDF")
+SAMPLE_DIR = os.path.join(ROOT_DIR, "output")
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_proxy(upstream, delay):
+    class Proxy(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            time.sleep(delay)
+            request = urllib.request.Request(upstream, data=body, headers={"Content-Type": "text/turtle"})
+            with urllib.request.urlopen(request) as response:
+                payload = response.read()
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Proxy)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run_train(workdir, stations, env, workers):
+    env = dict(env, TRAIN_WORKERS=str(workers))
+    start = time.perf_counter()
+    subprocess.run([sys.executable, SCRIPT, stations["drug_names"], stations["meddra_freq"],
+                    stations["meddra_all_label_se"], stations["SideEff"],
+                    os.path.join(SAMPLE_DIR, "ADRData.json"), os.path.join(SAMPLE_DIR, "vigiData.json")],
+                   cwd=workdir, env=env, check=True, stdout=subprocess.DEVNULL)
+    elapsed = time.perf_counter() - start
+    with open(os.path.join(workdir, "Output", "SideEff.json"), "rb") as f:
+        return elapsed, f.read()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="extractSideEFF: serial steps vs task graph")
+    parser.add_argument("--odrl-delay", type=float, default=50, help="added latency per ODRL decision (ms)")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    stations = {}
+    for name in ("drug_names", "meddra_freq", "meddra_all_label_se", "SideEff"):
+        path = os.path.join(RDF_DIR, name + ".ttl")
+        if not os.path.exists(path):
+            # meddra_freq.ttl is not shipped with the repository
+            print(f"{name}.ttl not found, using meddra_all_label_se.ttl in its place")
+            path = os.path.join(RDF_DIR, "meddra_all_label_se.ttl")
+        stations[name] = path
+
+    port = free_port()
+    engine = subprocess.Popen([sys.executable, os.path.join(ODRL_DIR, "server.py"), "--port", str(port)],
+                              cwd=ODRL_DIR, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    engine.stdout.readline()  # listening
+    proxy = start_proxy(f"http://127.0.0.1:{port}/decide", args.odrl_delay / 1000)
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            env = dict(os.environ, ODRL_ENDPOINT=f"http://127.0.0.1:{proxy.server_port}/",
+                       GRAPH_CACHE_DIR=os.path.join(workdir, "cache"),
+                       # the script joins drug names from sets; fix their order across runs
+                       PYTHONHASHSEED="0")
+            run_train(workdir, stations, env, 1)  # warm the graph cache
+
+            timings = {"serial": [], "task graph": []}
+            outputs = set()
+            for _ in range(args.repeat):
+                for mode, workers in (("serial", 1), ("task graph", args.workers)):
+                    elapsed, output = run_train(workdir, stations, env, workers)
+                    timings[mode].append(elapsed)
+                    outputs.add(output)
+    finally:
+        proxy.shutdown()
+        engine.terminate()
+        engine.wait()
+
+    print(f"ODRL delay {args.odrl_delay:.0f} ms, {args.repeat} runs per mode")
+    print(f"{'mode':<12}{'median s':>10}{'min s':>8}")
+    for mode, values in timings.items():
+        print(f"{mode:<12}{statistics.median(values):>10.2f}{min(values):>8.2f}")
+    same = len(outputs) == 1
+    print(f"same SideEff.json: {same}")
+    sys.exit(0 if same else 1)
@@ -0,0 +1,127 @@
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+# Runs every ODRL/data/*.txt query on each SPARQL backend of
+# scripts/sparql_backend.py over the station it targets, checks that the
+# backends return the same rows (compared as sorted lists) and reports load
+# and query times. Queries run with their default VALUES; a station file
+# that is not shipped (meddra_freq.ttl) skips its queries.
+#
+#   python benchmarks/sparql_backend_suite.py --repeat 3
+#   python benchmarks/sparql_backend_suite.py --backends rdflib oxigraph --json
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, "scripts"))
+QUERY_DIR = os.path.join(ROOT_DIR, "src", "main", "resources", "ODRL", "data")
+RDF_DIR = os.path.join(ROOT_DIR, "src", "main", "resources", "workflow", "RDF")
+
+# query file -> station it runs over in the trains
+STATIONS = {
+    "extract_adr_data.txt": "ADRCase.ttl",
+    "extract_data.txt": "ADRCase.ttl",
+    "extract_l_data.txt": "LData.ttl",
+    "extract_vigi_data.txt": "ViData.ttl",
+    "extract_atc_data.txt": "atc_hierarchy.ttl",
+    "extract_drug_names_suspect.txt": "drug_names.ttl",
+    "extract_drug_names_concomitant.txt": "drug_names.ttl",
+    "extract_meddra_labels_suspect.txt": "meddra_all_label_se.ttl",
+    "extract_meddra_labels_concomitant.txt": "meddra_all_label_se.ttl",
+    "extract_meddra_freq_suspect.txt": "meddra_freq.ttl",
+    "extract_meddra_freq_concomitant.txt": "meddra_freq.ttl",
+    "meddra_labels.txt": "meddra_freq.ttl",
+    "extract_meddra_indication_suspect.txt": "SideEff.ttl",
+    "extract_meddra_indication_concomitant.txt": "SideEff.ttl",
+}
+
+
+def run_query(station, query, repeat):
+    timings = []
+    rows = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = list(station.select(query))
+        timings.append(time.perf_counter() - start)
+    return rows, statistics.median(timings)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Every data/*.txt query on each SPARQL backend")
+    parser.add_argument("--backends", nargs="+", default=["rdflib", "oxigraph"])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+
+    # cold graph cache, so rdflib's load time is a parse like oxigraph's
+    os.environ["GRAPH_CACHE_DIR"] = tempfile.mkdtemp(prefix="sparql-backend-suite-")
+    # the engines themselves, without the result cache
+    from sparql_backend import BACKENDS  # noqa: E402
+
+    stations = {}   # (backend, file) -> station, or the error that stopped it
+    load_times = {}
+    results = []
+    for query_file in sorted(os.listdir(QUERY_DIR)):
+        if not query_file.endswith(".txt"):
+            continue
+        station_file = STATIONS.get(query_file)
+        path = os.path.join(RDF_DIR, station_file) if station_file else None
+        result = {"query": query_file, "station": station_file, "backends": {}, "same_rows": None}
+        results.append(result)
+        if path is None or not os.path.exists(path):
+            result["skipped"] = f"station {station_file} not found"
+            continue
+        with open(os.path.join(QUERY_DIR, query_file), encoding="utf-8") as f:
+            query = f.read()
+
+        rows_by_backend = {}
+        for backend in args.backends:
+            key = (backend, station_file)
+            if key not in stations:
+                start = time.perf_counter()
+                try:
+                    stations[key] = BACKENDS[backend](path)
+                except ImportError as e:
+                    stations[key] = f"backend unavailable: {e}"
+                load_times[key] = time.perf_counter() - start
+            station = stations[key]
+            if isinstance(station, str):
+                result["backends"][backend] = {"error": station}
+                continue
+            try:
+                rows, seconds = run_query(station, query, args.repeat)
+            except Exception as e:
+                result["backends"][backend] = {"error": f"{type(e).__name__}: {e}".splitlines()[0]}
+                continue
+            rows_by_backend[backend] = sorted(rows, key=repr)
+            result["backends"][backend] = {"rows": len(rows), "load_s": load_times[key], "query_s": seconds}
+        if len(rows_by_backend) > 1:
+            result["same_rows"] = len({repr(rows) for rows in rows_by_backend.values()}) == 1
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        header = f"{'query':<42}{'station':<24}"
+        for backend in args.backends:
+            header += f"{backend + ' rows':>14}{'load s':>8}{'query ms':>10}"
+        print(header + f"{'same':>6}")
+        for r in results:
+            line = f"{r['query']:<42}{r['station'] or '-':<24}"
+            if "skipped" in r:
+                print(line + r["skipped"])
+                continue
+            for backend in args.backends:
+                b = r["backends"][backend]
+                if "error" in b:
+                    line += f"{'error':>14}{'':>8}{'':>10}"
+                else:
+                    line += f"{b['rows']:>14}{b['load_s']:>8.2f}{b['query_s'] * 1000:>10.1f}"
+            same = "-" if r["same_rows"] is None else ("yes" if r["same_rows"] else "NO")
+            print(line + f"{same:>6}")
+        errors = {f"{backend}: {b['error']}" for r in results for backend, b in r["backends"].items() if "error" in b}
+        for error in sorted(errors):
+            print(error)
+    sys.exit(1 if any(r["same_rows"] is False for r in results) else 0)
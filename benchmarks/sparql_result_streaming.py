@@ -0,0 +1,73 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# Consuming a large SELECT result the way the scripts did (serialise to
+# SPARQL-JSON, json.loads, walk ["results"]["bindings"]) vs the streaming
+# adapter in scripts/sparql_results.py (row tuples and the DataFrame
+# builder). The query is a full triple dump (what extract_vigi_data was
+# before it took the ADR drug names) over a synthetic VigiLyze-like graph. Each mode runs in a fresh process; the RSS
+# growth is measured after the graph is built, so it belongs to the result.
+#
+#   python benchmarks/sparql_result_streaming.py --reports 5000
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS_DIR = os.path.join(ROOT_DIR, "scripts")
+QUERY = "SELECT ?subject ?predicate ?object WHERE { ?subject ?predicate ?object . }"
+
+CHILD = """
+import json, resource, sys, time
+sys.path.insert(0, sys.argv[1])
+mode, reports, attributes, query = sys.argv[2], int(sys.argv[3]), int(sys.argv[4]), sys.argv[5]
+from rdflib import Graph, Literal, URIRef
+from sparql_results import iter_rows, to_dataframe
+
+EX = "http://example.org/"
+g = Graph()
+predicates = [URIRef(f"{EX}attribute_{a}") for a in range(attributes)]
+g.addN((URIRef(f"{EX}report/{r}"), p, Literal(f"value {r} {a} some free text"), g)
+       for r in range(reports) for a, p in enumerate(predicates))
+
+rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+results = g.query(query)
+if mode == "json":
+    sparql_json = json.loads(results.serialize(format="json").decode("utf-8"))
+    rows = [(b["subject"]["value"], b["predicate"]["value"], b["object"]["value"])
+            for b in sparql_json["results"]["bindings"]]
+elif mode == "rows":
+    rows = list(iter_rows(results, ("subject", "predicate", "object")))
+else:
+    rows = to_dataframe(results, ("subject", "predicate", "object"))
+elapsed = time.perf_counter() - start
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({"seconds": elapsed, "rows": len(rows), "rss_growth_kb": rss - rss_before, "peak_rss_kb": rss}))
+"""
+
+MODES = ("json", "rows", "dataframe")
+
+
+def measure(mode, reports, attributes):
+    out = subprocess.run([sys.executable, "-c", CHILD, SCRIPTS_DIR, mode, str(reports), str(attributes), QUERY],
+                         stdout=subprocess.PIPE, check=True).stdout
+    return json.loads(out)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SPARQL-JSON round-trip vs streaming result adapter")
+    parser.add_argument("--reports", type=int, default=5000)
+    parser.add_argument("--attributes", type=int, default=12, help="predicates per report")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+
+    results = {mode: measure(mode, args.reports, args.attributes) for mode in MODES}
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'mode':<11}{'rows':>9}{'seconds':>9}{'RSS growth MB':>15}{'peak RSS MB':>13}")
+        for mode, r in results.items():
+            print(f"{mode:<11}{r['rows']:>9}{r['seconds']:>9.2f}{r['rss_growth_kb'] / 1024:>15.1f}"
+                  f"{r['peak_rss_kb'] / 1024:>13.1f}")
+    sys.exit(0 if len({r["rows"] for r in results.values()}) == 1 else 1)
@@ -0,0 +1,203 @@
+import argparse
+import http.client
+import json
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import quote
+
+# Load test of the SPARQL station server: N concurrent trains, each on its
+# own keep-alive connection, send a mix of train-shaped queries (point
+# lookups on the MedDRA, SIDER, drug name and ATC stations, full scans of the
+# small case stations). Reports queries per second and latency percentiles
+# per concurrency level, checks the server's rows against an in-process
+# station and compares with a train that loads the files itself. The server
+# runs with the result cache off unless --result-cache is given.
+#
+#   python benchmarks/station_server_load.py --trains 1,8,32,64 --queries 200
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS_DIR = os.path.join(ROOT_DIR, "scripts")
+RDF_DIR = os.path.join(ROOT_DIR, "src", "main", "resources", "workflow", "RDF")
+sys.path.insert(0, SCRIPTS_DIR)
+
+PREFIXES = """PREFIX ex: <http://example.org/>
+PREFIX drug: <http://identifiers.org/pubchem.compound/>
+PREFIX umls: <http://linkedlifedata.com/resource/umls/id/>
+PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+PREFIX skos: <http://www.w3.org/2004/02/skos/core#>
+"""
+
+# a train loading its stations and running the mix once, in a fresh process
+CHILD = """
+import sys, time
+start = time.perf_counter()
+from sparql_backend import StationRegistry
+stations = StationRegistry("rdflib")
+for name, query in __import__("json").loads(sys.argv[1]):
+    list(stations.get(sys.argv[2] + "/" + name).select(query))
+print(time.perf_counter() - start)
+"""
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def read(name):
+    with open(os.path.join(RDF_DIR, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def query_mix(count, seed=0):
+    # (station, query) pairs over ids that occur in the files
+    meddra_drugs = re.findall(r"^drug:(CID\d+) ex:hasSideEffect", read("meddra_all_label_se.ttl"), re.M)
+    indication_drugs = re.findall(r"^drug:(CID\d+) ex:hasIndication", read("SideEff.ttl"), re.M)
+    names = re.findall(r'ex:Name "([^"\\]+)"', read("drug_names.ttl"))
+    atc_codes = re.findall(r'skos:prefLabel "([A-Z0-9]+)"@en', read("atc_hierarchy.ttl"))
+    templates = [
+        ("meddra_all_label_se.ttl", lambda r: f"SELECT ?se WHERE {{ drug:{r.choice(meddra_drugs)} ex:hasSideEffect ?se }}"),
+        ("SideEff.ttl", lambda r: f"SELECT ?umls WHERE {{ drug:{r.choice(indication_drugs)} ex:hasIndication ?umls }}"),
+        ("drug_names.ttl", lambda r: f'SELECT ?id WHERE {{ ?row ex:Name "{r.choice(names)}" ; ex:ID ?id }}'),
+        ("atc_hierarchy.ttl", lambda r: f'SELECT ?label ?parent WHERE {{ ?c skos:prefLabel "{r.choice(atc_codes)}"@en ; '
+                                        f'rdfs:label ?label ; skos:broader ?parent }}'),
+        ("ADRCase.ttl", lambda r: "SELECT ?id ?attr ?val WHERE { ?id ?attr ?val }"),
+        ("ViData.ttl", lambda r: "SELECT ?id ?attr ?val WHERE { ?id ?attr ?val }"),
+    ]
+    rng = random.Random(seed)
+    return [(name, PREFIXES + make(rng)) for name, make in (rng.choice(templates) for _ in range(count))]
+
+
+def post(connection, name, query):
+    connection.request("POST", "/sparql/" + quote(name), body=query.encode("utf-8"),
+                       headers={"Content-Type": "application/sparql-query; charset=utf-8"})
+    response = connection.getresponse()
+    body = response.read()
+    if response.status != 200:
+        raise RuntimeError(f"{response.status}: {body.decode('utf-8', 'replace')}")
+    return json.loads(body)
+
+
+def run_trains(port, trains, queries_per_train):
+    # every train opens one connection and sends its queries back to back
+    latencies = [[] for _ in range(trains)]
+    errors = []
+    ready = threading.Barrier(trains + 1)
+
+    def train(i):
+        mix = query_mix(queries_per_train, seed=i)
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=300)
+        ready.wait()
+        try:
+            for name, query in mix:
+                start = time.perf_counter()
+                post(connection, name, query)
+                latencies[i].append(time.perf_counter() - start)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=train, args=(i,)) for i in range(trains)]
+    for thread in threads:
+        thread.start()
+    ready.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    samples = sorted(latency for per_train in latencies for latency in per_train)
+    return elapsed, samples, errors
+
+
+def percentile(samples, pct):
+    return samples[min(len(samples) - 1, int(pct / 100 * len(samples)))]
+
+
+def check_rows(port):
+    # the server's rows against an in-process station, one query per template
+    from sparql_backend import open_station
+
+    mismatches = 0
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=300)
+    seen = set()
+    for name, query in query_mix(200, seed=42):
+        if name in seen:
+            continue
+        seen.add(name)
+        served = post(connection, name, query)
+        local = open_station(os.path.join(RDF_DIR, name), backend="rdflib")
+        if sorted(tuple(row) for row in served["rows"]) != sorted(local.select(query)):
+            mismatches += 1
+            print(f"row mismatch on {name}")
+    connection.close()
+    return len(seen), mismatches
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent trains against the SPARQL station server")
+    parser.add_argument("--trains", default="1,8,32,64", help="comma-separated concurrency levels")
+    parser.add_argument("--queries", type=int, default=200, help="queries per train")
+    parser.add_argument("--result-cache", action="store_true", help="leave the server's result cache on")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    port = free_port()
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, GRAPH_CACHE_DIR=os.path.join(tmp, "graphs"), RESULT_CACHE_DIR=os.path.join(tmp, "results"))
+        if not args.result_cache:
+            env["RESULT_CACHE_MAX_BYTES"] = "0"
+        os.environ.update(RESULT_CACHE_MAX_BYTES="0", GRAPH_CACHE_DIR=env["GRAPH_CACHE_DIR"])
+
+        start = time.perf_counter()
+        server = subprocess.Popen([sys.executable, os.path.join(SCRIPTS_DIR, "station_server.py"), "--dir", RDF_DIR,
+                                   "--port", str(port), "--backend", "rdflib"],
+                                  cwd=SCRIPTS_DIR, env=env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        server.stdout.readline()  # listening, every station loaded
+        startup = time.perf_counter() - start
+        try:
+            checked, mismatches = check_rows(port)
+
+            # one train's mix: loading the files itself vs asking the server
+            mix = query_mix(12, seed=7)
+            own_load = float(subprocess.run([sys.executable, "-c", CHILD, json.dumps(mix), RDF_DIR], cwd=SCRIPTS_DIR,
+                                            env=env, stdout=subprocess.PIPE, check=True).stdout)
+            start = time.perf_counter()
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=300)
+            for name, query in mix:
+                post(connection, name, query)
+            connection.close()
+            via_server = time.perf_counter() - start
+
+            levels = []
+            for trains in (int(n) for n in args.trains.split(",")):
+                elapsed, samples, errors = run_trains(port, trains, args.queries)
+                levels.append({"trains": trains, "queries": len(samples), "errors": len(errors),
+                               "qps": len(samples) / elapsed,
+                               "p50_ms": percentile(samples, 50) * 1e3, "p90_ms": percentile(samples, 90) * 1e3,
+                               "p99_ms": percentile(samples, 99) * 1e3, "max_ms": samples[-1] * 1e3})
+        finally:
+            server.terminate()
+            server.wait()
+
+    if args.json:
+        print(json.dumps({"startup_s": startup, "checked": checked, "mismatches": mismatches,
+                          "train_own_load_s": own_load, "train_via_server_s": via_server, "levels": levels}, indent=2))
+    else:
+        print(f"server startup (all stations, cold graph cache): {startup:.2f} s")
+        print(f"rows checked against in-process stations: {checked} queries, {mismatches} mismatches")
+        print(f"one train, {len(mix)} queries: loading the files itself (warm graph cache) {own_load:.2f} s, via the server "
+              f"{via_server * 1e3:.1f} ms")
+        print(f"{'trains':>7}{'queries':>9}{'errors':>8}{'q/s':>9}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+        for level in levels:
+            print(f"{level['trains']:>7}{level['queries']:>9}{level['errors']:>8}{level['qps']:>9.0f}"
+                  f"{level['p50_ms']:>9.2f}{level['p90_ms']:>9.2f}{level['p99_ms']:>9.2f}{level['max_ms']:>9.2f}")
+    sys.exit(1 if mismatches or any(level["errors"] for level in levels) else 0)
@@ -0,0 +1,89 @@
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+# Subject pivot of ?subject ?predicate ?object rows: the linear scan the
+# scripts used (quadratic in the result size) vs scripts/triple_pivot.py.
+# Triples are synthetic reports with a random subset of predicates, some
+# multi-valued, in shuffled order. Where the scan still finishes, both
+# frames are checked to be equal.
+#
+#   python benchmarks/triple_pivot_scaling.py --sizes 10000 100000 1000000
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, "scripts"))
+
+import pandas as pd  # noqa: E402
+from triple_pivot import pivot_triples  # noqa: E402
+
+EX = "http://example.org/"
+PREDICATES = [f"{EX}attribute_{a}" for a in range(16)]
+
+
+def make_triples(count, seed=7):
+    rng = random.Random(seed)
+    triples = []
+    report = 0
+    while len(triples) < count:
+        subject = f"{EX}report/{report}"
+        for predicate in rng.sample(PREDICATES, rng.randint(4, len(PREDICATES))):
+            for _ in range(2 if rng.random() < 0.05 else 1):
+                triples.append((subject, predicate, f"value {report} {rng.random():.6f}"))
+        report += 1
+    del triples[count:]
+    # keep most of the subject grouping a triple store returns, but not all
+    for _ in range(count // 20):
+        i, j = rng.randrange(count), rng.randrange(count)
+        triples[i], triples[j] = triples[j], triples[i]
+    return triples
+
+
+def legacy_pivot(triples):
+    rdf_records = []
+    for subj_str, pred_str, obj_str in triples:
+        pred_str = pred_str.split("/")[-1]
+        record = next((r for r in rdf_records if r.get('subject') == subj_str), None)
+        if record is None:
+            record = {'subject': subj_str}
+            rdf_records.append(record)
+        record[pred_str] = obj_str
+    return pd.DataFrame(rdf_records).drop(columns="subject")
+
+
+def timed(pivot, triples):
+    start = time.perf_counter()
+    df = pivot(triples)
+    return df, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Linear-scan vs hash-indexed subject pivot")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--legacy-max", type=int, default=20000, help="largest size to run the linear scan on")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+
+    results = []
+    for size in args.sizes:
+        triples = make_triples(size)
+        df, seconds = timed(pivot_triples, triples)
+        result = {"triples": size, "subjects": len(df), "columns": len(df.columns), "pivot_s": seconds,
+                  "pivot_us_per_triple": seconds / size * 1e6, "legacy_s": None, "same_frame": None}
+        if size <= args.legacy_max:
+            legacy_df, result["legacy_s"] = timed(legacy_pivot, triples)
+            result["same_frame"] = legacy_df.equals(df) and list(legacy_df.columns) == list(df.columns)
+        results.append(result)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'triples':>10}{'subjects':>10}{'pivot s':>10}{'us/triple':>11}{'scan s':>10}{'same':>6}")
+        for r in results:
+            legacy = f"{r['legacy_s']:>10.2f}" if r["legacy_s"] is not None else f"{'-':>10}"
+            same = "-" if r["same_frame"] is None else ("yes" if r["same_frame"] else "NO")
+            print(f"{r['triples']:>10}{r['subjects']:>10}{r['pivot_s']:>10.2f}{r['pivot_us_per_triple']:>11.2f}"
+                  f"{legacy}{same:>6}")
+    sys.exit(1 if any(r["same_frame"] is False for r in results) else 0)
@@ -0,0 +1,173 @@
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+
+# Drug and outcome aggregation of extractVigi_RDF.py on synthetic VigiLyze
+# sets: the iterrows() mapping and the dict-of-sets aggregation the script
+# used, against vigi_aggregation's column-wise explode and groupby counts.
+# Reports have 1-4 drug and 1-3 reaction lines, cells of unequal line counts
+# (padding), ";"-joined drugs, roles and outcomes in mixed case and spacing,
+# NaN cells and repeated report IDs. Each size goes through the ATC filter and
+# both aggregations; the JSON written from both must be the same, ID lists
+# included. (Reports without an ID are left out: whether the loop took them
+# for one report depended on the pandas version.)
+#
+#   python benchmarks/vigi_aggregation_scaling.py --sizes 10000,100000,1000000
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS_DIR = os.path.join(ROOT_DIR, "scripts")
+sys.path.insert(0, SCRIPTS_DIR)
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+from lareb_linkage_scaling import PREFERRED_TERMS, atc_names  # noqa: E402
+from vigi_aggregation import aggregate_drugs, aggregate_outcomes, any_line_in, explode_multiline  # noqa: E402
+
+DRUG_COLUMNS = ["WHODrug_active_ingredient_variant", "Role", "Action_taken_with_drug"]
+OUTCOME_COLUMNS = ["Mapped_term", "MedDRA_preferred_term", "Outcome"]
+ROLES = ["Suspect", "Concomitant", "Interacting", "suspect ", " CONCOMITANT", "Drug not administered"]
+ACTIONS = ["Drug withdrawn", "Dose not changed", "Dose reduced", "Unknown", "Not applicable", " drug WITHDRAWN"]
+OUTCOMES = ["Recovered/resolved", "Not recovered/not resolved", "Recovering/resolving", "Unknown", "Fatal",
+            "recovered/resolved "]
+
+
+def synthesize(size, pool_size=50000, seed=0):
+    # size reports drawn from a pool of distinct ones, with their own IDs
+    rng = random.Random(seed)
+    drugs = atc_names()
+
+    def lines(count, choices, nan_share=0.05):
+        if rng.random() < nan_share:
+            return np.nan
+        return "\n".join(rng.choice(choices) for _ in range(count))
+
+    pool = {column: [] for column in DRUG_COLUMNS + OUTCOME_COLUMNS}
+    for _ in range(pool_size):
+        n_drugs = rng.randint(1, 4)
+        drug_lines = [rng.choice(drugs).title() if rng.random() < 0.8
+                      else f"{rng.choice(drugs).lower()}; {rng.choice(drugs)} " for _ in range(n_drugs)]
+        pool["WHODrug_active_ingredient_variant"].append("\n".join(drug_lines))
+        pool["Role"].append(lines(max(1, n_drugs + rng.choice([0, 0, 0, -1, 1])), ROLES))
+        pool["Action_taken_with_drug"].append(lines(max(1, n_drugs + rng.choice([0, 0, -1])), ACTIONS, 0.2))
+        n_reactions = rng.randint(1, 3)
+        pool["Mapped_term"].append(lines(n_reactions, PREFERRED_TERMS))
+        pool["MedDRA_preferred_term"].append(lines(n_reactions + rng.choice([0, 0, 0, 1]), PREFERRED_TERMS))
+        pool["Outcome"].append(lines(max(1, n_reactions + rng.choice([0, 0, -1, 1])), OUTCOMES, 0.1))
+
+    picks = np.random.default_rng(seed).integers(0, pool_size, size)
+    frame = {column: np.array(values, dtype=object)[picks] for column, values in pool.items()}
+    ids = np.array([f"1-{i + 1000}" for i in range(size)], dtype=object)
+    repeated = np.random.default_rng(seed + 1).random(size)
+    ids[repeated < 0.01] = ids[np.random.default_rng(seed + 2).integers(0, size, int((repeated < 0.01).sum()))]
+    frame = dict(UMC_report_ID=ids, **frame)
+    return pd.DataFrame(frame), {drug.lower() for drug in rng.sample(drugs, len(drugs) // 3)}
+
+
+# the loops extractVigi_RDF.py ran
+
+def map_multiline_columns(df, columns, delimiter='\n'):
+    mapped_by_id = {}
+    for idx, row in df.iterrows():
+        row_id = row.get("UMC_report_ID", f"Row_{idx}")
+        split_columns = {
+            col: str(row[col]).split(delimiter) if pd.notna(row[col]) else []
+            for col in columns
+        }
+        max_len = max(len(vals) for vals in split_columns.values())
+        for col in columns:
+            if len(split_columns[col]) < max_len:
+                split_columns[col] += [None] * (max_len - len(split_columns[col]))
+        mapped_by_id[row_id] = [{col.lower(): split_columns[col][i] for col in columns} for i in range(max_len)]
+    return mapped_by_id
+
+
+def legacy_drugs(mapped_data):
+    aggregation = defaultdict(lambda: {"count": 0, "ID": set()})
+    for patient_id, entries in mapped_data.items():
+        seen_in_this_patient = set()
+        for entry in entries:
+            drugs = (entry.get("whodrug_active_ingredient_variant") or "").strip().lower()
+            role = (entry.get("role") or "").strip().lower()
+            action = (entry.get("action_taken_with_drug") or "").strip().lower()
+            drug_list = [d.strip() for d in drugs.split(";") if d.strip()]
+            if role not in {"suspect", "concomitant"}:
+                continue
+            for drug in drug_list:
+                key = (drug.strip().lower(), role, action)
+                if key in seen_in_this_patient:
+                    continue
+                seen_in_this_patient.add(key)
+                aggregation[key]["count"] += 1
+                aggregation[key]["ID"].add(patient_id)
+    return [{"drug": drug, "role": role, "count": data["count"], "actions": [action] if action else [],
+             "ID": list(data["ID"])} for (drug, role, action), data in aggregation.items()]
+
+
+def legacy_outcomes(mapped_data):
+    aggregation = defaultdict(lambda: {"count": 0, "ID": set()})
+    for patient_id, entries in mapped_data.items():
+        seen_in_this_patient = set()
+        for entry in entries:
+            reaction = (entry.get("mapped_term") or "").strip().lower()
+            result = (entry.get("outcome") or "").strip().lower()
+            key = (reaction, result)
+            if key in seen_in_this_patient:
+                continue
+            seen_in_this_patient.add(key)
+            aggregation[key]["count"] += 1
+            aggregation[key]["ID"].add(patient_id)
+    return [{"reaction": reaction, "result": result, "count": data["count"], "ID": list(data["ID"])}
+            for (reaction, result), data in aggregation.items()]
+
+
+def legacy(df, atc_values):
+    def contains_matching_atc(cell):
+        return any(line.strip().lower() in atc_values for line in str(cell).split('\n'))
+
+    filtered_df = df[df["WHODrug_active_ingredient_variant"].apply(contains_matching_atc)]
+    drugs = legacy_drugs(map_multiline_columns(filtered_df, DRUG_COLUMNS))
+    outcomes = legacy_outcomes(map_multiline_columns(filtered_df, OUTCOME_COLUMNS))
+    return {"drugs": drugs, "outcomes": outcomes, "recordsUsed": len(filtered_df)}
+
+
+def vectorised(df, atc_values):
+    filtered_df = df[any_line_in(df["WHODrug_active_ingredient_variant"], atc_values)]
+    drugs = aggregate_drugs(explode_multiline(filtered_df, DRUG_COLUMNS))
+    outcomes = aggregate_outcomes(explode_multiline(filtered_df, OUTCOME_COLUMNS))
+    return {"drugs": drugs, "outcomes": outcomes, "recordsUsed": len(filtered_df)}
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="iterrows/dict aggregation vs vectorised VigiLyze aggregation")
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="comma-separated report counts")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    results = []
+    for size in (int(n) for n in args.sizes.split(",")):
+        df, atc_values = synthesize(size)
+        new_s, new = timed(vectorised, df, atc_values)
+        legacy_s, old = timed(legacy, df, atc_values)
+        results.append({"reports": size, "used": new["recordsUsed"], "drug_keys": len(new["drugs"]),
+                        "outcome_keys": len(new["outcomes"]), "legacy_s": legacy_s, "vectorised_s": new_s,
+                        "identical": json.dumps(old, ensure_ascii=False) == json.dumps(new, ensure_ascii=False)})
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'reports':>9}{'used':>9}{'drugs':>7}{'outcomes':>10}{'loop s':>9}{'vector s':>10}{'speedup':>9}"
+              f"{'identical':>11}")
+        for r in results:
+            print(f"{r['reports']:>9}{r['used']:>9}{r['drug_keys']:>7}{r['outcome_keys']:>10}{r['legacy_s']:>9.2f}"
+                  f"{r['vectorised_s']:>10.2f}{r['legacy_s'] / r['vectorised_s']:>8.0f}x{str(r['identical']):>11}")
+    sys.exit(0 if all(r["identical"] for r in results) else 1)
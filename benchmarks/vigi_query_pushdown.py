@@ -0,0 +1,131 @@
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+
+# extractVigi_RDF.py's fetch of a VigiLyze station: the full triple dump the
+# extract_vigi_data query was, pivoted and then filtered on the ADR drugs,
+# vs the query with the drugs bound (#@param drug_name), which returns only
+# the reports whose drug column contains one of them. The station is a
+# synthetic ViData-like file (the reports of vigi_aggregation_scaling plus
+# free-text columns, ViData has some 45 per report) on the rdflib backend.
+# Each mode runs in a fresh process; the time and RSS growth are taken after
+# the file is loaded, so they belong to the query, pivot, the reindex to the
+# declared VigiLyze columns (with_vigi_columns, as extractVigi_RDF.py does)
+# and the filter. Both modes must keep the same reports, cell for cell.
+# The query is still evaluated over the loaded station, so the pushdown's
+# time grows with the station size; the gain is a constant factor.
+#
+#   python benchmarks/vigi_query_pushdown.py --reports 2000,20000 --drugs 2
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS_DIR = os.path.join(ROOT_DIR, "scripts")
+ODRL_DIR = os.path.join(ROOT_DIR, "src", "main", "resources", "ODRL")
+QUERY_FILE = os.path.join(ODRL_DIR, "data", "extract_vigi_data.txt")
+sys.path.insert(0, SCRIPTS_DIR)
+sys.path.insert(0, ODRL_DIR)
+
+from engine.query_templates import compile_template  # noqa: E402
+from rdf_writer import write_frame  # noqa: E402
+from vigi_aggregation_scaling import synthesize  # noqa: E402
+
+FULL_DUMP = """PREFIX ex: <http://example.org/>
+SELECT ?subject ?predicate ?object
+WHERE {
+    ?subject ?predicate ?object .
+    OPTIONAL {
+        ?subject ?predicate ?object .
+    }
+}"""
+
+CHILD = """
+import hashlib, json, resource, sys, time
+sys.path.insert(0, sys.argv[1])
+path, query, drugs = sys.argv[2], sys.argv[3], set(json.loads(sys.argv[4]))
+from sparql_backend import open_station
+from triple_pivot import pivot_triples
+from vigi_aggregation import any_line_in, with_vigi_columns
+
+def clean_text(x):
+    return x if x != x else str(x).replace('_x000D_', '').strip()
+
+station = open_station(path, format="nt", backend="rdflib")
+station.preload()
+rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+triples = list(station.select(query, ("subject", "predicate", "object")))
+df = with_vigi_columns(pivot_triples(triples)).map(clean_text)
+kept = df[any_line_in(df["WHODrug_active_ingredient_variant"].astype(str).map(clean_text), drugs)]
+elapsed = time.perf_counter() - start
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+kept = kept[sorted(kept.columns)].sort_values("Safety_report_ID").reset_index(drop=True)
+print(json.dumps({"seconds": elapsed, "triples": len(triples), "kept": len(kept), "rss_growth_kb": rss - rss_before,
+                  "digest": hashlib.sha1(kept.to_json().encode("utf-8")).hexdigest()}))
+"""
+
+
+def station_file(directory, reports, free_text=36, seed=0):
+    # the synthetic reports as N-Triples, one subject per report
+    df, _ = synthesize(reports, pool_size=min(reports, 50000), seed=seed)
+    df["Safety_report_ID"] = [f"random-{i}" for i in range(len(df))]
+    for k in range(free_text):
+        df[f"Field_{k}"] = [f"value {i} {k} some free text" for i in range(len(df))]
+    path = os.path.join(directory, f"vigi_{reports}.nt")
+    write_frame(df, path, "http://example.org/Sheet1_row/", "http://example.org/", format="nt")
+    return path
+
+
+def case_drugs(path, count, seed=0):
+    # count drug names taken from the reports' drug lines
+    with open(path, encoding="utf-8") as f:
+        lines = {line.strip().lower()
+                 for triple in f if "/WHODrug_active_ingredient_variant>" in triple
+                 for line in triple.split('"', 1)[1].rsplit('"', 1)[0].split("\\n") if ";" not in line}
+    return sorted(random.Random(seed).sample(sorted(lines), count))
+
+
+def measure(path, query, drugs, cache_dir):
+    env = dict(os.environ, RESULT_CACHE_MAX_BYTES="0", GRAPH_CACHE_DIR=cache_dir)
+    out = subprocess.run([sys.executable, "-c", CHILD, SCRIPTS_DIR, path, query, json.dumps(drugs)],
+                         stdout=subprocess.PIPE, check=True, env=env).stdout
+    return json.loads(out)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Full VigiLyze dump + local filter vs the drug-bound query")
+    parser.add_argument("--reports", default="2000,20000", help="comma-separated report counts")
+    parser.add_argument("--drugs", type=int, default=2, help="drug names in the ADR case")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+
+    with open(QUERY_FILE, encoding="utf-8") as f:
+        template = compile_template("extract_vigi_data.txt", f.read())
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="vigi-query-pushdown-") as directory:
+        for reports in (int(n) for n in args.reports.split(",")):
+            path = station_file(directory, reports)
+            drugs = case_drugs(path, args.drugs)
+            pushdown = template.bind({"drug_name": drugs}).text
+            result = {"reports": reports, "drugs": drugs}
+            for mode, query in (("full", FULL_DUMP), ("pushdown", pushdown)):
+                result[mode] = measure(path, query, drugs, os.path.join(directory, "graph-cache"))
+            result["identical"] = result["full"]["digest"] == result["pushdown"]["digest"]
+            result["speedup"] = result["full"]["seconds"] / result["pushdown"]["seconds"]
+            results.append(result)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'reports':>8}{'kept':>7}{'mode':>10}{'triples':>10}{'seconds':>9}{'RSS growth MB':>15}"
+              f"{'identical':>11}{'speedup':>9}")
+        for r in results:
+            for mode in ("full", "pushdown"):
+                m = r[mode]
+                print(f"{r['reports']:>8}{m['kept']:>7}{mode:>10}{m['triples']:>10}{m['seconds']:>9.2f}"
+                      f"{m['rss_growth_kb'] / 1024:>15.1f}{str(r['identical']):>11}"
+                      f"{r['speedup'] if mode == 'pushdown' else 1:>8.1f}x")
+    sys.exit(0 if all(r["identical"] for r in results) else 1)
@@ -0,0 +1,167 @@
+from typing import Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from graph_cache import URI, GraphRegistry, load_encoded
+
+# Dictionary-encoded triple store for the SIDER/MedDRA stations. Every term is
+# interned once to an integer id (the ids of its graph cache entry) and the
+# triples are kept as NumPy arrays in two sort orders, by (subject,
+# predicate) and by (predicate, object). Looking up the side effects of a set
+# of drugs, or the drugs of a UMLS code, is a binary search over one of them
+# rather than a walk over rdflib's per-term Python objects.
+#
+# Rows are returned in the column order the train reads them in, with the
+# values the station's SPARQL queries produce (DISTINCT, UMLS IRIs reduced to
+# their code). Row order may differ from rdflib's.
+#
+# The lookups reimplement particular query templates. TEMPLATES lists, per
+# lookup, the sha256 of the query files it reproduces (the granted query's
+# X-Query-Template-Fingerprint); a query granted from any other template,
+# e.g. after a policy's query changed, must run on a SPARQL backend instead.
+
+RDFS_LABEL = "http://www.w3.org/2000/01/rdf-schema#label"
+HAS_SIDE_EFFECT = "http://example.org/hasSideEffect"
+HAS_FREQUENCY = "http://example.org/hasFrequency"
+HAS_INDICATION = "http://example.org/hasIndication"
+SIDE_EFFECT = "http://example.org/sideEffect"
+DRUG = "http://identifiers.org/pubchem.compound/"
+UMLS = "http://linkedlifedata.com/resource/umls/id/"
+
+_EMPTY = np.zeros(0, dtype=np.int64)
+
+TEMPLATES = {
+    "side_effect_labels": {
+        "5dda8c7a8360107e86d4791926ca7057c48b1ca1a818b68f44ed334a2fce902d",  # extract_meddra_labels_suspect.txt
+        "f773eac676fd7b825ce7ecbc40cf0d6766e59c39954574325c887e0a02a6810b",  # extract_meddra_labels_concomitant.txt
+    },
+    "frequencies": {
+        "e1308ca43e99cbe106f23d783c3db773e428d2927fa05d7d656f514c2ce4cdf3",  # extract_meddra_freq_suspect.txt
+        "5b1c41b4c20c7fde4f32c1c9ac2ceec1f49abe5c2767cf85c3782a759159532d",  # extract_meddra_freq_concomitant.txt
+    },
+    "indications": {
+        "6bb9dbbe6e67b116bd283610824002fd9594eacf19da264de0dad4f712b445c6",  # extract_meddra_indication_suspect.txt
+        "5cfbe69757964091baf62df72a638abd70ab23d660d7d379326ebb45ed29b791",  # extract_meddra_indication_concomitant.txt
+    },
+}
+
+
+def implements(lookup: str, template_fingerprint: Optional[str]) -> bool:
+    # whether the lookup gives the rows of a query granted from this template
+    return template_fingerprint in TEMPLATES.get(lookup, ())
+
+
+def _umls_code(iri: str) -> str:
+    # STRAFTER(STR(?uml), UMLS)
+    return iri[len(UMLS):] if iri.startswith(UMLS) else ""
+
+
+class ColumnarStore:
+
+    def __init__(self, terms: Sequence[tuple], packed: bytes):
+        self.values: List[str] = [value for _, value, _, _ in terms]
+        self._uri_ids = {value: i for i, (kind, value, _, _) in enumerate(terms) if kind == URI}
+
+        spo = np.frombuffer(packed, dtype=np.uint32).reshape(-1, 3)
+        s, p, o = (spo[:, i].astype(np.uint64) for i in range(3))
+        sp = (s << np.uint64(32)) | p
+        order = np.argsort(sp, kind="stable")
+        self._sp_keys = sp[order]
+        self._sp_objects = spo[order, 2].astype(np.int64)
+        po = (p << np.uint64(32)) | o
+        order = np.argsort(po, kind="stable")
+        self._po_keys = po[order]
+        self._po_subjects = spo[order, 0].astype(np.int64)
+
+    @classmethod
+    def load(cls, path: str, format: str = "turtle") -> "ColumnarStore":
+        return cls(*load_encoded(path, format))
+
+    def __len__(self) -> int:
+        return len(self._sp_keys)
+
+    @property
+    def nbytes(self) -> int:
+        # size of the triple arrays (the term strings come on top)
+        return sum(a.nbytes for a in (self._sp_keys, self._sp_objects, self._po_keys, self._po_subjects))
+
+    def uri_id(self, uri: str) -> Optional[int]:
+        return self._uri_ids.get(uri)
+
+    @staticmethod
+    def _ranges(keys: np.ndarray, values: np.ndarray, wanted: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        # All values under each wanted key: (index into wanted, value) pairs
+        lo = np.searchsorted(keys, wanted, side="left")
+        hi = np.searchsorted(keys, wanted, side="right")
+        counts = hi - lo
+        index = np.repeat(np.arange(len(wanted)), counts)
+        starts = np.repeat(lo - (np.cumsum(counts) - counts), counts)
+        return index, values[np.arange(counts.sum()) + starts]
+
+    def join(self, subjects: np.ndarray, predicate: Optional[int]) -> Tuple[np.ndarray, np.ndarray]:
+        # ?s predicate ?o for every id in subjects: (index into subjects, ?o)
+        if predicate is None or not len(subjects):
+            return _EMPTY, _EMPTY
+        keys = (subjects.astype(np.uint64) << np.uint64(32)) | np.uint64(predicate)
+        return self._ranges(self._sp_keys, self._sp_objects, keys)
+
+    def subjects(self, predicate: Optional[int], obj: Optional[int]) -> np.ndarray:
+        # ?s predicate obj, e.g. the drugs listing one UMLS code
+        if predicate is None or obj is None:
+            return _EMPTY
+        key = np.array([(predicate << 32) | obj], dtype=np.uint64)
+        return self._ranges(self._po_keys, self._po_subjects, key)[1]
+
+    def _drugs(self, drug_ids: Iterable[str]) -> Tuple[List[str], np.ndarray]:
+        # (drug ids present in the station, their term ids)
+        found = [(drug_id, self.uri_id(DRUG + drug_id)) for drug_id in drug_ids]
+        found = [(drug_id, i) for drug_id, i in found if i is not None]
+        return [drug_id for drug_id, _ in found], np.array([i for _, i in found], dtype=np.int64)
+
+    def _distinct(self, columns: Sequence[np.ndarray], convert: Sequence) -> List[tuple]:
+        values = self.values
+        rows = zip(*(map(fn, (values[i] for i in column.tolist())) for fn, column in zip(convert, columns)))
+        return list(dict.fromkeys(rows))
+
+    def side_effect_labels(self, drug_ids: Iterable[str]) -> List[tuple]:
+        # (drug_id, se, umls) as extract_meddra_labels_*
+        names, drugs = self._drugs(drug_ids)
+        d, umls = self.join(drugs, self.uri_id(HAS_SIDE_EFFECT))
+        u, labels = self.join(umls, self.uri_id(RDFS_LABEL))
+        return [(names[i], se, code) for i, se, code in
+                self._distinct((drugs[d[u]], labels, umls[u]), (self._drug_index(drugs), str, _umls_code))]
+
+    def frequencies(self, drug_ids: Iterable[str]) -> List[tuple]:
+        # (drug_id, se, umls, freq) as extract_meddra_freq_*
+        names, drugs = self._drugs(drug_ids)
+        d, freq_nodes = self.join(drugs, self.uri_id(HAS_FREQUENCY))
+        f, freqs = self.join(freq_nodes, self.uri_id(RDFS_LABEL))
+        e, umls = self.join(freq_nodes[f], self.uri_id(SIDE_EFFECT))
+        u, labels = self.join(umls, self.uri_id(RDFS_LABEL))
+        rows = self._distinct((drugs[d[f[e[u]]]], labels, umls[u], freqs[e[u]]),
+                              (self._drug_index(drugs), str, _umls_code, str))
+        return [(names[i], se, code, freq) for i, se, code, freq in rows]
+
+    def indications(self, drug_ids: Iterable[str]) -> List[tuple]:
+        # (drug_id, indication, uml_codes) as extract_meddra_indication_*
+        names, drugs = self._drugs(drug_ids)
+        d, umls = self.join(drugs, self.uri_id(HAS_INDICATION))
+        u, labels = self.join(umls, self.uri_id(RDFS_LABEL))
+        return [(names[i], indication, code) for i, indication, code in
+                self._distinct((drugs[d[u]], labels, umls[u]), (self._drug_index(drugs), str, _umls_code))]
+
+    def drugs_with(self, umls_code: str, predicate: str = HAS_SIDE_EFFECT) -> List[str]:
+        # PubChem ids of the drugs that have a UMLS code as side effect (or
+        # indication, with predicate=HAS_INDICATION)
+        subjects = self.subjects(self.uri_id(predicate), self.uri_id(UMLS + umls_code))
+        return [self.values[i][len(DRUG):] for i in subjects.tolist() if self.values[i].startswith(DRUG)]
+
+    def _drug_index(self, drugs: np.ndarray):
+        # maps a drug IRI back to its position in the requested ids
+        position = {self.values[i]: n for n, i in enumerate(drugs.tolist())}
+        return position.__getitem__
+
+
+class ColumnarRegistry(GraphRegistry):
+    # One ColumnarStore per station file, built once on first use
+
+    def __init__(self):
+        super().__init__(ColumnarStore.load)
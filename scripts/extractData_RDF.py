@@ -2,73 +2,24 @@ import json
 import os
 import sys
 import pandas as pd
-from fuzzywuzzy import fuzz
-from rdflib import Graph, Literal, Namespace, URIRef
-import requests
-
-# --- ODRL request ---
-def send_odrl_request(url: str, odrl_payload: str) -> str:
-
-    # Sends an ODRL request to the given endpoint and returns the result as a string.
-    try:
-        headers = {"Content-Type": "text/turtle"}
-        response = requests.post(url, data=odrl_payload, headers=headers)
-
-        if response.status_code == 200:
-            return response.text
-        else:
-            return f"Error {response.status_code}: {response.text}"
-
-    except requests.exceptions.RequestException as e:
-        return f"🚨 An error occurred: {e}"
-    
+from match_index import match_incremental
+from odrl_client import request_query
+from rdf_writer import write_frame
+from sparql_backend import open_station
+from triple_pivot import pivot_triples
+
 rdf_file = sys.argv[1]
 ttl_file = sys.argv[2]
 
 os.makedirs("Output", exist_ok=True)
-g = Graph()
-g.parse(ttl_file, format="turtle")
-
-
-endpoint = "http://localhost:6060/api/analysis/odrl-execute"
-odrl_data = """
-@prefix odrl:   <http://www.w3.org/ns/odrl/2/> .
-@prefix ex:     <http://example.org/> .
-
-<http://example.org/request:se-query>
-    a odrl:Request ;
-    odrl:uid <https://www.wikidata.org/wiki/Q25670> ;
-    odrl:profile <https://www.wikidata.org/wiki/Q4382010> ;
-
-    odrl:permission [
-        odrl:target <http://example.org/graph/extract_l_data> ;
-        odrl:assignee ex:researcher ;
-        odrl:action odrl:read
-
-    ] .
-"""
-query = send_odrl_request(endpoint, odrl_data)
-results = g.query(query)
-sparql_json = json.loads(results.serialize(format='json').decode('utf-8'))
-rdf_records = []
-for binding in sparql_json["results"]["bindings"]:
-    subj_str = binding["subject"]["value"]
-    pred_str = binding["predicate"]["value"].split("/")[-1]
-    obj_str = binding["object"]["value"]
-    
-    # Find if the subject already exists in rdf_records
-    record = next((r for r in rdf_records if r.get('subject') == subj_str), None)
-    
-    # If subject is found, update the record, else create a new one
-    if record is None:
-        record = {'subject': subj_str}  
-        rdf_records.append(record)
-    
-    record[pred_str] = obj_str
-
-# Create DataFrame and ensure key column exists
-df = pd.DataFrame(rdf_records)
-df = df.drop(columns="subject")
+station = open_station(ttl_file)
+
+
+query = request_query("http://example.org/graph/extract_l_data")
+results = station.select(query, ("subject", "predicate", "object"))
+
+# One row per subject, one column per predicate, and ensure key column exists
+df = pivot_triples(results)
 
 key_column = 'WorldwideUniqueCaseIdentification'
 if key_column not in df.columns:
@@ -101,53 +52,25 @@ compare_columns = [
     'Medical_history_PT'
 ]
 
-# match data from Lareb database with the ADR data
-matched_excel_rows = []
-for _, json_row in df_json.iterrows():
-    for _, excel_row in final_excel_df.iterrows():
-        match_score = 0
-        valid_comparisons = 0
-        
-        for col in compare_columns:
-            json_val = str(json_row.get(col, "unknown"))
-            excel_val = str(excel_row.get(col, "unknown"))
-            
-            # Skip if either value is unknown/empty
-            if json_val.lower() == "unknown" or excel_val.lower() == "unknown":
-                continue
-            if not json_val.strip() or not excel_val.strip():
-                continue
-            
-            valid_comparisons += 1
-            if fuzz.token_set_ratio(json_val, excel_val) >= 70:
-                match_score += 1
-        
-        # Require at least 2 valid comparisons and >80% match rate
-        if valid_comparisons >= 2 and match_score / valid_comparisons >= 0.8:
-            matched_excel_rows.append(excel_row.copy())
+# match data from Lareb database with the ADR data: at least 2 valid
+# comparisons, >=80% of them scoring >= 70 (record_linkage.py); records
+# unchanged since a run against the same ADR data keep their earlier
+# decisions (match_index.py)
+matches = match_incremental(df_json, final_excel_df, compare_columns, key_column)
+matched_excel_rows = final_excel_df.iloc[[excel_pos for _, excel_pos in matches]]
 
 json_aligned[key_column] = df_json['ID']
 
 # Combine results
 output_df = pd.concat([
     json_aligned,
-    pd.DataFrame(matched_excel_rows).drop_duplicates()
+    matched_excel_rows.drop_duplicates()
 ], ignore_index=True)
 
-output_graph = Graph()
-BASE = Namespace("http://example.org/")  
-output_graph.bind("ex", BASE)  
-
-for idx, row in output_df.iterrows():
-    subj = URIRef(f"{BASE}row/{idx + 1}")
-    for col in output_df.columns:
-        val = row[col]
-        if pd.isna(val) or str(val).strip().lower() == "unknown":
-            continue
-        pred = URIRef(f"{BASE}{col.strip().replace(' ', '_')}")
-        output_graph.add((subj, pred, Literal(str(val))))
-
-output_graph.serialize(destination="Output/extractDataFromL.ttl", format="turtle")
+# Stream the rows out as Turtle, ex:row/<n> per row and one literal per
+# known cell (rdf_writer.py)
+BASE = "http://example.org/"
+write_frame(output_df, "Output/extractDataFromL.ttl", f"{BASE}row/", BASE, format="turtle", prefix="ex")
 
 with open("Output/ADRDataRecords.json", "w") as meta_file:
     json.dump({"records": len(matched_excel_rows)}, meta_file, indent=2)
\ No newline at end of file
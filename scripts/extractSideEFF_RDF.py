@@ -2,24 +2,11 @@ from collections import defaultdict
 import json
 import os
 import sys
-from rdflib import Graph
-import requests
-
-# --- ODRL request ---
-def send_odrl_request(url: str, odrl_payload: str) -> str:
-    # Sends an ODRL request to the given endpoint and returns the result as a string.
-    try:
-        headers = {"Content-Type": "text/turtle"}
-        response = requests.post(url, data=odrl_payload, headers=headers)
-
-        if response.status_code == 200:
-            return response.text
-        else:
-            return f"Error {response.status_code}: {response.text}"
+import threading
+from odrl_client import request_granted, request_query
+from sparql_backend import StationRegistry
+from task_graph import TaskGraph
 
-    except requests.exceptions.RequestException as e:
-        return f"🚨 An error occurred: {e}"
-    
 drug_names = sys.argv[1]
 meddra_freq = sys.argv[2]
 meddra_all_label_se = sys.argv[3]
@@ -29,41 +16,69 @@ vigiData = sys.argv[6]
 
 os.makedirs("Output", exist_ok=True)
 
-g = Graph()
+# one station per file on the SPARQL_BACKEND engine, loaded at most once
+datasets = StationRegistry()
+# loading and querying hold the GIL, so they take turns instead of slowing
+# each other down; only the ODRL round-trips overlap with them
+rdf_lock = threading.Lock()
+
+# STATION_BACKEND=columnar answers the MedDRA label, frequency and indication
+# steps from a dictionary-encoded store (columnar_store.py, needs numpy)
+# instead of running the granted query over an rdflib graph. The ODRL request
+# is made either way, and a query granted from a template the store does not
+# implement runs on the SPARQL backend.
+STATION_BACKEND = os.environ.get("STATION_BACKEND", "rdflib")
+columnar = STATION_BACKEND == "columnar"
+if columnar:
+    from columnar_store import ColumnarRegistry, implements
+    columnar_stores = ColumnarRegistry()
+
+
+def load_station(ttl_path: str, use_columnar: bool = False):
+    with rdf_lock:
+        if use_columnar:
+            return columnar_stores.get(ttl_path)
+        station = datasets.get(ttl_path)
+        station.preload()
+        return station
+
 
+def select_rows(ttl_path: str, query: str, columns: tuple) -> list:
+    with rdf_lock:
+        return list(datasets.get(ttl_path).select(query, columns))
+
+
+def select_granted(ttl_path: str, target: str, drug_ids: list, lookup: str, columns: tuple) -> list:
+    # Rows of the query granted for target with the drug ids bound, from the
+    # columnar store when it implements the query's template
+    granted = request_granted(target, bindings={"drug_id": drug_ids})
+    if columnar:
+        if implements(lookup, granted.template_fingerprint):
+            return getattr(load_station(ttl_path, True), lookup)(drug_ids)
+        print(f"{target}: the columnar store does not implement query template {granted.template_fingerprint}, "
+              "running the granted query instead", file=sys.stderr)
+    return select_rows(ttl_path, granted.text, columns)
+
+
+# drug_name is not bound: the drug names station lists drugs under its own
+# names (fingolimod only as its code name "FTY720"), so the case's ATC names
+# would match nothing. The query's default VALUES stays until the names are
+# mapped to the station's synonyms.
 def get_drug_id_by_name(drug_name: str, ttl_path: str, suspect: bool):
     found = []
-    g.parse(ttl_path, format="turtle")
  
     target = ""
     if suspect: 
         target = "http://example.org/graph/extract_drug_names_suspect"
     else:
         target = "http://example.org/graph/extract_drug_names_concomitant"
-    endpoint = "http://localhost:6060/api/analysis/odrl-execute"
-    odrl_data = f"""
-    @prefix odrl:   <http://www.w3.org/ns/odrl/2/> .
-    @prefix ex:     <http://example.org/> .
-
-    <http://example.org/request:se-query>
-        a odrl:Request ;
-        odrl:uid <https://www.wikidata.org/wiki/Q25670> ;
-        odrl:profile <https://www.wikidata.org/wiki/Q4382010> ;
-
-        odrl:permission [
-            odrl:target <{target}> ;
-            odrl:assignee ex:researcher ;
-            odrl:action odrl:read
-        ] .
-    """
-    query = send_odrl_request(endpoint, odrl_data)
-    results = g.query(query)
-    
-    sparql_json = json.loads(results.serialize(format="json").decode("utf-8"))
-    for binding in sparql_json["results"]["bindings"]:
+    query = request_query(target)
+    results = select_rows(ttl_path, query, ("id", "name"))
+
+    for drug_id, name in results:
             found.append({
-                "ID": binding["id"]["value"],
-                "name": binding["name"]["value"]
+                "ID": drug_id,
+                "name": name
             })
     return found
  
@@ -88,18 +103,8 @@ def merge_drugs_universal(existing_drugs_str: str, vigi_data: dict, role_type: s
     return ";".join(merged)
  
  
-def check_drug_ids_in_meddra(
-    drug_ids: list,
-    meddra_freq_ttl: str,
-    reactions_str: str,
-    meddra_all_label_se_ttl: str,
-    suspect: bool
-):
-    results = {}
+def get_meddra_labels(drug_ids: list, meddra_all_label_se_ttl: str, suspect: bool):
     reactions = set()
-    # Load RDF graphs
-    g_label = g.parse(meddra_all_label_se_ttl, format="turtle")
-    g_freq = g.parse(meddra_freq_ttl, format="turtle")
 
     target = ""
     if suspect: 
@@ -107,69 +112,39 @@ def check_drug_ids_in_meddra(
     else:
         target = "http://example.org/graph/extract_meddra_labels_concomitant"
 
-    endpoint = "http://localhost:6060/api/analysis/odrl-execute"
-    odrl_data = f"""
-    @prefix odrl:   <http://www.w3.org/ns/odrl/2/> .
-    @prefix ex:     <http://example.org/> .
-
-    <http://example.org/request:se-query>
-        a odrl:Request ;
-        odrl:uid <https://www.wikidata.org/wiki/Q25670> ;
-        odrl:profile <https://www.wikidata.org/wiki/Q4382010> ;
-
-        odrl:permission [
-            odrl:target <{target}> ;
-            odrl:assignee ex:researcher ;
-            odrl:action odrl:read
-
-        ] .
-    """
-    uml_query = send_odrl_request(endpoint, odrl_data)
-    results_labels = g_label.query(uml_query)
-    sparql_json = json.loads(results_labels.serialize(format="json").decode("utf-8"))
+    results_labels = select_granted(meddra_all_label_se_ttl, target, drug_ids, "side_effect_labels",
+                                    ("drug_id", "se", "umls"))
     uml_map = {}
     
-    for binding in sparql_json["results"]["bindings"]:
-        drug_id = binding["drug_id"]["value"]
-        side_effect = binding["se"]["value"].strip().lower()
-        uml_id = binding["umls"]["value"]
+    for drug_id, side_effect, uml_id in results_labels:
+        side_effect = side_effect.strip().lower()
         uml_map.setdefault((drug_id, side_effect), []).append(uml_id)
         reactions.add(side_effect)
 
+    return uml_map, reactions
+
+
+def get_meddra_frequencies(drug_ids: list, meddra_freq_ttl: str, suspect: bool):
+    target = ""
     if suspect: 
         target = "http://example.org/graph/extract_meddra_freq_suspect"
     else:
         target = "http://example.org/graph/extract_meddra_freq_concomitant"
-    endpoint = "http://localhost:6060/api/analysis/odrl-execute"
-    odrl_data = f"""
-    @prefix odrl:   <http://www.w3.org/ns/odrl/2/> .
-    @prefix ex:     <http://example.org/> .
-
-    <http://example.org/request:se-query>
-        a odrl:Request ;
-        odrl:uid <https://www.wikidata.org/wiki/Q25670> ;
-        odrl:profile <https://www.wikidata.org/wiki/Q4382010> ;
-
-        odrl:permission [
-            odrl:target <{target}> ;
-            odrl:assignee ex:researcher ;
-            odrl:action odrl:read
-
-        ] .
-    """
-    freq_query = send_odrl_request(endpoint, odrl_data)
-    results_freq = g_freq.query(freq_query)
-    sparql_json = json.loads(results_freq.serialize(format="json").decode("utf-8"))
+    results_freq = select_granted(meddra_freq_ttl, target, drug_ids, "frequencies", ("drug_id", "se", "umls", "freq"))
 
     freq_map = {}
-    for binding in sparql_json["results"]["bindings"]:
-        drug_id = binding["drug_id"]["value"]
-        side_effect = binding["se"]["value"].strip().lower()
-        uml_id = binding["umls"]["value"]
-        freq = binding["freq"]["value"]
+    for drug_id, side_effect, uml_id, freq in results_freq:
+        side_effect = side_effect.strip().lower()
         # if drug_id in drug_ids and side_effect in reactions:
         freq_map.setdefault((drug_id, side_effect, uml_id), []).append(freq)
 
+    return freq_map
+
+
+def combine_meddra(drug_ids: list, labels, freq_map: dict):
+    results = {}
+    uml_map, reactions = labels
+
     for drug_id in drug_ids:
         for reaction in reactions:
             uml_ids = uml_map.get((drug_id, reaction), [])
@@ -183,6 +158,18 @@ def check_drug_ids_in_meddra(
                 })
  
     return [{"ID": drug_id, "sideEffects": se_list} for drug_id, se_list in results.items()]
+
+
+def check_drug_ids_in_meddra(
+    drug_ids: list,
+    meddra_freq_ttl: str,
+    reactions_str: str,
+    meddra_all_label_se_ttl: str,
+    suspect: bool
+):
+    labels = get_meddra_labels(drug_ids, meddra_all_label_se_ttl, suspect)
+    freq_map = get_meddra_frequencies(drug_ids, meddra_freq_ttl, suspect)
+    return combine_meddra(drug_ids, labels, freq_map)
  
 def format_frequencies(freqs):
     if not freqs:
@@ -211,39 +198,15 @@ def format_frequencies(freqs):
  
  
 def get_drug_side_effects(drug_ids: list, sideEff_ttl: str, suspect: bool):
-        g.parse(sideEff_ttl, format="turtle")
-        drug_filter = " ".join(f'"{id}"' for id in drug_ids)
         target = ""
         if suspect: 
             target = "http://example.org/graph/extract_meddra_indication_suspect"
         else:
             target = "http://example.org/graph/extract_meddra_indication_concomitant"
-        endpoint = "http://localhost:6060/api/analysis/odrl-execute"
-        odrl_data = f"""
-        @prefix odrl:   <http://www.w3.org/ns/odrl/2/> .
-        @prefix ex:     <http://example.org/> .
-
-        <http://example.org/request:se-query>
-            a odrl:Request ;
-            odrl:uid <https://www.wikidata.org/wiki/Q25670> ;
-            odrl:profile <https://www.wikidata.org/wiki/Q4382010> ;
-
-            odrl:permission [
-                odrl:target <{target}> ;
-                odrl:assignee ex:researcher ;
-                odrl:action odrl:read
-
-            ] .
-        """
-        side_eff_query = send_odrl_request(endpoint, odrl_data)
-        results = g.query(side_eff_query)
-        sparql_json = json.loads(results.serialize(format='json').decode('utf-8'))
+        results = select_granted(sideEff_ttl, target, drug_ids, "indications", ("drug_id", "indication", "uml_codes"))
 
         drug_side_effects = {}
-        for binding in sparql_json["results"]["bindings"]:
-            d_id = binding["drug_id"]["value"]
-            indication = binding["indication"]["value"]
-            uml_code = binding["uml_codes"]["value"]
+        for d_id, indication, uml_code in results:
             if d_id in drug_ids:
                 if d_id not in drug_side_effects:
                     drug_side_effects[d_id] = []
@@ -315,29 +278,42 @@ other_reaction_pt = (processed_data[0]["Other_Reported_PTs"]) or ""
 reaction_pts = reaction_pt+";"+other_reaction_pt
  
  
-drug_infos = get_drug_id_by_name(final_suspected_drugs, drug_names, True)
-drug_ids = [info["ID"] for info in drug_infos]
-id_to_name_suspect = {"suspected": {info["ID"]: info["name"] for info in drug_infos}}
-drug_data = check_drug_ids_in_meddra(drug_ids, meddra_freq, reaction_pts, meddra_all_label_se, True)
-drug_data_sideeff = get_drug_side_effects(drug_ids, SideEff, True)
-merged_data_suspects = merge_drug_data_with_side_effects(drug_data, drug_data_sideeff, id_to_name_suspect)
 
-concomitant_infos = ""
-concomitant_ids = ""
-id_to_name_concomitant = {"concomitant": {}}
-concomitant_data = ""
-concomitant_data_sideeff = ""
-merged_data_concomitant = ""
+def add_role_tasks(tasks: TaskGraph, role_key: str, drugs: str, suspect: bool) -> str:
+    # The drug ids come first; labels, frequencies and indications of those
+    # ids are independent of each other
+    names = tasks.add(f"{role_key} drug names", lambda: get_drug_id_by_name(drugs, drug_names, suspect))
+    ids = tasks.add(f"{role_key} drug ids", lambda infos: [info["ID"] for info in infos], names)
+    labels = tasks.add(f"{role_key} meddra labels",
+                       lambda ids: get_meddra_labels(ids, meddra_all_label_se, suspect), ids)
+    freqs = tasks.add(f"{role_key} meddra freq", lambda ids: get_meddra_frequencies(ids, meddra_freq, suspect), ids)
+    indications = tasks.add(f"{role_key} indications", lambda ids: get_drug_side_effects(ids, SideEff, suspect), ids)
+
+    def merge(infos, ids, labels, freq_map, drug_data_sideeff):
+        id_to_name = {role_key: {info["ID"]: info["name"] for info in infos}}
+        drug_data = combine_meddra(ids, labels, freq_map)
+        return merge_drug_data_with_side_effects(drug_data, drug_data_sideeff, id_to_name)
+
+    return tasks.add(f"{role_key} merged", merge, names, ids, labels, freqs, indications)
+
+
+tasks = TaskGraph()
+# Station loads depend on nothing. The query steps do not wait for them as
+# tasks: they send their policy request first and then wait in select_rows
+# until their station is loaded.
+stations = {drug_names: False, meddra_all_label_se: columnar, meddra_freq: columnar, SideEff: columnar}
+for path, use_columnar in stations.items():
+    tasks.add(f"load {path}", lambda path=path, use_columnar=use_columnar: load_station(path, use_columnar))
+
+merged_suspects = add_role_tasks(tasks, "suspected", final_suspected_drugs, True)
+merged_concomitant = None
 if final_concomitant_drugs :
-    concomitant_infos = get_drug_id_by_name(final_concomitant_drugs, drug_names, False)
-    concomitant_ids = [info["ID"] for info in concomitant_infos]
-    id_to_name_concomitant = {"concomitant": {info["ID"]: info["name"] for info in concomitant_infos}}
-    concomitant_data = check_drug_ids_in_meddra(concomitant_ids, meddra_freq, reaction_pts, meddra_all_label_se, False)
-    concomitant_data_sideeff = get_drug_side_effects(concomitant_ids, SideEff, False)
-    merged_data_concomitant = merge_drug_data_with_side_effects(concomitant_data, concomitant_data_sideeff, id_to_name_concomitant)
+    merged_concomitant = add_role_tasks(tasks, "concomitant", final_concomitant_drugs, False)
 
+task_results = tasks.run()
+merged_data_suspects = task_results[merged_suspects]
+merged_data_concomitant = task_results[merged_concomitant] if merged_concomitant else []
 
- 
 # merge the two jsons into one
 final_merged = defaultdict(dict)
  
@@ -349,4 +325,4 @@ for dataset in (merged_data_suspects, merged_data_concomitant):
 final_merged_list = list(final_merged.values())
  
 with open('Output/SideEff.json', 'w', encoding='utf-8') as f:
-    json.dump(final_merged_list, f, ensure_ascii=False, indent=2)
\ No newline at end of file
+    json.dump(final_merged_list, f, ensure_ascii=False, indent=2)
\ No newline at end of file
@@ -0,0 +1,190 @@
+import hashlib
+import marshal
+import os
+import struct
+import threading
+import weakref
+from array import array
+from typing import Callable, List, Optional, Tuple
+from rdflib import BNode, Graph, Literal, URIRef
+
+# Parsed-graph cache for the RDF data stations. The first load of a file runs
+# the rdflib parser and stores the triples in a compact binary form, keyed by
+# the sha256 of the file's content; later loads (in any run) rebuild the graph
+# from that form without parsing Turtle. Editing a station file changes its
+# hash, so a stale entry is never used.
+#
+#   magic "RDFGRAPH" | format version (uint16) | sha256 of the source (32 bytes)
+#   | marshal((terms, triple ids)) where terms is a list of
+#     (kind, value, language, datatype) and triple ids a packed uint32 array
+#
+# The cache lives in GRAPH_CACHE_DIR (default ~/.cache/train-graphs); mount it
+# into the train containers to share it between runs. A cache that cannot be
+# written is skipped and the file is parsed as before.
+
+MAGIC = b"RDFGRAPH"
+CACHE_VERSION = 1
+_HEADER = struct.Struct(">8sH32s")
+
+CACHE_DIR = os.environ.get("GRAPH_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "train-graphs"))
+
+URI, BLANK, LITERAL = 0, 1, 2
+
+# sources already loaded into a graph in this process: {graph: {sha256}}
+_loaded = weakref.WeakKeyDictionary()
+_loaded_lock = threading.Lock()
+
+
+def content_hash(path: str) -> bytes:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def cache_path(source_hash: bytes, format: str, cache_dir: str = CACHE_DIR) -> str:
+    return os.path.join(cache_dir, f"{source_hash.hex()}.{format}.graph")
+
+
+def _encode(term):
+    if isinstance(term, URIRef):
+        return (URI, str(term), None, None)
+    if isinstance(term, BNode):
+        return (BLANK, str(term), None, None)
+    return (LITERAL, str(term), term.language, str(term.datatype) if term.datatype else None)
+
+
+def _decode(kind, value, language, datatype):
+    if kind == URI:
+        return URIRef(value)
+    if kind == BLANK:
+        return BNode(value)
+    return Literal(value, lang=language, datatype=URIRef(datatype) if datatype else None)
+
+
+def encode_graph(graph: Graph) -> Tuple[List[tuple], array]:
+    # (terms, triple ids): every term once, triples as three ids each
+    ids = {}
+    triples = array("I")
+    for triple in graph:
+        for term in triple:
+            triples.append(ids.setdefault(term, len(ids)))
+    terms = [None] * len(ids)
+    for term, i in ids.items():
+        terms[i] = _encode(term)
+    return terms, triples
+
+
+def write_cache(graph: Graph, source_hash: bytes, path: str, encoded: Optional[tuple] = None):
+    terms, triples = encoded or encode_graph(graph)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, CACHE_VERSION, source_hash))
+        f.write(marshal.dumps((terms, triples.tobytes())))
+    os.replace(tmp_path, path)
+
+
+def read_encoded(path: str, source_hash: bytes) -> Optional[Tuple[List[tuple], bytes]]:
+    # (terms, packed triple ids) of a cache entry; None when it is missing,
+    # stale or unreadable
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    if len(data) < _HEADER.size or _HEADER.unpack_from(data) != (MAGIC, CACHE_VERSION, source_hash):
+        return None
+    try:
+        return marshal.loads(memoryview(data)[_HEADER.size:])
+    except (EOFError, ValueError, TypeError):
+        return None
+
+
+def read_cache(path: str, source_hash: bytes, graph: Graph) -> bool:
+    # Adds the cached triples to graph; False when there is no usable entry
+    encoded = read_encoded(path, source_hash)
+    if encoded is None:
+        return False
+    terms, packed = encoded
+
+    nodes = [_decode(*term) for term in terms]
+    triples = array("I")
+    triples.frombytes(packed)
+    it = iter(triples)
+    graph.addN((nodes[s], nodes[p], nodes[o], graph) for s, p, o in zip(it, it, it))
+    return True
+
+
+def load_graph(path: str, graph: Optional[Graph] = None, format: str = "turtle") -> Graph:
+    # Drop-in for graph.parse(path, format=format): returns the graph with
+    # the file's triples added, from the cache when possible
+    if graph is None:
+        graph = Graph()
+    source_hash = content_hash(path)
+
+    # same content already in this graph, e.g. the second pass of a script
+    with _loaded_lock:
+        seen = _loaded.setdefault(graph, set())
+    if source_hash in seen:
+        return graph
+
+    entry = cache_path(source_hash, format)
+    if not read_cache(entry, source_hash, graph):
+        # the entry must hold this file only, so parse into a graph of its own
+        # unless the target is still empty
+        parsed = graph if not len(graph) else Graph()
+        parsed.parse(path, format=format)
+        try:
+            write_cache(parsed, source_hash, entry)
+        except OSError:
+            pass
+        if parsed is not graph:
+            graph += parsed
+    seen.add(source_hash)
+    return graph
+
+
+def load_encoded(path: str, format: str = "turtle") -> Tuple[List[tuple], bytes]:
+    # The file's (terms, packed triple ids), straight from the cache without
+    # building an rdflib graph; a miss parses the file and writes the entry
+    source_hash = content_hash(path)
+    entry = cache_path(source_hash, format)
+    encoded = read_encoded(entry, source_hash)
+    if encoded is not None:
+        return encoded
+    graph = Graph()
+    graph.parse(path, format=format)
+    terms, triples = encode_graph(graph)
+    try:
+        write_cache(graph, source_hash, entry, (terms, triples))
+    except OSError:
+        pass
+    return terms, triples.tobytes()
+
+
+class GraphRegistry:
+    # One graph per dataset file, loaded once on first use, so every query
+    # runs over the station it targets instead of the union of all inputs.
+    # Safe to share between threads: a file being loaded is waited for, not
+    # loaded twice, while different files load concurrently. load(path,
+    # format) builds the object kept per file (default: an rdflib Graph).
+
+    def __init__(self, load: Optional[Callable] = None):
+        self._load = load or (lambda path, format: load_graph(path, format=format))
+        self._graphs = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def get(self, path: str, format: str = "turtle") -> Graph:
+        key = (os.path.realpath(path), format)
+        graph = self._graphs.get(key)
+        if graph is None:
+            with self._lock:
+                key_lock = self._locks.setdefault(key, threading.Lock())
+            with key_lock:
+                graph = self._graphs.get(key)
+                if graph is None:
+                    graph = self._graphs[key] = self._load(path, format)
+        return graph
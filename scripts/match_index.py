@@ -0,0 +1,231 @@
+import argparse
+import atexit
+import glob
+import hashlib
+import json
+import marshal
+import os
+import struct
+import sys
+import threading
+import zlib
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+from record_linkage import column_values, match_records
+
+# Persisted match index for the Lareb-to-ADR linkage. Decisions depend only
+# on the ADR rows, the rule and a Lareb record's compared values, so one
+# index per ADR case fingerprint (sha256 of the rule and the ADR rows'
+# compared values) keeps, per Lareb record key, a hash of its compared
+# values and the ADR rows it matched. A run scores only the records that are
+# new or whose hash changed and takes the other decisions from the index; a
+# changed ADR case has a new fingerprint, so every record is scored. The
+# matches are those of a full run.
+#
+#   magic "LAREBIDX" | format version (uint16) | ADR case fingerprint (32 bytes)
+#   | zlib(marshal((record keys, packed uint64 hashes,
+#                   packed matched record positions, packed ADR row positions)))
+#
+# Indexes live in MATCH_INDEX_DIR (default ~/.cache/train-matches);
+# LINKAGE_INCREMENTAL=0 scores every record and leaves them alone. Each run
+# appends its counters to stats.log in the directory.
+#
+#   python match_index.py            totals over all recorded runs
+#   python match_index.py --clear    remove every index and the counters
+
+MAGIC = b"LAREBIDX"
+INDEX_VERSION = 1
+_HEADER = struct.Struct(">8sH32s")
+
+INDEX_DIR = os.environ.get("MATCH_INDEX_DIR", os.path.join(os.path.expanduser("~"), ".cache", "train-matches"))
+INCREMENTAL = os.environ.get("LINKAGE_INCREMENTAL", "1") != "0"
+INDEX_SUFFIX = ".matches"
+STATS_FILE = "stats.log"
+COUNTERS = ("records", "skipped", "scored", "new", "changed", "removed")
+
+
+def case_fingerprint(left, columns: Sequence[str], threshold: int, min_valid: int, min_rate: float) -> bytes:
+    rule = [list(columns), threshold, min_valid, min_rate, [column_values(left, column) for column in columns]]
+    return hashlib.sha256(json.dumps(rule, ensure_ascii=False).encode("utf-8")).digest()
+
+
+def record_hashes(right, columns: Sequence[str]) -> np.ndarray:
+    # 64-bit hash of each record's compared values
+    values = pd.DataFrame({i: column_values(right, column) for i, column in enumerate(columns)})
+    return pd.util.hash_pandas_object(values, index=False).to_numpy(dtype=np.uint64)
+
+
+class MatchIndex:
+
+    def __init__(self, index_dir: str = INDEX_DIR):
+        self.index_dir = index_dir
+        self.runs = []
+        self._lock = threading.Lock()
+        self._recording = False
+
+    def _path(self, fingerprint: bytes) -> str:
+        return os.path.join(self.index_dir, fingerprint.hex() + INDEX_SUFFIX)
+
+    def read(self, fingerprint: bytes) -> Optional[Tuple[List[str], np.ndarray, np.ndarray, np.ndarray]]:
+        # (keys, hashes, matched record positions, ADR row positions); None
+        # when there is no usable index for the case
+        try:
+            with open(self._path(fingerprint), "rb") as f:
+                data = f.read()
+            if len(data) < _HEADER.size or _HEADER.unpack_from(data) != (MAGIC, INDEX_VERSION, fingerprint):
+                return None
+            keys, hashes, records, rows = marshal.loads(zlib.decompress(memoryview(data)[_HEADER.size:]))
+        except (OSError, ValueError, EOFError, TypeError, zlib.error):
+            return None
+        return (keys, np.frombuffer(hashes, dtype=np.uint64), np.frombuffer(records, dtype=np.int64),
+                np.frombuffer(rows, dtype=np.int64))
+
+    def write(self, fingerprint: bytes, keys: List[str], hashes: np.ndarray, records: np.ndarray, rows: np.ndarray):
+        body = marshal.dumps((keys, hashes.astype(np.uint64).tobytes(), records.astype(np.int64).tobytes(),
+                              rows.astype(np.int64).tobytes()))
+        path = self._path(fingerprint)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.index_dir, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                f.write(_HEADER.pack(MAGIC, INDEX_VERSION, fingerprint))
+                f.write(zlib.compress(body, 1))
+            os.replace(tmp_path, path)
+        except OSError:
+            # an index that cannot be written is skipped
+            pass
+
+    def match(self, left, right, columns: Sequence[str], key_column: str, threshold: int = 70, min_valid: int = 2,
+              min_rate: float = 0.8, **kwargs) -> List[Tuple[int, int]]:
+        # match_records(left, right, ...), reusing the decisions stored for
+        # the records of right (keyed by key_column) that did not change
+        keys = [str(key) for key in right[key_column].tolist()]
+        if len(set(keys)) != len(keys):
+            # records cannot be told apart between runs
+            matches = match_records(left, right, columns, threshold, min_valid, min_rate, **kwargs)
+            self._record(records=len(keys), scored=len(keys))
+            return matches
+
+        fingerprint = case_fingerprint(left, columns, threshold, min_valid, min_rate)
+        hashes = record_hashes(right, columns)
+        stored = self.read(fingerprint)
+        if stored is None:
+            stored = [], np.empty(0, dtype=np.uint64), np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        stored_keys, stored_hashes, stored_records, stored_rows = stored
+
+        # current position of every stored record, -1 when it is gone or changed
+        previous = pd.Index(stored_keys).get_indexer(keys) if stored_keys else np.full(len(keys), -1)
+        known = previous >= 0
+        unchanged = known.copy()
+        unchanged[known] = stored_hashes[previous[known]] == hashes[known]
+        current = np.full(len(stored_keys), -1, dtype=np.int64)
+        current[previous[unchanged]] = np.flatnonzero(unchanged)
+
+        kept = current[stored_records] >= 0 if len(stored_records) else np.zeros(0, dtype=bool)
+        left_rows = [stored_rows[kept]]
+        right_rows = [current[stored_records[kept]]]
+        rescore = np.flatnonzero(~unchanged)
+        if len(rescore):
+            scored = match_records(left, right.iloc[rescore], columns, threshold, min_valid, min_rate, **kwargs)
+            if scored:
+                scored_left, scored_right = np.array(scored, dtype=np.int64).T
+                left_rows.append(scored_left)
+                right_rows.append(rescore[scored_right])
+        left_rows = np.concatenate(left_rows)
+        right_rows = np.concatenate(right_rows)
+        order = np.lexsort((right_rows, left_rows))
+        left_rows, right_rows = left_rows[order], right_rows[order]
+
+        removed = len(stored_keys) - int(known.sum())
+        self._record(records=len(keys), skipped=int(unchanged.sum()), scored=len(rescore),
+                     new=int((~known).sum()), changed=int((known & ~unchanged).sum()), removed=removed)
+        if len(rescore) or removed:
+            self.write(fingerprint, keys, hashes, right_rows, left_rows)
+        return list(zip(left_rows.tolist(), right_rows.tolist()))
+
+    def _record(self, **counters):
+        run = {name: counters.get(name, 0) for name in COUNTERS}
+        with self._lock:
+            self.runs.append(run)
+            if not self._recording:
+                self._recording = True
+                atexit.register(self.record_runs)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {name: sum(run[name] for run in self.runs) for name in COUNTERS}
+
+    def record_runs(self):
+        # appends this process's counters to the shared stats log
+        with self._lock:
+            lines = "".join(json.dumps(run) + "\n" for run in self.runs)
+        try:
+            os.makedirs(self.index_dir, exist_ok=True)
+            with open(os.path.join(self.index_dir, STATS_FILE), "a", encoding="utf-8") as f:
+                f.write(lines)
+        except OSError:
+            pass
+
+    def totals(self) -> dict:
+        # counters summed over every recorded run, plus the indexes on disk
+        totals = dict.fromkeys(("runs",) + COUNTERS, 0)
+        try:
+            with open(os.path.join(self.index_dir, STATS_FILE), encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        run = json.loads(line)
+                    except ValueError:
+                        continue
+                    totals["runs"] += 1
+                    for name in COUNTERS:
+                        totals[name] += run.get(name, 0)
+        except OSError:
+            pass
+        indexes = glob.glob(os.path.join(self.index_dir, "*" + INDEX_SUFFIX))
+        totals.update(indexes=len(indexes), bytes=sum(os.path.getsize(path) for path in indexes))
+        return totals
+
+    def clear(self):
+        for path in glob.glob(os.path.join(self.index_dir, "*" + INDEX_SUFFIX)) + [
+                os.path.join(self.index_dir, STATS_FILE)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+_default_index = None
+
+
+def default_index() -> MatchIndex:
+    global _default_index
+    if _default_index is None:
+        _default_index = MatchIndex()
+    return _default_index
+
+
+def match_incremental(left, right, columns: Sequence[str], key_column: str, **kwargs) -> List[Tuple[int, int]]:
+    # Incremental matching through the default index, unless
+    # LINKAGE_INCREMENTAL=0; the run's counters go to stderr
+    if not INCREMENTAL:
+        return match_records(left, right, columns, **kwargs)
+    index = default_index()
+    matches = index.match(left, right, columns, key_column, **kwargs)
+    run = index.runs[-1]
+    sys.stderr.write(f"lareb-linkage: {run['records']} records, {run['skipped']} skipped, {run['scored']} scored "
+                     f"({run['new']} new, {run['changed']} changed, {run['removed']} removed)\n")
+    return matches
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Persisted Lareb match index of extractData_RDF.py")
+    parser.add_argument("--clear", action="store_true", help="remove every index and the recorded counters")
+    args = parser.parse_args()
+
+    index = default_index()
+    if args.clear:
+        index.clear()
+        print(f"cleared {index.index_dir}")
+    else:
+        print(json.dumps(index.totals(), indent=2))
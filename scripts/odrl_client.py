@@ -0,0 +1,184 @@
+import os
+import random
+import threading
+import time
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+import requests
+from requests.adapters import HTTPAdapter
+
+# Shared ODRL client for the train scripts. One pooled requests.Session per
+# process (connections are kept alive between decisions), bounded timeouts,
+# retries with jittered exponential backoff on connection errors and on
+# 502/503/504 (an unavailable or overloaded coordinator), and a cache of
+# approved queries so a script asks for each query only once.
+
+DEFAULT_ENDPOINT = os.environ.get("ODRL_ENDPOINT", "http://localhost:6060/api/analysis/odrl-execute")
+DEFAULT_ASSIGNEE = "http://example.org/researcher"
+READ = "http://www.w3.org/ns/odrl/2/read"
+
+# What the coordinator returns when no policy grants the request
+DENIED_MESSAGE = "⚠️ Failed to generate query due to policy restrictions."
+
+REQUEST_TEMPLATE = """
+@prefix odrl:   <http://www.w3.org/ns/odrl/2/> .
+@prefix ex:     <http://example.org/> .
+
+<http://example.org/request:se-query>
+    a odrl:Request ;
+    odrl:uid <https://www.wikidata.org/wiki/Q25670> ;
+    odrl:profile <https://www.wikidata.org/wiki/Q4382010> ;{bindings}
+
+    odrl:permission [
+        odrl:target <{target}> ;
+        odrl:assignee <{assignee}> ;
+        odrl:action <{action}>
+
+    ] .
+"""
+
+# Retried after a backoff; other statuses fail at once. A 500 is not
+# retried: the coordinator reports deterministic engine errors (e.g. an
+# unknown binding) as 500, and they would fail the same way again.
+RETRY_STATUSES = {502, 503, 504}
+
+
+class GrantedQuery(NamedTuple):
+    text: str
+    # sha256 of the query and of its query file (X-Query-Fingerprint and
+    # X-Query-Template-Fingerprint), None when the endpoint does not send them
+    fingerprint: Optional[str]
+    template_fingerprint: Optional[str]
+
+
+class ODRLError(Exception):
+    pass
+
+
+class ODRLDenied(ODRLError):
+    # No policy grants the request
+
+    def __init__(self, target: str, assignee: str, action: str):
+        super().__init__(f"ODRL request denied: {assignee} may not {action} {target}")
+        self.target = target
+        self.assignee = assignee
+        self.action = action
+
+
+class ODRLRequestFailed(ODRLError):
+    # The coordinator could not be reached or kept failing
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+def _literal(value: str) -> str:
+    # Turtle short string, escaped like query_templates._sparql_literal
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"')
+               .replace("\n", "\\n").replace("\r", "\\r").replace("\t", "\\t"))
+    return f'"{escaped}"'
+
+
+def build_request(target: str, assignee: str = DEFAULT_ASSIGNEE, action: str = READ,
+                  bindings: Optional[Dict[str, Iterable[str]]] = None) -> str:
+    # ODRL request in the coordinator's template; bindings fill the query's
+    # #@param parameters ({"drug_id": ["CID100004902", ...]})
+    binding_lines = "".join(
+        f'\n    ex:binding [ ex:parameter {_literal(name)} ; ex:values ({" ".join(_literal(v) for v in values)}) ] ;'
+        for name, values in (bindings or {}).items()
+    )
+    return REQUEST_TEMPLATE.format(target=target, assignee=assignee, action=action, bindings=binding_lines)
+
+
+class ODRLClient:
+
+    def __init__(self, endpoint: str = DEFAULT_ENDPOINT, connect_timeout: float = 3.05,
+                 read_timeout: float = 60.0, retries: int = 3, backoff: float = 0.5, pool_size: int = 8):
+        self.endpoint = endpoint
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._approved: Dict[Tuple, GrantedQuery] = {}
+        self._lock = threading.Lock()
+
+    def request_query(self, target: str, assignee: str = DEFAULT_ASSIGNEE, action: str = READ,
+                      bindings: Optional[Dict[str, Iterable[str]]] = None) -> str:
+        # Returns the SPARQL query granted for (target, assignee, action),
+        # raises ODRLDenied when no policy grants it
+        return self.request_granted(target, assignee, action, bindings).text
+
+    def request_granted(self, target: str, assignee: str = DEFAULT_ASSIGNEE, action: str = READ,
+                        bindings: Optional[Dict[str, Iterable[str]]] = None) -> GrantedQuery:
+        # The granted query with its fingerprints. Approved queries are
+        # cached per (target, assignee, action) and bindings, which change
+        # the query text.
+        bindings = {name: tuple(values) for name, values in (bindings or {}).items()}
+        key = (target, assignee, action, tuple(sorted(bindings.items())))
+        with self._lock:
+            granted = self._approved.get(key)
+        if granted is not None:
+            return granted
+
+        response = self.post(build_request(target, assignee, action, bindings))
+        if response.text.strip() == DENIED_MESSAGE:
+            raise ODRLDenied(target, assignee, action)
+
+        granted = GrantedQuery(response.text, response.headers.get("X-Query-Fingerprint"),
+                               response.headers.get("X-Query-Template-Fingerprint"))
+        with self._lock:
+            self._approved[key] = granted
+        return granted
+
+    def send(self, odrl_payload: str) -> str:
+        # Posts an ODRL request and returns the response body
+        return self.post(odrl_payload).text
+
+    def post(self, odrl_payload: str) -> requests.Response:
+        # Posts an ODRL request and returns the successful response
+        last_error = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                # full jitter: spread the retries of concurrent trains
+                time.sleep(random.uniform(0, self.backoff * 2 ** (attempt - 1)))
+            try:
+                response = self.session.post(self.endpoint, data=odrl_payload.encode("utf-8"),
+                                             headers={"Content-Type": "text/turtle"}, timeout=self.timeout)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                last_error = ODRLRequestFailed(f"ODRL endpoint {self.endpoint} unreachable: {e}")
+                continue
+
+            if response.status_code == 200:
+                return response
+            last_error = ODRLRequestFailed(f"ODRL endpoint returned {response.status_code}: {response.text}",
+                                           response.status_code)
+            if response.status_code not in RETRY_STATUSES:
+                break
+        raise last_error
+
+    def close(self):
+        self.session.close()
+
+
+_default_client = None
+
+
+def default_client() -> ODRLClient:
+    # One client per process, shared by every request of a script run
+    global _default_client
+    if _default_client is None:
+        _default_client = ODRLClient()
+    return _default_client
+
+
+def request_query(target: str, assignee: str = DEFAULT_ASSIGNEE, action: str = READ,
+                  bindings: Optional[Dict[str, Iterable[str]]] = None) -> str:
+    return default_client().request_query(target, assignee, action, bindings)
+
+
+def request_granted(target: str, assignee: str = DEFAULT_ASSIGNEE, action: str = READ,
+                    bindings: Optional[Dict[str, Iterable[str]]] = None) -> GrantedQuery:
+    return default_client().request_granted(target, assignee, action, bindings)
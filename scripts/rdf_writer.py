@@ -0,0 +1,103 @@
+import re
+from typing import Optional, Sequence
+import numpy as np
+import pandas as pd
+
+# Streaming writer for DataFrames as RDF: one subject per row, one literal
+# per cell, written straight to Turtle or N-Triples in chunks of rows
+# without building an rdflib graph. Cells that are NaN or "unknown" (any
+# case, surrounding blanks ignored) are skipped, as in the scripts' graph
+# loops. Each column of a chunk is factorized, so the filter and the escaping
+# run once per distinct value and the cells take their text from the codes;
+# the writer holds one chunk of text at a time whatever the number of rows.
+#
+#   subject    <subject_base + (row label + subject_offset)>
+#   predicate  <predicate_base + column name, trimmed, spaces as "_">
+#   object     "str(cell)", a plain string literal
+
+CHUNK_ROWS = 10000
+
+# characters IRIREF does not allow raw, written as \u escapes
+_IRI_ESCAPES = re.compile(r'[\x00-\x20<>"{}|^`\\]')
+# the characters a string literal cannot hold raw
+_LITERAL_ESCAPES = str.maketrans({"\\": "\\\\", '"': '\\"', "\n": "\\n", "\r": "\\r"})
+# a Turtle PN_LOCAL without escapes, so the predicate can be prefixed
+_LOCAL_NAME = re.compile(r"[A-Za-z0-9_](?:[A-Za-z0-9_.\-]*[A-Za-z0-9_\-])?\Z")
+
+
+def iri(value: str) -> str:
+    return "<" + _IRI_ESCAPES.sub(lambda m: f"\\u{ord(m.group()):04X}", value) + ">"
+
+
+def quote_literal(value: str) -> str:
+    # Turtle/N-Triples string literal
+    return '"' + value.translate(_LITERAL_ESCAPES) + '"'
+
+
+def predicate_iris(columns: Sequence[str], predicate_base: str) -> list:
+    return [predicate_base + str(column).strip().replace(" ", "_") for column in columns]
+
+
+def _chunk_cells(chunk: pd.DataFrame, predicates: Sequence[str]):
+    # (row position, text "<predicate> <literal>") of every written cell,
+    # ordered by row, then column
+    rows, texts = [], []
+    for position, predicate in enumerate(predicates):
+        values = chunk.iloc[:, position]
+        if values.dtype == object:
+            # factorize would take 1, 1.0 and True for one value
+            values = values.where(values.isna(), values.astype(str))
+        # NaN has code -1, which takes the extra last entry below
+        codes, uniques = pd.factorize(values)
+        strings = [str(value) for value in uniques]
+        known = np.array([value.strip().lower() != "unknown" for value in strings] + [False], dtype=bool)
+        distinct = np.array([f"{predicate} {quote_literal(value)}" for value in strings] + [""], dtype=object)
+        cells = np.flatnonzero(known[codes])
+        rows.append(cells)
+        texts.append(distinct[codes[cells]])
+    rows = np.concatenate(rows) if rows else np.empty(0, dtype=np.int64)
+    texts = np.concatenate(texts) if texts else np.empty(0, dtype=object)
+    # columns were appended in order, so a stable sort by row keeps them so
+    order = np.argsort(rows, kind="stable")
+    return rows[order], texts[order]
+
+
+def write_frame(frame: pd.DataFrame, destination: str, subject_base: str, predicate_base: str,
+                format: str = "turtle", prefix: Optional[str] = "ex", subject_offset: int = 1,
+                chunk_rows: int = CHUNK_ROWS) -> int:
+    # Writes the frame's cells as triples; returns the number written.
+    # format is "turtle" (subjects grouped, predicates under prefix when
+    # they are plain local names) or "nt".
+    if format not in ("turtle", "nt"):
+        raise ValueError(f"unsupported RDF format {format!r}, expected 'turtle' or 'nt'")
+    predicates = predicate_iris(frame.columns, predicate_base)
+    if format == "turtle" and prefix:
+        terms = [f"{prefix}:{name[len(predicate_base):]}"
+                 if name.startswith(predicate_base) and _LOCAL_NAME.match(name[len(predicate_base):]) else iri(name)
+                 for name in predicates]
+    else:
+        terms = [iri(name) for name in predicates]
+
+    subject = iri(subject_base)[:-1]
+    written = 0
+    with open(destination, "w", encoding="utf-8", newline="\n") as f:
+        if format == "turtle" and prefix:
+            f.write(f"@prefix {prefix}: {iri(predicate_base)} .\n\n")
+        for start in range(0, len(frame), chunk_rows):
+            chunk = frame.iloc[start:start + chunk_rows]
+            rows, texts = _chunk_cells(chunk, terms)
+            if not len(rows):
+                continue
+            labels = (np.asarray(chunk.index, dtype=np.int64) + subject_offset).tolist()
+            subjects = np.array([f"{subject}{label}> " for label in labels], dtype=object)[rows]
+            if format == "nt":
+                lines = subjects + texts + " .\n"
+            else:
+                first = np.ones(len(rows), dtype=bool)
+                first[1:] = rows[1:] != rows[:-1]
+                last = np.ones(len(rows), dtype=bool)
+                last[:-1] = first[1:]
+                lines = np.where(first, subjects, "    ") + texts + np.where(last, " .\n\n", " ;\n")
+            f.write("".join(lines.tolist()))
+            written += len(rows)
+    return written
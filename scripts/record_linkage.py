@@ -0,0 +1,199 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Sequence, Tuple
+import numpy as np
+from fuzzywuzzy import fuzz, utils
+
+# Record linkage for matching Lareb rows to the ADR rows. A pair of rows
+# matches when at least min_valid compared columns hold a value on both sides
+# and at least min_rate of those score >= threshold with
+# fuzz.token_set_ratio, the rule of the original nested loop.
+#
+# token_set_ratio is the best of three difflib ratios over the sorted token
+# sets of the two values, and each is bounded from above
+#   - by the character multiset overlap of the two token sets (all three
+#     strings of a side hold the same characters)
+#   - for values sharing tokens (found through a token inverted index), by
+#     how much of either side the shared tokens cover
+# and is 100 when one token set holds the other. The bounds are checked for
+# every pair of distinct values at once with numpy and give, per pair of
+# rows, an upper bound on its score; only pairs of rows that can still meet
+# the rule have their values scored, and only pairs of values that can reach
+# the threshold are scored at all. Everything pruned fails the rule, so the
+# matches are those of scoring every pair. The work is split into blocks of
+# right rows, spread over a process pool.
+#
+# LINKAGE_WORKERS sets the pool size (default: one per CPU, 1 runs
+# in-process).
+
+LINKAGE_WORKERS = int(os.environ.get("LINKAGE_WORKERS", str(os.cpu_count() or 1)))
+
+# left rows x right rows per block, bounding the size of the rule matrices,
+# and at most BLOCK_ROWS right rows so that large sets spread over the pool
+BLOCK_CELLS = 1 << 24
+BLOCK_ROWS = 50000
+
+# full_process keeps ASCII letters, digits and "_", lowercased; anything
+# else would share the last slot, which only loosens the bound
+_ALPHABET = {char: i for i, char in enumerate(" abcdefghijklmnopqrstuvwxyz0123456789_")}
+
+
+def is_valid(value: str) -> bool:
+    # compared at all: not "unknown" and not blank
+    return value.lower() != "unknown" and bool(value.strip())
+
+
+def encode_column(values: Sequence[str]) -> Tuple[np.ndarray, List[str]]:
+    # (code per row, -1 when not valid; distinct valid values)
+    ids: Dict[str, int] = {}
+    distinct: List[str] = []
+    codes = np.empty(len(values), dtype=np.int64)
+    for i, value in enumerate(values):
+        code = ids.get(value)
+        if code is None:
+            code = ids[value] = -1
+            if is_valid(value):
+                code = ids[value] = len(distinct)
+                distinct.append(value)
+        codes[i] = code
+    return codes, distinct
+
+
+def _joined_length(tokens: frozenset) -> int:
+    # length of the tokens joined by single spaces
+    return sum(map(len, tokens)) + len(tokens) - 1 if tokens else 0
+
+
+class _Profiles:
+    # token sets, joined lengths and character counts of distinct values
+
+    def __init__(self, values: Sequence[str]):
+        self.tokens = [frozenset(utils.full_process(value, force_ascii=True).split()) for value in values]
+        self.lengths = np.array([_joined_length(tokens) for tokens in self.tokens], dtype=np.int64)
+        self.counts = np.zeros((len(values), len(_ALPHABET) + 1), dtype=np.int32)
+        other = len(_ALPHABET)
+        for row, tokens in enumerate(self.tokens):
+            for token in tokens:
+                for char in token:
+                    self.counts[row, _ALPHABET.get(char, other)] += 1
+            if tokens:
+                self.counts[row, 0] = len(tokens) - 1
+
+
+def value_bounds(left: _Profiles, right: _Profiles, threshold: int) -> Tuple[np.ndarray, np.ndarray]:
+    # (possible, certain): bool matrices over (left value, right value) of
+    # the pairs that may score >= threshold and of those that score 100.
+    # Both have an extra last row and column, left False, for invalid codes.
+    n_left, n_right = len(left.tokens), len(right.tokens)
+    possible = np.zeros((n_left + 1, n_right + 1), dtype=bool)
+    certain = np.zeros((n_left + 1, n_right + 1), dtype=bool)
+    # a score rounds up to the threshold from 100 * ratio >= threshold - 0.5;
+    # the margin covers float error in the bounds
+    cutoff = (threshold - 0.5) / 100 - 1e-9
+
+    index: Dict[str, List[int]] = {}
+    for r, tokens in enumerate(right.tokens):
+        for token in tokens:
+            index.setdefault(token, []).append(r)
+
+    for j, tokens in enumerate(left.tokens):
+        if not tokens:
+            # nothing left after processing: token_set_ratio is 0
+            continue
+        length = left.lengths[j]
+        # length bound first, then the character overlap of the survivors
+        total = length + right.lengths
+        kept = np.flatnonzero((right.lengths > 0) & (2 * np.minimum(length, right.lengths) >= cutoff * total))
+        overlap = np.minimum(right.counts[kept], left.counts[j]).sum(axis=1)
+        possible[j, kept[2 * overlap >= cutoff * total[kept]]] = True
+
+        for r in {r for token in tokens for r in index.get(token, ())}:
+            other = right.tokens[r]
+            if tokens <= other or other <= tokens:
+                possible[j, r] = certain[j, r] = True
+                continue
+            shared = _joined_length(tokens & other)
+            if 2 * shared >= cutoff * (shared + min(length, right.lengths[r])):
+                possible[j, r] = True
+    return possible, certain
+
+
+def match_block(left_columns: Sequence[Sequence[str]], right_columns: Sequence[Sequence[str]], threshold: int = 70,
+                min_valid: int = 2, min_rate: float = 0.8) -> Tuple[np.ndarray, np.ndarray]:
+    # (left row, right row) of every matching pair, ordered by left row, then
+    # right row; columns are lists of the rows' values as str, in the same
+    # column order on both sides
+    n_left = len(left_columns[0]) if left_columns else 0
+    n_right = len(right_columns[0]) if right_columns else 0
+    valid = np.zeros((n_left, n_right), dtype=np.uint8)
+    upper = np.zeros((n_left, n_right), dtype=np.uint8)
+    columns = []
+    for left_values, right_values in zip(left_columns, right_columns):
+        left_codes, left_distinct = encode_column(left_values)
+        right_codes, right_distinct = encode_column(right_values)
+        possible, certain = value_bounds(_Profiles(left_distinct), _Profiles(right_distinct), threshold)
+        valid += (left_codes >= 0)[:, None] & (right_codes >= 0)[None, :]
+        upper += possible[np.ix_(left_codes, right_codes)]
+        columns.append((left_codes, left_distinct, right_codes, right_distinct, possible, certain))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        left_rows, right_rows = np.nonzero((valid >= min_valid) & (upper / valid >= min_rate))
+    valid = valid[left_rows, right_rows]
+
+    score = np.zeros(len(left_rows), dtype=np.uint8)
+    for left_codes, left_distinct, right_codes, right_distinct, possible, certain in columns:
+        left_pair = left_codes[left_rows]
+        right_pair = right_codes[right_rows]
+        similar = certain[left_pair, right_pair]
+        unsure = possible[left_pair, right_pair] & ~similar
+        if unsure.any():
+            pairs = list(zip(left_pair[unsure].tolist(), right_pair[unsure].tolist()))
+            scored = {(j, r): fuzz.token_set_ratio(left_distinct[j], right_distinct[r]) >= threshold
+                      for j, r in set(pairs)}
+            similar[unsure] = [scored[pair] for pair in pairs]
+        score += similar
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        matched = (valid >= min_valid) & (score / valid >= min_rate)
+    return left_rows[matched], right_rows[matched]
+
+
+def _match_block(args) -> Tuple[np.ndarray, np.ndarray]:
+    return match_block(*args)
+
+
+def column_values(frame, column: str) -> List[str]:
+    # a column's values as compared, "unknown" when the frame lacks it
+    if column not in frame.columns:
+        return ["unknown"] * len(frame)
+    return [str(value) for value in frame[column].tolist()]
+
+
+def match_records(left, right, columns: Sequence[str], threshold: int = 70, min_valid: int = 2,
+                  min_rate: float = 0.8, workers: int = LINKAGE_WORKERS) -> List[Tuple[int, int]]:
+    # (left position, right position) of every matching pair of rows of the
+    # two DataFrames, ordered by left row, then right row, as the nested
+    # loop over left.iterrows() and right.iterrows() found them. A column
+    # missing from a frame counts as unknown.
+    left_columns = [column_values(left, column) for column in columns]
+    right_columns = [column_values(right, column) for column in columns]
+    block_rows = min(BLOCK_ROWS, max(1024, BLOCK_CELLS // max(len(left), 1)))
+    starts = range(0, len(right), block_rows)
+    blocks = [(left_columns, [values[start:start + block_rows] for values in right_columns], threshold, min_valid,
+               min_rate) for start in starts]
+
+    if workers <= 1 or len(blocks) <= 1:
+        results = list(map(_match_block, blocks))
+    else:
+        # the train scripts run at module level: fork keeps the workers from
+        # importing (and so re-running) them
+        context = multiprocessing.get_context("fork") if "fork" in multiprocessing.get_all_start_methods() else None
+        with ProcessPoolExecutor(max_workers=min(workers, len(blocks)), mp_context=context) as pool:
+            results = list(pool.map(_match_block, blocks))
+    if not results:
+        return []
+    left_rows = np.concatenate([block_left for block_left, _ in results])
+    right_rows = np.concatenate([block_right + start for start, (_, block_right) in zip(starts, results)])
+    order = np.lexsort((right_rows, left_rows))
+    return list(zip(left_rows[order].tolist(), right_rows[order].tolist()))
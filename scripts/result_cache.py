@@ -0,0 +1,240 @@
+import argparse
+import atexit
+import glob
+import hashlib
+import json
+import marshal
+import os
+import re
+import struct
+import threading
+import zlib
+from typing import List, Optional, Sequence, Tuple
+from graph_cache import content_hash
+
+# On-disk cache of SPARQL SELECT results, shared by every train. An entry is
+# keyed by the sha256 of the station file's content, the backend and the
+# normalised query text (comments and layout dropped; bound parameters are
+# part of the granted query), so an approved query over an unchanged station
+# is answered without loading the station or running the query.
+#
+#   magic "SPARQLRS" | format version (uint16)
+#   | zlib(marshal((columns, rows))) with rows as tuples of str or None
+#
+# Entries live in RESULT_CACHE_DIR (default ~/.cache/train-results); the
+# directory is kept under RESULT_CACHE_MAX_BYTES (default 256 MB) by evicting
+# the least recently used entries (a hit touches the entry's mtime).
+# RESULT_CACHE_MAX_BYTES=0 disables the cache. Each process appends its
+# hit/miss counters to stats.log in the directory on exit.
+#
+#   python result_cache.py            totals over all recorded runs
+#   python result_cache.py --clear    remove every entry and the counters
+
+MAGIC = b"SPARQLRS"
+CACHE_VERSION = 1
+_HEADER = struct.Struct(">8sH")
+
+CACHE_DIR = os.environ.get("RESULT_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "train-results"))
+MAX_BYTES = int(os.environ.get("RESULT_CACHE_MAX_BYTES", str(256 << 20)))
+ENTRY_SUFFIX = ".rows"
+STATS_FILE = "stats.log"
+
+# strings, IRIs and comments are told apart so that only whitespace and
+# comments outside them are normalised
+_QUERY_TOKEN = re.compile(r'''"""(?:[^"\\]|\\.|"(?!""))*"""|\'\'\'(?:[^'\\]|\\.|'(?!''))*\'\'\''''
+                          r'''|"(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*'|<[^<>"{}|^`\\\s]*>|#[^\n]*|\s+|[^\s"'<#]+|.''', re.S)
+
+
+def normalize_query(query: str) -> str:
+    parts = []
+    for match in _QUERY_TOKEN.finditer(query):
+        token = match.group()
+        if token.startswith("#"):
+            token = " "
+        elif token.isspace():
+            token = " "
+        if token == " " and (not parts or parts[-1] == " "):
+            continue
+        parts.append(token)
+    return "".join(parts).strip()
+
+
+_dataset_hashes = {}
+_dataset_lock = threading.Lock()
+
+
+def dataset_hash(path: str) -> bytes:
+    # content hash of a station file, computed once per process and version
+    stat = os.stat(path)
+    key = (os.path.realpath(path), stat.st_mtime_ns, stat.st_size)
+    with _dataset_lock:
+        digest = _dataset_hashes.get(key)
+    if digest is None:
+        digest = content_hash(path)
+        with _dataset_lock:
+            _dataset_hashes[key] = digest
+    return digest
+
+
+def result_key(source_hash: bytes, backend: str, query: str) -> str:
+    digest = hashlib.sha256(source_hash)
+    digest.update(backend.encode("utf-8") + b"\0")
+    digest.update(normalize_query(query).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ResultCache:
+
+    def __init__(self, cache_dir: str = CACHE_DIR, max_bytes: int = MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._recording = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + ENTRY_SUFFIX)
+
+    def _count(self, counter: str, n: int = 1):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + n)
+            if not self._recording:
+                self._recording = True
+                atexit.register(self.record_run)
+
+    def get(self, key: str) -> Optional[Tuple[List[str], list]]:
+        # (columns, rows) of a cached result; None on a miss
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            if len(data) < _HEADER.size or _HEADER.unpack_from(data) != (MAGIC, CACHE_VERSION):
+                raise ValueError("not a result cache entry")
+            columns, rows = marshal.loads(zlib.decompress(memoryview(data)[_HEADER.size:]))
+            os.utime(path)
+        except (OSError, ValueError, EOFError, TypeError, zlib.error):
+            self._count("misses")
+            return None
+        self._count("hits")
+        return columns, rows
+
+    def put(self, key: str, columns: Sequence[str], rows: list):
+        data = _HEADER.pack(MAGIC, CACHE_VERSION) + zlib.compress(marshal.dumps((list(columns), rows)), 1)
+        if len(data) > self.max_bytes:
+            return
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            # a cache that cannot be written is skipped
+            return
+        self._count("writes")
+        self.evict()
+
+    def entries(self) -> List[Tuple[float, int, str]]:
+        # (mtime, size, path) of every entry, least recently used first
+        found = []
+        for path in glob.glob(os.path.join(self.cache_dir, "*" + ENTRY_SUFFIX)):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            found.append((stat.st_mtime, stat.st_size, path))
+        return sorted(found)
+
+    def evict(self):
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        evicted = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            evicted += 1
+        if evicted:
+            self._count("evictions", evicted)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses, "writes": self.writes, "evictions": self.evictions,
+                    "hit_rate": self.hits / lookups if lookups else None}
+
+    def record_run(self):
+        # appends this process's counters to the shared stats log
+        line = json.dumps({name: value for name, value in self.stats().items() if name != "hit_rate"}) + "\n"
+        try:
+            with open(os.path.join(self.cache_dir, STATS_FILE), "a", encoding="utf-8") as f:
+                f.write(line)
+        except OSError:
+            pass
+
+    def totals(self) -> dict:
+        # counters summed over every recorded run, plus the entries on disk
+        totals = {"runs": 0, "hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+        try:
+            with open(os.path.join(self.cache_dir, STATS_FILE), encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        run = json.loads(line)
+                    except ValueError:
+                        continue
+                    totals["runs"] += 1
+                    for name in ("hits", "misses", "writes", "evictions"):
+                        totals[name] += run.get(name, 0)
+        except OSError:
+            pass
+        lookups = totals["hits"] + totals["misses"]
+        entries = self.entries()
+        totals.update(hit_rate=totals["hits"] / lookups if lookups else None, entries=len(entries),
+                      bytes=sum(size for _, size, _ in entries), max_bytes=self.max_bytes)
+        return totals
+
+    def clear(self):
+        for _, _, path in self.entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        try:
+            os.remove(os.path.join(self.cache_dir, STATS_FILE))
+        except OSError:
+            pass
+
+
+_default_cache = None
+
+
+def default_cache() -> ResultCache:
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ResultCache()
+    return _default_cache
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Shared SPARQL result cache of the train scripts")
+    parser.add_argument("--clear", action="store_true", help="remove every entry and the recorded counters")
+    args = parser.parse_args()
+
+    cache = default_cache()
+    if args.clear:
+        cache.clear()
+        print(f"cleared {cache.cache_dir}")
+    else:
+        print(json.dumps(cache.totals(), indent=2))
@@ -0,0 +1,233 @@
+import os
+import threading
+from collections import namedtuple
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+from urllib.parse import quote
+from graph_cache import GraphRegistry, load_graph
+from result_cache import ResultCache, dataset_hash, default_cache, result_key
+from sparql_results import iter_rows, result_columns
+
+# Pluggable SPARQL engine for the train scripts. A station is one dataset
+# file on a backend; select() runs a query over it and yields the rows as
+# tuples of str (None when unbound), the rows sparql_results.iter_rows gives
+# for rdflib, whichever backend runs it.
+#
+#   SPARQL_BACKEND=rdflib    rdflib's pure-Python evaluator over the
+#                            (graph-cached) file; the default
+#   SPARQL_BACKEND=oxigraph  pyoxigraph, an embedded native store running
+#                            in-process (pip install pyoxigraph)
+#   SPARQL_BACKEND=server    the station server (station_server.py) at
+#                            STATION_SERVER, which holds every file preloaded;
+#                            the file is named by its base name and never
+#                            loaded by the train
+#
+# Results of the in-process backends go through the shared result cache
+# (result_cache.py), and a station only loads its file into the engine on a
+# cache miss.
+#
+# Blank node labels are backend-specific; the train queries return none.
+
+SPARQL_BACKEND = os.environ.get("SPARQL_BACKEND", "rdflib")
+STATION_SERVER = os.environ.get("STATION_SERVER", "http://127.0.0.1:7070")
+
+
+class StationServerError(Exception):
+    pass
+
+
+def project_rows(names: Sequence[str], rows: Iterable[tuple], columns: Optional[Sequence[str]] = None,
+                 named: bool = False) -> Iterator[tuple]:
+    # rows (in names order) reduced to columns, as tuples or namedtuples
+    if columns is None and not named:
+        return iter(rows)
+    wanted = list(columns) if columns is not None else list(names)
+    positions = [list(names).index(name) for name in wanted]
+    make = namedtuple("Row", wanted)._make if named else tuple
+    return (make([row[i] for i in positions]) for row in rows)
+
+
+class RdflibStation:
+    backend = "rdflib"
+    local = True
+
+    def __init__(self, path: str, format: str = "turtle"):
+        self.graph = load_graph(path, format=format)
+
+    def __len__(self) -> int:
+        return len(self.graph)
+
+    def result(self, query: str) -> Tuple[List[str], Iterator[tuple]]:
+        # (column names, rows in that order)
+        result = self.graph.query(query)
+        return result_columns(result), iter_rows(result)
+
+    def select(self, query: str, columns: Optional[Sequence[str]] = None, named: bool = False) -> Iterator[tuple]:
+        return project_rows(*self.result(query), columns, named)
+
+
+# rdflib format names -> pyoxigraph RdfFormat members and media types
+_OXIGRAPH_FORMATS = {
+    "turtle": ("TURTLE", "text/turtle"),
+    "ttl": ("TURTLE", "text/turtle"),
+    "nt": ("N_TRIPLES", "application/n-triples"),
+    "ntriples": ("N_TRIPLES", "application/n-triples"),
+    "n3": ("N3", "text/n3"),
+    "xml": ("RDF_XML", "application/rdf+xml"),
+    "trig": ("TRIG", "application/trig"),
+    "nquads": ("N_QUADS", "application/n-quads"),
+}
+
+
+class OxigraphStation:
+    backend = "oxigraph"
+    local = True
+
+    def __init__(self, path: str, format: str = "turtle"):
+        import pyoxigraph
+
+        if format not in _OXIGRAPH_FORMATS:
+            raise ValueError(f"RDF format {format!r} is not supported by the oxigraph backend")
+        rdf_format, media_type = _OXIGRAPH_FORMATS[format]
+        self.store = pyoxigraph.Store()
+        if hasattr(pyoxigraph, "RdfFormat"):
+            # pyoxigraph >= 0.4
+            self.store.bulk_load(path=path, format=getattr(pyoxigraph.RdfFormat, rdf_format))
+        else:
+            self.store.bulk_load(path, media_type)
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def result(self, query: str) -> Tuple[List[str], Iterator[tuple]]:
+        solutions = self.store.query(query)
+        if not hasattr(solutions, "variables"):
+            raise ValueError("expected a SELECT query")
+        names = [variable.value for variable in solutions.variables]
+
+        def rows():
+            for solution in solutions:
+                values = []
+                for position in range(len(names)):
+                    term = solution[position]
+                    values.append(None if term is None else term.value)
+                yield tuple(values)
+
+        return names, rows()
+
+    def select(self, query: str, columns: Optional[Sequence[str]] = None, named: bool = False) -> Iterator[tuple]:
+        return project_rows(*self.result(query), columns, named)
+
+
+_server_session = None
+_server_lock = threading.Lock()
+
+
+def server_session():
+    # one keep-alive session per process for every station on the server
+    global _server_session
+    with _server_lock:
+        if _server_session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            _server_session = requests.Session()
+            _server_session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=8))
+    return _server_session
+
+
+class ServerStation:
+    backend = "server"
+    local = False
+
+    def __init__(self, path: str, format: str = "turtle", url: Optional[str] = None,
+                 timeout: Tuple[float, float] = (3.05, 300.0)):
+        self.name = os.path.basename(path)
+        self.server = (url or STATION_SERVER).rstrip("/")
+        self.timeout = timeout
+
+    def _call(self, method: str, path: str, **kwargs):
+        import requests
+
+        try:
+            response = server_session().request(method, self.server + path, timeout=self.timeout, **kwargs)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            raise StationServerError(f"station server {self.server} unreachable: {e}")
+        if response.status_code != 200:
+            raise StationServerError(f"station server returned {response.status_code} for {self.name}: "
+                                     f"{response.text}")
+        return response.json()
+
+    def __len__(self) -> int:
+        stations = self._call("GET", "/stations")
+        if self.name not in stations:
+            raise StationServerError(f"station server {self.server} has no station {self.name}")
+        return stations[self.name]["triples"]
+
+    def result(self, query: str) -> Tuple[List[str], Iterator[tuple]]:
+        payload = self._call("POST", "/sparql/" + quote(self.name), data=query.encode("utf-8"),
+                             headers={"Content-Type": "application/sparql-query; charset=utf-8"})
+        return payload["columns"], (tuple(row) for row in payload["rows"])
+
+    def select(self, query: str, columns: Optional[Sequence[str]] = None, named: bool = False) -> Iterator[tuple]:
+        return project_rows(*self.result(query), columns, named)
+
+
+BACKENDS = {"rdflib": RdflibStation, "oxigraph": OxigraphStation, "server": ServerStation}
+
+
+class Station:
+    # A dataset file on a backend, loaded into the engine on first need:
+    # with the result cache on, a query whose result is cached never loads it
+
+    def __init__(self, path: str, format: str = "turtle", backend: Optional[str] = None,
+                 cache: Optional[ResultCache] = None):
+        self.path = path
+        self.format = format
+        self.backend = backend or SPARQL_BACKEND
+        if self.backend not in BACKENDS:
+            raise ValueError(f"unknown SPARQL backend {self.backend!r}, expected one of {', '.join(BACKENDS)}")
+        self.cache = cache if cache is not None else default_cache()
+        # the server caches its own results
+        self.cached = self.cache.enabled and BACKENDS[self.backend].local
+        self._engine = None
+        self._lock = threading.Lock()
+
+    def engine(self):
+        with self._lock:
+            if self._engine is None:
+                self._engine = BACKENDS[self.backend](self.path, self.format)
+        return self._engine
+
+    def preload(self):
+        # Loads the file now, unless results may come from the cache
+        if not self.cached:
+            self.engine()
+
+    def __len__(self) -> int:
+        return len(self.engine())
+
+    def result(self, query: str) -> Tuple[List[str], Iterable[tuple]]:
+        if not self.cached:
+            return self.engine().result(query)
+        key = result_key(dataset_hash(self.path), f"{self.backend}:{self.format}", query)
+        cached = self.cache.get(key)
+        if cached is None:
+            names, rows = self.engine().result(query)
+            rows = list(rows)
+            self.cache.put(key, names, rows)
+            return names, rows
+        return cached
+
+    def select(self, query: str, columns: Optional[Sequence[str]] = None, named: bool = False) -> Iterator[tuple]:
+        return project_rows(*self.result(query), columns, named)
+
+
+def open_station(path: str, format: str = "turtle", backend: Optional[str] = None) -> Station:
+    return Station(path, format, backend)
+
+
+class StationRegistry(GraphRegistry):
+    # One station per dataset file on the configured backend
+
+    def __init__(self, backend: Optional[str] = None):
+        super().__init__(lambda path, format: open_station(path, format, backend))
@@ -0,0 +1,50 @@
+from collections import namedtuple
+from typing import Dict, Iterator, List, Optional, Sequence
+
+# Streaming access to rdflib SELECT results. The scripts used to serialise
+# every result to SPARQL-JSON text and json.loads it back before reading a
+# single row, holding the result set three times over (bindings, text,
+# dicts). Rows are read here through rdflib's public result iteration, as
+# plain strings (the "value" the JSON form carried; None when unbound), as
+# rdflib evaluates them. rdflib keeps the bindings it has yielded until the
+# result is released.
+
+
+def result_columns(result) -> List[str]:
+    return [str(var) for var in result.vars]
+
+
+def iter_rows(result, columns: Optional[Sequence[str]] = None, named: bool = False) -> Iterator[tuple]:
+    # Yields one tuple of str (or None) per row, in the order of columns
+    # (default: the query's SELECT variables); named=True yields namedtuples
+    # with the column names as fields
+    if result.type != "SELECT":
+        raise ValueError(f"expected a SELECT result, got {result.type}")
+    available = result_columns(result)
+    names = list(columns) if columns is not None else available
+    positions = [available.index(name) for name in names]
+    make = namedtuple("Row", names)._make if named else tuple
+    for row in result:
+        values = []
+        for i in positions:
+            term = row[i]
+            values.append(None if term is None else str(term))
+        yield make(values)
+
+
+def to_columns(result, columns: Optional[Sequence[str]] = None) -> Dict[str, list]:
+    # Column-wise lists {name: [values]}, filled row by row from the stream
+    names = list(columns) if columns is not None else result_columns(result)
+    data = {name: [] for name in names}
+    appends = [data[name].append for name in names]
+    for row in iter_rows(result, names):
+        for append, value in zip(appends, row):
+            append(value)
+    return data
+
+
+def to_dataframe(result, columns: Optional[Sequence[str]] = None):
+    # DataFrame with one str/None column per SELECT variable
+    import pandas as pd
+
+    return pd.DataFrame(to_columns(result, columns))
@@ -0,0 +1,189 @@
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+from pyparsing import ParseException
+from sparql_backend import BACKENDS, SPARQL_BACKEND, Station
+
+# Local SPARQL data station. Every RDF file in the station directory is
+# loaded once at startup (through the graph cache) and queried over HTTP, so
+# the trains (SPARQL_BACKEND=server, STATION_SERVER=http://host:port) run
+# their granted queries here instead of each loading the files themselves.
+# Runs without any outside service.
+#
+#   GET  /sparql/<file>?query=...          -> {"columns": [...], "rows": [[str|null, ...], ...]}
+#   POST /sparql/<file>  body: the query (application/sparql-query) or
+#                        query=... (application/x-www-form-urlencoded)
+#   GET  /stations                         -> {file: {"format", "triples", "load_s"}}
+#   GET  /stats                            -> per-station query counters and
+#                                             result cache counters (JSON)
+#   GET  /health                           -> "ok"
+#
+# Stations are named by file name (ADRCase.ttl), the base name of the path a
+# train is given. Results also go through the shared result cache.
+#
+#   python station_server.py --dir ../src/main/resources/workflow/RDF --port 7070
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = int(os.environ.get("STATION_SERVER_PORT", "7070"))
+DEFAULT_DIR = os.environ.get("STATION_DIR", "RDF")
+
+FORMATS = {".ttl": "turtle", ".nt": "nt", ".n3": "n3", ".rdf": "xml", ".owl": "xml", ".trig": "trig",
+           ".nq": "nquads"}
+
+
+class DataStation:
+    # The station files of one directory, preloaded on one backend
+
+    def __init__(self, directory: str, backend: str = SPARQL_BACKEND):
+        if not BACKENDS[backend].local:
+            raise ValueError(f"the station server needs an in-process backend, not {backend!r}")
+        self.backend = backend
+        self.stations = {}
+        self.info = {}
+        self.counters = {}
+        for name in sorted(os.listdir(directory)):
+            format = FORMATS.get(os.path.splitext(name)[1].lower())
+            path = os.path.join(directory, name)
+            if format is None or not os.path.isfile(path):
+                continue
+            start = time.perf_counter()
+            station = Station(path, format, backend)
+            triples = len(station)
+            self.stations[name] = station
+            self.info[name] = {"format": format, "triples": triples, "load_s": round(time.perf_counter() - start, 3)}
+            self.counters[name] = {"queries": 0, "errors": 0, "seconds": 0.0}
+        # rdflib holds the GIL while it evaluates, so its queries take turns
+        # instead of slowing each other down
+        self._query_lock = threading.Lock() if backend == "rdflib" else None
+        self._lock = threading.Lock()
+
+    def query(self, name: str, query: str) -> dict:
+        station = self.stations[name]
+        start = time.perf_counter()
+        failed = True
+        try:
+            if self._query_lock is None:
+                columns, rows = station.result(query)
+                rows = list(rows)
+            else:
+                with self._query_lock:
+                    columns, rows = station.result(query)
+                    rows = list(rows)
+            failed = False
+        finally:
+            with self._lock:
+                counters = self.counters[name]
+                counters["queries"] += 1
+                counters["errors"] += failed
+                counters["seconds"] += time.perf_counter() - start
+        return {"columns": list(columns), "rows": rows}
+
+    def stats(self) -> dict:
+        with self._lock:
+            stations = {name: dict(counters) for name, counters in self.counters.items()}
+        caches = {id(station.cache): station.cache for station in self.stations.values() if station.cached}
+        return {"backend": self.backend, "stations": stations,
+                "result_cache": [cache.stats() for cache in caches.values()]}
+
+
+class StationRequestHandler(BaseHTTPRequestHandler):
+    # keep-alive so a train reuses one connection for all of its queries
+    protocol_version = "HTTP/1.1"
+    # headers and body are separate writes; without this the body waits on
+    # the client's delayed ACK
+    disable_nagle_algorithm = True
+    data = None  # DataStation, set by serve()
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == "/health":
+            self._send(200, "ok")
+        elif url.path == "/stations":
+            self._send(200, json.dumps(self.data.info), "application/json")
+        elif url.path == "/stats":
+            self._send(200, json.dumps(self.data.stats()), "application/json")
+        elif url.path.startswith("/sparql/"):
+            self._query(url.path, parse_qs(url.query).get("query", [None])[0])
+        else:
+            self._send(404, "Not found")
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length).decode("utf-8")
+        url = urlsplit(self.path)
+        if not url.path.startswith("/sparql/"):
+            self._send(404, "Not found")
+            return
+        if self.headers.get("Content-Type", "").startswith("application/x-www-form-urlencoded"):
+            body = parse_qs(body).get("query", [None])[0]
+        self._query(url.path, body)
+
+    def _query(self, path: str, query: str):
+        name = unquote(path[len("/sparql/"):])
+        if name not in self.data.stations:
+            self._send(404, f"No station {name}")
+            return
+        if not query:
+            self._send(400, "Missing query")
+            return
+        try:
+            result = self.data.query(name, query)
+        except (ParseException, SyntaxError, ValueError) as e:
+            self._send(400, f"Invalid query: {e}")
+            return
+        except Exception as e:
+            self._send(500, f"SPARQL engine error: {e}")
+            return
+        self._send(200, json.dumps(result, ensure_ascii=False), "application/json")
+
+    def _send(self, status: int, body: str, content_type: str = "text/plain"):
+        payload = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StationServer(ThreadingHTTPServer):
+    # the default backlog of 5 resets connections when many trains start at once
+    request_queue_size = 128
+    daemon_threads = True
+
+
+def serve(directory: str = DEFAULT_DIR, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+          backend: str = SPARQL_BACKEND):
+    start = time.perf_counter()
+    data = DataStation(directory, backend)
+    for name, info in data.info.items():
+        sys.stderr.write(f"station-server: {name}: {info['triples']} triples in {info['load_s']:.2f} s\n")
+    sys.stderr.write(f"station-server: {len(data.stations)} stations loaded in {time.perf_counter() - start:.2f} s\n")
+
+    handler = type("Handler", (StationRequestHandler,), {"data": data})
+    server = StationServer((host, port), handler)
+    print(f"SPARQL station server listening on http://{host}:{port}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local SPARQL data station with preloaded RDF files")
+    parser.add_argument("--dir", default=DEFAULT_DIR, help="directory of the station files")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--backend", default=SPARQL_BACKEND,
+                        choices=[name for name, station in BACKENDS.items() if station.local])
+    args = parser.parse_args()
+    serve(args.dir, args.host, args.port, args.backend)
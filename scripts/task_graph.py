@@ -0,0 +1,75 @@
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Tuple
+
+# Small dependency graph of train steps. A task runs as soon as the tasks it
+# depends on are done and receives their results as arguments, so policy
+# requests, station loads and queries that do not depend on each other
+# overlap on a thread pool. Parsing and querying hold the GIL, so the gain is
+# the ODRL round-trips running while stations load and queries run.
+#
+# TRAIN_WORKERS sets the pool size; TRAIN_WORKERS=1 runs the tasks one after
+# another in the order they were added, like the scripts did before.
+
+DEFAULT_WORKERS = int(os.environ.get("TRAIN_WORKERS", "8"))
+
+
+class TaskGraph:
+
+    def __init__(self):
+        self._tasks: Dict[str, Tuple[Callable, Tuple[str, ...]]] = {}
+        self.timings: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+        self._started = None
+
+    def add(self, name: str, fn: Callable, *deps: str) -> str:
+        # Dependencies must already be in the graph, which keeps it acyclic
+        # and the insertion order a valid serial order
+        if name in self._tasks:
+            raise ValueError(f"task {name!r} added twice")
+        missing = [dep for dep in deps if dep not in self._tasks]
+        if missing:
+            raise ValueError(f"task {name!r} depends on unknown tasks: {', '.join(missing)}")
+        self._tasks[name] = (fn, deps)
+        return name
+
+    def _call(self, name: str, results: Dict[str, Any]) -> Any:
+        fn, deps = self._tasks[name]
+        start = time.perf_counter()
+        try:
+            return fn(*(results[dep] for dep in deps))
+        finally:
+            with self._lock:
+                self.timings[name] = (start - self._started, time.perf_counter() - self._started)
+
+    def run(self, workers: int = DEFAULT_WORKERS) -> Dict[str, Any]:
+        # Runs every task and returns {name: result}; the first failing task
+        # cancels the ones not started yet and its exception is raised
+        self._started = time.perf_counter()
+        self.timings.clear()
+        results: Dict[str, Any] = {}
+        if workers <= 1:
+            for name in self._tasks:
+                results[name] = self._call(name, results)
+            return results
+
+        waiting = dict(self._tasks)
+        running = {}
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="train-task") as pool:
+            while waiting or running:
+                for name, (_, deps) in list(waiting.items()):
+                    if all(dep in results for dep in deps):
+                        del waiting[name]
+                        running[pool.submit(self._call, name, results)] = name
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    error = future.exception()
+                    if error is not None:
+                        for pending in running:
+                            pending.cancel()
+                        raise error
+                    results[name] = future.result()
+        return results
@@ -0,0 +1,64 @@
+from typing import Callable, Iterable, Optional, Sequence, Tuple
+
+# Subject pivot for (subject, predicate, object) rows: one record per
+# subject, one column per predicate. Records are found through a dict keyed
+# by subject, so the pivot is a single linear pass over the triples; the
+# frame is then built column by column.
+#
+# The frame matches pd.DataFrame(records) over the records the scripts used
+# to build: rows in first-seen subject order, columns in the order pandas
+# gives a list of dicts, NaN where a subject lacks a predicate.
+
+MULTI_VALUES = ("last", "first", "join", "list")
+
+
+def local_name(uri: str) -> str:
+    return uri.split("/")[-1]
+
+
+def pivot_triples(triples: Iterable[Tuple[str, str, str]], columns: Optional[Sequence[str]] = None,
+                  multi: str = "last", delimiter: str = "; ", subject_column: Optional[str] = None,
+                  predicate_name: Optional[Callable[[str], str]] = local_name):
+    # columns: predicate names to keep, in this order (default: all)
+    # multi: what a predicate with several objects for one subject becomes:
+    #   "last"/"first" object, "join" of the distinct objects, or a "list"
+    # subject_column: also keep the subject, under this column name
+    import pandas as pd
+
+    if multi not in MULTI_VALUES:
+        raise ValueError(f"multi must be one of {', '.join(MULTI_VALUES)}, got {multi!r}")
+    keep = set(columns) if columns is not None else None
+
+    rows = {}      # subject -> row number
+    cells = {}     # column -> {row number: value}
+    order = {}     # column -> (first row holding it, position within that row)
+    position = 0
+    for subject, predicate, obj in triples:
+        name = predicate_name(predicate) if predicate_name else predicate
+        if keep is not None and name not in keep:
+            continue
+        row = rows.setdefault(subject, len(rows))
+        column = cells.get(name)
+        if column is None:
+            column = cells[name] = {}
+        if row not in column:
+            position += 1
+            if name not in order or (row, position) < order[name]:
+                order[name] = (row, position)
+            column[row] = [obj] if multi in ("join", "list") else obj
+        elif multi == "last":
+            column[row] = obj
+        elif multi == "list" or (multi == "join" and obj not in column[row]):
+            column[row].append(obj)
+
+    names = list(columns) if columns is not None else sorted(cells, key=order.__getitem__)
+    n = len(rows)
+    data = {}
+    if subject_column is not None:
+        data[subject_column] = list(rows)
+    for name in names:
+        column = cells.get(name, {})
+        if multi == "join":
+            column = {row: delimiter.join(values) for row, values in column.items()}
+        data[name] = [column.get(row, float("nan")) for row in range(n)]
+    return pd.DataFrame(data, columns=list(data))
@@ -0,0 +1,191 @@
+from typing import Iterable, List, Sequence, Tuple
+import numpy as np
+import pandas as pd
+
+# Drug and outcome aggregation of VigiLyze reports. A report holds one line
+# per drug (or reaction) in several columns at once, lines aligned by
+# position; a report becomes as many rows as its longest cell has lines,
+# shorter cells padded with None, NaN cells holding no lines. Each column is
+# factorized, so splitting and normalising run once per distinct cell and
+# numpy gathers and places the lines of every cell; the counts per patient
+# are groupby/nunique over the exploded frame.
+#
+# Reports are keyed by id_column as the scripts' dicts of reports were: a
+# later report with the same ID replaces the earlier one in its place, and a
+# report without an ID (NaN) stands alone. Without the column, reports are
+# "Row_<index label>".
+
+ID = "ID"
+REPORT = "report"
+LINE = "line"
+
+# Columns of a VigiLyze line listing as the station's predicates (the export
+# headers, spaces as underscores, the part after the last '/'). The report
+# frame always holds them, in this order, whether or not a kept report fills
+# them, so the output schema does not depend on which reports match.
+VIGI_COLUMNS = (
+    'UMC_report_ID', 'Worldwide_unique_ID', 'Safety_report_ID', 'Original_format',
+    'Suspected_duplicate_of_UMC_report_ID_(vigiMatch)', '10_latest_historical_UMC_report_ID(s)', 'initial_date',
+    'latest_entry_date', 'National_PV_Centre_initial_receive_date', 'National_PV_Centre_latest_receive_date',
+    'Completeness_score', 'Country_of_primary_source', 'Reporter_qualification', 'Sex', 'Age', 'Age_unit',
+    'Age_group', 'Weight_(kg)', 'Height_(cm)', 'Serious', 'Seriousness_criteria', 'Fatal', 'Pregnancy_case',
+    'Study_name', 'Interacting_drugs', 'Reported_medication', 'WHODrug_trade_name',
+    'WHODrug_active_ingredient_variant', 'Role', 'Indication', 'Dose', 'Dose_unit', 'Dosage_regimen',
+    'Route_of_admin.', 'Start_Date', 'End_date', 'Action_taken_with_drug', 'Batch_number', 'Term_reported_to_UMC',
+    'Mapped_term', 'MedDRA_preferred_term', 'Start_date', 'End_date.1', 'Outcome',
+)
+
+
+def with_vigi_columns(df: pd.DataFrame) -> pd.DataFrame:
+    # VIGI_COLUMNS (NaN where the station has none), then any other column
+    extra = [column for column in df.columns if column not in VIGI_COLUMNS]
+    return df.reindex(columns=list(VIGI_COLUMNS) + extra)
+
+
+def report_ids(df: pd.DataFrame, id_column: str) -> np.ndarray:
+    if id_column in df.columns:
+        return df[id_column].to_numpy(dtype=object)
+    return np.array([f"Row_{label}" for label in df.index], dtype=object)
+
+
+def kept_reports(ids: np.ndarray) -> np.ndarray:
+    # positions of the reports a dict keyed by ID keeps, in its order
+    codes, uniques = pd.factorize(ids)
+    positions = np.arange(len(ids))
+    keyed = codes >= 0
+    first = np.full(len(uniques), len(ids), dtype=np.int64)
+    np.minimum.at(first, codes[keyed], positions[keyed])
+    last = np.full(len(uniques), -1, dtype=np.int64)
+    np.maximum.at(last, codes[keyed], positions[keyed])
+    # a report is kept where its ID was first seen, if no later one replaces it
+    kept = ~keyed
+    kept[keyed] = last[codes[keyed]] == positions[keyed]
+    place = positions.copy()
+    place[keyed] = first[codes[keyed]]
+    rows = np.flatnonzero(kept)
+    return rows[np.argsort(place[rows], kind="stable")]
+
+
+def _distinct(values: pd.Series):
+    # (code per cell, -1 for NaN; distinct cells as str)
+    if values.dtype == object:
+        # factorize would take 1, 1.0 and True for one value
+        values = values.where(values.isna(), values.astype(str))
+    codes, uniques = pd.factorize(values)
+    return codes, [str(value) for value in np.asarray(uniques, dtype=object).tolist()]
+
+
+def split_cells(values: pd.Series, delimiter: str, strip: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+    # (number of parts per cell, the parts of every cell in order); NaN
+    # cells have none
+    codes, uniques = _distinct(values)
+    parts = [value.split(delimiter) for value in uniques]
+    if strip:
+        parts = [[part.strip() for part in cell] for cell in parts]
+    sizes = np.array([len(cell) for cell in parts] + [0], dtype=np.int64)
+    flat = np.empty(int(sizes.sum()), dtype=object)
+    flat[:] = [part for cell in parts for part in cell]
+    offsets = np.cumsum(sizes) - sizes
+    counts = sizes[codes]
+    starts = np.cumsum(counts) - counts
+    return counts, flat[np.repeat(offsets[codes] - starts, counts) + np.arange(int(counts.sum()))]
+
+
+def explode_multiline(df: pd.DataFrame, columns: Sequence[str], delimiter: str = "\n",
+                      id_column: str = "UMC_report_ID") -> pd.DataFrame:
+    # One row per (report, line number): "ID", "report" (its position
+    # among the kept reports), "line" and the columns, lowercased, holding
+    # that line of each cell or None; ordered by report, then line
+    ids = report_ids(df, id_column)
+    rows = kept_reports(ids)
+    n = len(rows)
+
+    split = []
+    lengths = np.zeros(n, dtype=np.int64)
+    for column in columns:
+        counts, lines = split_cells(df[column].iloc[rows], delimiter)
+        split.append((counts, lines))
+        lengths = np.maximum(lengths, counts)
+
+    total = int(lengths.sum())
+    starts = np.cumsum(lengths) - lengths
+    line = np.arange(total) - np.repeat(starts, lengths)
+    frame = {ID: np.repeat(ids[rows], lengths), REPORT: np.repeat(np.arange(n), lengths), LINE: line}
+    for column, (counts, lines) in zip(columns, split):
+        # the k-th line of a cell goes to its report's k-th row
+        cell_starts = np.cumsum(counts) - counts
+        placed = np.full(total, None, dtype=object)
+        placed[np.repeat(starts - cell_starts, counts) + np.arange(len(lines))] = lines
+        frame[column.lower()] = placed
+    return pd.DataFrame(frame)
+
+
+def normalized(values: pd.Series) -> np.ndarray:
+    # stripped, lowercased text; None (padding) as ""
+    codes, uniques = _distinct(values)
+    return np.array([value.strip().lower() for value in uniques] + [""], dtype=object)[codes]
+
+
+def split_items(frame: pd.DataFrame, column: str, delimiter: str = ";") -> pd.DataFrame:
+    # one row per non-blank delimiter-separated item of the column, stripped
+    counts, items = split_cells(frame[column], delimiter, strip=True)
+    exploded = frame.iloc[np.repeat(np.arange(len(frame)), counts)].reset_index(drop=True)
+    exploded[column] = items
+    return exploded[items != ""]
+
+
+def any_line_in(values: pd.Series, allowed: Iterable[str], delimiter: str = "\n") -> pd.Series:
+    # whether any line of each cell (NaN as "nan"), stripped and lowercased,
+    # is in allowed
+    allowed = set(allowed)
+    codes, uniques = _distinct(values)
+    found = [any(line.strip().lower() in allowed for line in value.split(delimiter)) for value in uniques]
+    return pd.Series(np.array(found + ["nan" in allowed], dtype=bool)[codes], index=values.index)
+
+
+def count_per_patient(frame: pd.DataFrame, keys: Sequence[str]) -> Tuple[pd.DataFrame, List[np.ndarray]]:
+    # (keys in first-seen order with "count", the reports holding them;
+    # per key, those reports' IDs, first seen first)
+    keys = list(keys)
+    firsts = frame.drop_duplicates([REPORT] + keys)
+    grouped = firsts.groupby(keys, sort=False, dropna=False)
+    counts = grouped[REPORT].nunique().rename("count").reset_index()
+    group = grouped.ngroup().to_numpy()
+    ids = firsts[ID].to_numpy(dtype=object)[np.argsort(group, kind="stable")]
+    return counts, np.split(ids, np.cumsum(np.bincount(group, minlength=len(counts)))[:-1])
+
+
+def aggregate_drugs(drug_lines: pd.DataFrame) -> list:
+    # per (drug, role, action) of the suspect and concomitant drugs, in
+    # first-seen order: how many patients' reports hold it and their IDs.
+    # Drug lines are split on ";" into single drugs.
+    drugs = pd.DataFrame({
+        ID: drug_lines[ID],
+        REPORT: drug_lines[REPORT],
+        "drug": normalized(drug_lines["whodrug_active_ingredient_variant"]),
+        "role": normalized(drug_lines["role"]),
+        "action": normalized(drug_lines["action_taken_with_drug"]),
+    })
+    drugs = split_items(drugs[drugs["role"].isin({"suspect", "concomitant"})], "drug")
+    counts, ids = count_per_patient(drugs, ["drug", "role", "action"])
+    return [
+        {"drug": drug, "role": role, "count": int(count), "actions": [action] if action else [],
+         "ID": list(set(patients.tolist()))}
+        for (drug, role, action, count), patients in zip(counts.itertuples(index=False, name=None), ids)
+    ]
+
+
+def aggregate_outcomes(outcome_lines: pd.DataFrame) -> list:
+    # per (reaction, result), in first-seen order: how many patients'
+    # reports hold it and their IDs
+    outcomes = pd.DataFrame({
+        ID: outcome_lines[ID],
+        REPORT: outcome_lines[REPORT],
+        "reaction": normalized(outcome_lines["mapped_term"]),
+        "result": normalized(outcome_lines["outcome"]),
+    })
+    counts, ids = count_per_patient(outcomes, ["reaction", "result"])
+    return [
+        {"reaction": reaction, "result": result, "count": int(count), "ID": list(set(patients.tolist()))}
+        for (reaction, result, count), patients in zip(counts.itertuples(index=False, name=None), ids)
+    ]
@@ -34,11 +34,23 @@ public class ConditionalAnalysisController {
                 ));
         }
     }
+    // ?batch=true evaluates every odrl:Request in the body (one turtle document,
+    // or a JSON list of turtle documents) and returns the decisions keyed by request IRI
     @PostMapping("/odrl-execute")
-    public ResponseEntity<?> executeODRL(@RequestBody String odrlPolicyTurtle) {
+    public ResponseEntity<?> executeODRL(@RequestBody String odrlPolicyTurtle,
+                                         @RequestParam(name = "batch", defaultValue = "false") boolean batch) {
         try {
-            String result = odrlService.executeODRLPolicy(odrlPolicyTurtle);
-            return ResponseEntity.ok(result);
+            if (batch) {
+                Map<String, Object> decisions = odrlService.executeODRLBatch(odrlPolicyTurtle);
+                return ResponseEntity.ok(decisions);
+            }
+            ODRLService.ODRLQuery result = odrlService.executeODRLPolicy(odrlPolicyTurtle);
+            ResponseEntity.BodyBuilder response = ResponseEntity.ok();
+            if (result.fingerprint() != null) {
+                response.header("X-Query-Fingerprint", result.fingerprint());
+                response.header("X-Query-Template-Fingerprint", result.templateFingerprint());
+            }
+            return response.body(result.query());
         } catch (Exception e) {
             return ResponseEntity.internalServerError()
                 .body(Map.of(
@@ -1,18 +1,183 @@
 package com.example.traincoordinator.service;
 
+import org.springframework.beans.factory.annotation.Value;
 import org.springframework.core.io.ClassPathResource;
 import org.springframework.stereotype.Service;
 
+import jakarta.annotation.PreDestroy;
+
 import java.io.*;
+import java.net.URI;
+import java.net.http.HttpClient;
+import java.net.http.HttpRequest;
+import java.net.http.HttpResponse;
+import java.nio.charset.StandardCharsets;
 import java.nio.file.Path;
+import java.time.Duration;
+import java.util.ArrayList;
+import java.util.List;
+import java.util.Map;
+
+import com.fasterxml.jackson.core.type.TypeReference;
+import com.fasterxml.jackson.databind.ObjectMapper;
 
 @Service
 public class ODRLService {
 
-    public String executeODRLPolicy(String odrlTurtleString) throws IOException, InterruptedException {
+    // Resident ODRL decision server (ODRL/server.py), started once and kept warm
+    @Value("${odrl.server.enabled:true}")
+    private boolean serverEnabled;
+
+    @Value("${odrl.server.port:6061}")
+    private int serverPort;
+
+    @Value("${odrl.server.startup-timeout-ms:15000}")
+    private long serverStartupTimeoutMs;
+
+    private final HttpClient httpClient = HttpClient.newBuilder()
+            .connectTimeout(Duration.ofSeconds(2))
+            .build();
+
+    private final ObjectMapper objectMapper = new ObjectMapper();
+
+    private Process serverProcess;
+
+    // Set once the server answered its health check, cleared when a request to
+    // it fails; while set, requests go straight to the server
+    private volatile boolean serverHealthy;
+
+    // Granted query (or the engine's deny message) plus the fingerprints the
+    // decision server returns for client-side caching of the prepared query;
+    // the fingerprints are null when the engine ran as a one-off process
+    public record ODRLQuery(String query, String fingerprint, String templateFingerprint) {}
+
+    public ODRLQuery executeODRLPolicy(String odrlTurtleString) throws IOException, InterruptedException {
+        if (serverEnabled) {
+            try {
+                HttpResponse<String> response = postToServer("/decide", odrlTurtleString);
+                return new ODRLQuery(
+                        response.body().trim(),
+                        response.headers().firstValue("X-Query-Fingerprint").orElse(null),
+                        response.headers().firstValue("X-Query-Template-Fingerprint").orElse(null));
+            } catch (IOException e) {
+                // Server could not be reached or failed, fall back to one process per request
+                System.err.println("ODRL server failed, spawning engine instead: " + e.getMessage());
+            }
+        }
+        return new ODRLQuery(runEngineProcess(odrlTurtleString), null, null);
+    }
+
+    // Decisions for every request in the payload: {request IRI: {"allowed": ..., "query": ...}}
+    public Map<String, Object> executeODRLBatch(String odrlPayload) throws IOException, InterruptedException {
+        String json = null;
+        if (serverEnabled) {
+            try {
+                json = postToServer("/decide-batch", odrlPayload).body();
+            } catch (IOException e) {
+                System.err.println("ODRL server failed, spawning engine instead: " + e.getMessage());
+            }
+        }
+        if (json == null) {
+            json = runEngineProcess(odrlPayload, "--batch");
+        }
+        return objectMapper.readValue(json, new TypeReference<Map<String, Object>>() {});
+    }
+
+    private HttpResponse<String> postToServer(String path, String body) throws IOException, InterruptedException {
+        ensureServerRunning();
+
+        HttpRequest request = HttpRequest.newBuilder(serverUri(path))
+                .timeout(Duration.ofSeconds(30))
+                .header("Content-Type", "text/turtle")
+                .POST(HttpRequest.BodyPublishers.ofString(body, StandardCharsets.UTF_8))
+                .build();
+        HttpResponse<String> response;
+        try {
+            response = httpClient.send(request, HttpResponse.BodyHandlers.ofString(StandardCharsets.UTF_8));
+        } catch (IOException e) {
+            serverHealthy = false;
+            throw e;
+        }
+
+        if (response.statusCode() != 200) {
+            serverHealthy = false;
+            throw new IOException("ODRL server failed with status " + response.statusCode() + ": " + response.body());
+        }
+        return response;
+    }
+
+    private void ensureServerRunning() throws IOException, InterruptedException {
+        if (serverHealthy) {
+            return;
+        }
+        synchronized (this) {
+            if (!serverHealthy) {
+                startServer();
+                serverHealthy = true;
+            }
+        }
+    }
+
+    private void startServer() throws IOException, InterruptedException {
+        // Our server, another coordinator's or a manually started one may
+        // already answer on the port
+        if (isServerHealthy()) {
+            return;
+        }
+        // A server process that stopped answering is replaced
+        stopServer();
+
+        Path serverPath = new ClassPathResource("ODRL/server.py")
+                .getFile().toPath();
+        ProcessBuilder pb = new ProcessBuilder("python", serverPath.toString(), "--port", String.valueOf(serverPort));
+        pb.inheritIO();
+        serverProcess = pb.start();
+
+        long deadline = System.currentTimeMillis() + serverStartupTimeoutMs;
+        while (System.currentTimeMillis() < deadline) {
+            if (!serverProcess.isAlive()) {
+                throw new IOException("ODRL server exited with code " + serverProcess.exitValue());
+            }
+            if (isServerHealthy()) {
+                return;
+            }
+            Thread.sleep(100);
+        }
+        stopServer();
+        throw new IOException("ODRL server did not become ready within " + serverStartupTimeoutMs + " ms");
+    }
+
+    private boolean isServerHealthy() throws InterruptedException {
+        HttpRequest request = HttpRequest.newBuilder(serverUri("/health"))
+                .timeout(Duration.ofSeconds(1))
+                .GET()
+                .build();
+        try {
+            return httpClient.send(request, HttpResponse.BodyHandlers.ofString()).statusCode() == 200;
+        } catch (IOException e) {
+            return false;
+        }
+    }
+
+    private URI serverUri(String path) {
+        return URI.create("http://127.0.0.1:" + serverPort + path);
+    }
+
+    @PreDestroy
+    public synchronized void stopServer() {
+        serverHealthy = false;
+        if (serverProcess != null) {
+            serverProcess.destroy();
+            serverProcess = null;
+        }
+    }
+
+    private String runEngineProcess(String odrlTurtleString, String... args) throws IOException, InterruptedException {
         Path odrlPath = new ClassPathResource("ODRL/main.py")
                 .getFile().toPath();
-        ProcessBuilder pb = new ProcessBuilder("python", odrlPath.toString());
+        List<String> command = new ArrayList<>(List.of("python", odrlPath.toString()));
+        command.addAll(List.of(args));
+        ProcessBuilder pb = new ProcessBuilder(command);
 
         Process process = pb.start();
 
@@ -0,0 +1,38 @@
+import argparse
+import os
+import sys
+import time
+from engine.policy_bundle import (BUNDLE_PATH, BUNDLE_VERSION, POLICY_DIR, QUERY_DIR, compile_bundle, read_header,
+                                  source_state)
+
+# compile-policies: compiles policies/*.ttl and data/*.txt into the policy
+# bundle the engine loads at start-up (see engine/policy_bundle.py).
+#
+#   python compile_policies.py            write policies.bundle
+#   python compile_policies.py --check    exit 1 if the bundle is missing or stale
+#
+# Honours ODRL_POLICY_DIR, ODRL_QUERY_DIR and ODRL_POLICY_BUNDLE like the engine.
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compile ODRL policies and queries into a policy bundle")
+    parser.add_argument("--output", default=BUNDLE_PATH, help="bundle path")
+    parser.add_argument("--check", action="store_true", help="only check that the bundle is current")
+    args = parser.parse_args()
+
+    if args.check:
+        header = read_header(args.output)
+        content_hash = source_state(POLICY_DIR, QUERY_DIR)[0].hex()
+        if header is None:
+            print(f"{args.output}: missing or not a policy bundle")
+            sys.exit(1)
+        if header != (BUNDLE_VERSION, content_hash):
+            print(f"{args.output}: stale (bundle {header[1][:12]} v{header[0]}, sources {content_hash[:12]} v{BUNDLE_VERSION})")
+            sys.exit(1)
+        print(f"{args.output}: current ({content_hash[:12]})")
+        sys.exit(0)
+
+    start = time.perf_counter()
+    content_hash = compile_bundle(POLICY_DIR, QUERY_DIR, args.output)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    print(f"wrote {args.output} ({os.path.getsize(args.output)} bytes, sha256 {content_hash[:12]}) in {elapsed_ms:.0f} ms")
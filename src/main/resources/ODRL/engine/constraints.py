@@ -0,0 +1,119 @@
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import FrozenSet, Iterable, List, Optional
+
+# Constraint compiler: each odrl:constraint of a policy becomes a predicate
+# object once, at policy load time. Membership operators become frozenset
+# lookups, ordered operators a single bound compared against each value, so a
+# request is never checked by scanning the policy's value list.
+#
+# Supported operators: odrl:eq, odrl:neq, odrl:isAnyOf, odrl:isNoneOf,
+# odrl:lt, odrl:gt, odrl:lteq, odrl:gteq. String values compare
+# case-insensitively; ordered operators compare numbers or ISO dates when
+# every policy value parses as one. Unknown operators keep the engine's
+# original behaviour of a membership check.
+
+ODRL_NS = "http://www.w3.org/ns/odrl/2/"
+
+MEMBERSHIP_OPERATORS = {"eq": False, "isAnyOf": False, "neq": True, "isNoneOf": True}
+ORDERED_OPERATORS = {"lt", "gt", "lteq", "gteq"}
+
+
+def _to_number(value: str) -> Optional[float]:
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def _to_date(value: str) -> Optional[datetime]:
+    try:
+        parsed = datetime.fromisoformat(value.strip())
+    except ValueError:
+        try:
+            parsed = datetime.combine(date.fromisoformat(value.strip()), datetime.min.time())
+        except ValueError:
+            return None
+    # compare naive and aware timestamps on the same footing
+    return parsed.replace(tzinfo=None)
+
+
+def _to_text(value: str) -> str:
+    return value.lower()
+
+
+CONVERTERS = {"number": _to_number, "date": _to_date, "text": _to_text}
+
+
+@dataclass(frozen=True)
+class MembershipPredicate:
+    operator: str
+    values: FrozenSet[str]  # lower-cased
+    negate: bool
+
+    @property
+    def is_wildcard(self) -> bool:
+        # "()" on a permission means any value
+        return not self.values
+
+    def matches(self, value: str) -> bool:
+        return (value.lower() in self.values) != self.negate
+
+    def matches_any(self, values: Iterable[str]) -> bool:
+        return any(self.matches(v) for v in values)
+
+    def matches_all(self, values: Iterable[str]) -> bool:
+        return all(self.matches(v) for v in values)
+
+
+@dataclass(frozen=True)
+class RangePredicate:
+    operator: str
+    kind: str  # "number", "date" or "text"
+    lower: object  # smallest policy value, after conversion
+    upper: object  # largest policy value, after conversion
+
+    @property
+    def is_wildcard(self) -> bool:
+        return False
+
+    def matches(self, value: str) -> bool:
+        converted = CONVERTERS[self.kind](value)
+        if converted is None:
+            return False
+        # Against a list of operands a value matches if it satisfies the
+        # comparison with any of them, i.e. with the loosest bound
+        if self.operator == "lt":
+            return converted < self.upper
+        if self.operator == "lteq":
+            return converted <= self.upper
+        if self.operator == "gt":
+            return converted > self.lower
+        return converted >= self.lower
+
+    def matches_any(self, values: Iterable[str]) -> bool:
+        return any(self.matches(v) for v in values)
+
+    def matches_all(self, values: Iterable[str]) -> bool:
+        return all(self.matches(v) for v in values)
+
+
+def get_local_name(uri: str) -> str:
+    return uri.split("/")[-1]
+
+
+def compile_constraint(operator_uri: Optional[str], values: List[str]):
+    operator = get_local_name(str(operator_uri)) if operator_uri else "eq"
+
+    if operator in ORDERED_OPERATORS and values:
+        for kind in ("number", "date", "text"):
+            converted = [CONVERTERS[kind](v) for v in values]
+            if all(c is not None for c in converted):
+                return RangePredicate(operator=operator, kind=kind, lower=min(converted), upper=max(converted))
+
+    negate = MEMBERSHIP_OPERATORS.get(operator, False)
+    return MembershipPredicate(
+        operator=operator,
+        values=frozenset(v.lower() for v in values),
+        negate=negate
+    )
@@ -0,0 +1,175 @@
+import atexit
+import json
+import math
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+# Decision tracing: per-phase timings of every decision go into in-memory
+# latency histograms, and (when an audit log path is configured) one JSON
+# line per decision into an append-only log. The decision path only appends
+# the record to a buffer; a background thread serialises and writes it.
+
+# Histogram buckets are powers of two in microseconds: bucket i counts
+# samples up to 2**i us (1 us .. ~67 s, the last bucket takes the rest)
+BUCKETS = 27
+
+
+class LatencyHistogram:
+
+    def __init__(self):
+        self.counts = [0] * BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        # Smallest i with us <= 2**i, so an exact power of two stays in its bucket
+        us = math.ceil(round(seconds * 1e6, 3))
+        bucket = min(BUCKETS - 1, max(us - 1, 0).bit_length())
+        with self._lock:
+            self.counts[bucket] += 1
+            self.count += 1
+            self.total += seconds
+            if self.min is None or seconds < self.min:
+                self.min = seconds
+            if self.max is None or seconds > self.max:
+                self.max = seconds
+
+    def percentile(self, pct: float) -> Optional[float]:
+        # Upper bound (us) of the bucket holding the percentile
+        if not self.count:
+            return None
+        rank = pct / 100 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if n and seen >= rank:
+                return float(2 ** i)
+        return float(2 ** (BUCKETS - 1))
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "count": self.count,
+                "mean_us": self.total / self.count * 1e6 if self.count else None,
+                "min_us": self.min * 1e6 if self.min is not None else None,
+                "max_us": self.max * 1e6 if self.max is not None else None,
+                "p50_us": self.percentile(50),
+                "p90_us": self.percentile(90),
+                "p99_us": self.percentile(99),
+                "buckets": [{"le_us": 2 ** i, "count": n} for i, n in enumerate(self.counts) if n],
+            }
+
+
+class LatencyHistograms:
+    # One histogram per decision phase, created on first use
+
+    def __init__(self):
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def record(self, phase: str, seconds: float):
+        histogram = self._histograms.get(phase)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(phase, LatencyHistogram())
+        histogram.record(seconds)
+
+    def to_dict(self) -> dict:
+        return {phase: histogram.to_dict() for phase, histogram in sorted(self._histograms.items())}
+
+
+class DecisionTrace:
+    # Phase timings of one decision: mark(phase) closes the phase that
+    # started at the previous mark
+
+    __slots__ = ("started", "timings", "cache_hit", "_last")
+
+    def __init__(self):
+        self.started = self._last = time.perf_counter()
+        self.timings: Dict[str, float] = {}
+        self.cache_hit = False
+
+    def mark(self, phase: str):
+        now = time.perf_counter()
+        self.timings[phase] = now - self._last
+        self._last = now
+
+    @property
+    def total(self) -> float:
+        return self._last - self.started
+
+
+class AuditLog:
+    # Buffered append-only JSON lines log. record() never does I/O: records
+    # are appended to a buffer that a daemon thread flushes every
+    # flush_interval seconds (or earlier once batch_size records wait). When
+    # more than max_pending records wait, new ones are dropped and counted.
+
+    def __init__(self, path: str, flush_interval: float = 1.0, batch_size: int = 1000,
+                 max_pending: int = 100000):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self.written = 0
+        self.dropped = 0
+        self._pending: List[dict] = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread = None
+
+    def record(self, entry: dict):
+        with self._lock:
+            if self._closed or len(self._pending) >= self.max_pending:
+                self.dropped += 1
+                return
+            self._pending.append(entry)
+            pending = len(self._pending)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="odrl-audit-log", daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+        if pending >= self.batch_size:
+            self._wake.set()
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if not batch:
+            return
+        lines = "".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in batch)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+        self.written += len(batch)
+
+    def close(self):
+        # Stops the writer and flushes what is left (also run at exit)
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+        self._wake.set()
+        if thread is not None:
+            thread.join()
+        self.flush()
+
+    def stats(self) -> dict:
+        with self._lock:
+            pending = len(self._pending)
+        return {"path": self.path, "written": self.written, "pending": pending, "dropped": self.dropped}
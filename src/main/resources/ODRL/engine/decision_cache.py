@@ -0,0 +1,86 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+# Marks a cache miss, since None is a valid (deny) decision
+MISSING = object()
+
+
+class DecisionCache:
+    # Bounded LRU cache of policy decisions with a time-to-live. The caller
+    # clears it whenever policies/ or data/ change, so a revoked permission is
+    # never served from the cache. Every clear() starts a new generation; a
+    # decision computed before the clear (read generation first, pass it to
+    # put) is dropped instead of cached. max_size=0 disables caching.
+
+    def __init__(self, max_size: int = 1024, ttl: float = 300.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires_at, decision)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.stale_puts = 0
+        self.generation = 0
+
+    def get(self, key: Hashable, default: Any = MISSING) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            expires_at, decision = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return decision
+
+    def put(self, key: Hashable, decision: Any, generation: Optional[int] = None):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                self.stale_puts += 1
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, decision)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            if self._entries:
+                self._entries.clear()
+            self.generation += 1
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "stale_puts": self.stale_puts,
+                "generation": self.generation
+            }
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,227 @@
+import re
+
+# Fast path for the request template every train sends: one odrl:Request with
+# one permission blank node (target, assignee, action and optional constraint
+# lists). It extracts the same dict as request_parser.parse_request without
+# building an rdflib graph. Anything outside that shape (escapes, long
+# strings, language tags, blank node labels, several requests, repeated
+# properties, ...) makes parse_request_fast return None so the caller falls
+# back to rdflib.
+
+ODRL_NS = "http://www.w3.org/ns/odrl/2/"
+EX_NS = "http://example.org/"
+RDF_TYPE = "http://www.w3.org/1999/02/22-rdf-syntax-ns#type"
+
+_TOKEN = re.compile(r'''
+    (?P<ws>\s+|\#[^\n]*)
+  | (?P<iri><[^<>"{}|^`\\\s]*>)
+  | (?P<string>"[^"\\\n\r]*"(?!"))
+  | (?P<pname>(?:[A-Za-z](?:[\w.-]*[\w-])?)?:(?:[\w-](?:[\w.-]*[\w-])?)?)
+  | (?P<prefix>@prefix\b|PREFIX\b)
+  | (?P<a>a\b)
+  | (?P<punct>[\[\]();,.])
+''', re.VERBOSE)
+
+
+class _Unsupported(Exception):
+    pass
+
+
+def _tokenize(text):
+    tokens = []
+    pos = 0
+    length = len(text)
+    while pos < length:
+        match = _TOKEN.match(text, pos)
+        if not match:
+            return None
+        kind = match.lastgroup
+        if kind != "ws":
+            tokens.append((kind, match.group()))
+        pos = match.end()
+    return tokens
+
+
+def get_local_name(uri):
+    return uri.split("/")[-1]
+
+
+class _TemplateParser:
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+        self.prefixes = {}
+
+    def _peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def _next(self):
+        token = self._peek()
+        if token[0] is None:
+            raise _Unsupported()
+        self.pos += 1
+        return token
+
+    def _expect(self, value):
+        if self._next()[1] != value:
+            raise _Unsupported()
+
+    def _resolve(self, kind, value):
+        if kind == "iri":
+            iri = value[1:-1]
+            if ":" not in iri:
+                raise _Unsupported()  # relative IRI, needs a base
+            return iri
+        if kind == "pname":
+            prefix, _, local = value.partition(":")
+            if prefix not in self.prefixes:
+                raise _Unsupported()
+            return self.prefixes[prefix] + local
+        raise _Unsupported()
+
+    def _term(self):
+        # IRI, prefixed name or plain string literal, as str() of the rdflib term
+        kind, value = self._next()
+        if kind == "string":
+            return value[1:-1]
+        return self._resolve(kind, value)
+
+    def _verb(self):
+        kind, value = self._next()
+        if kind == "a":
+            return RDF_TYPE
+        return self._resolve(kind, value)
+
+    def _properties(self, object_parser, terminator):
+        # predicateObjectList -> {predicate: [objects]}
+        properties = {}
+        while True:
+            if self._peek()[1] == terminator:
+                return properties
+            verb = self._verb()
+            while True:
+                properties.setdefault(verb, []).append(object_parser(verb))
+                if self._peek()[1] != ",":
+                    break
+                self._next()
+            if self._peek()[1] != ";":
+                return properties
+            while self._peek()[1] == ";":
+                self._next()
+
+    def parse(self):
+        while self._peek()[0] == "prefix":
+            directive = self._next()[1]
+            kind, name = self._next()
+            if kind != "pname" or not name.endswith(":"):
+                raise _Unsupported()
+            kind, iri = self._next()
+            if kind != "iri":
+                raise _Unsupported()
+            self.prefixes[name[:-1]] = self._resolve(kind, iri)
+            if directive == "@prefix":
+                self._expect(".")
+
+        kind, value = self._next()
+        self._resolve(kind, value)  # request subject must be a named IRI
+        request = self._properties(self._request_object, ".")
+        self._expect(".")
+        if self._peek()[0] is not None:
+            raise _Unsupported()  # more than one statement
+
+        if ODRL_NS + "Request" not in request.get(RDF_TYPE, []):
+            raise _Unsupported()
+        permissions = request.get(ODRL_NS + "permission", [])
+        if len(permissions) != 1:
+            raise _Unsupported()
+        permission = permissions[0]
+
+        data = {
+            "assignee": self._single(permission, "assignee"),
+            "action": self._single(permission, "action"),
+            "target": self._single(permission, "target"),
+            "constraints": {}
+        }
+        for constraint in permission.get(ODRL_NS + "constraint", []):
+            key = get_local_name(self._single(constraint, "leftOperand", required=True))
+            if key in data["constraints"]:
+                raise _Unsupported()
+            right = constraint.get(ODRL_NS + "rightOperand", [])
+            if len(right) != 1:
+                raise _Unsupported()
+            # A non-list right operand reads as an empty rdf Collection
+            data["constraints"][key] = right[0] if isinstance(right[0], list) else []
+
+        data["bindings"] = {}
+        for binding in request.get(EX_NS + "binding", []):
+            names = binding.get(EX_NS + "parameter", [])
+            values = binding.get(EX_NS + "values", [])
+            if len(names) != 1 or len(values) != 1 or names[0] in data["bindings"]:
+                raise _Unsupported()
+            data["bindings"][names[0]] = values[0] if isinstance(values[0], list) else []
+        return data
+
+    def _single(self, properties, name, required=False):
+        values = properties.get(ODRL_NS + name, [])
+        if len(values) > 1 or (required and not values):
+            raise _Unsupported()
+        if not values:
+            return "None"
+        if not isinstance(values[0], str):
+            raise _Unsupported()
+        return values[0]
+
+    def _request_object(self, verb):
+        if verb == ODRL_NS + "permission":
+            return self._blank_node(self._permission_object)
+        if verb == EX_NS + "binding":
+            return self._blank_node(self._binding_object)
+        return self._term()
+
+    def _binding_object(self, verb):
+        if verb == EX_NS + "values":
+            return self._list_or_term()
+        if verb == EX_NS + "parameter":
+            return self._term()
+        raise _Unsupported()
+
+    def _permission_object(self, verb):
+        if verb == ODRL_NS + "constraint":
+            return self._blank_node(self._constraint_object)
+        if verb in (ODRL_NS + "target", ODRL_NS + "assignee", ODRL_NS + "action"):
+            return self._term()
+        raise _Unsupported()
+
+    def _constraint_object(self, verb):
+        if verb == ODRL_NS + "rightOperand":
+            return self._list_or_term()
+        if verb in (ODRL_NS + "leftOperand", ODRL_NS + "operator"):
+            return self._term()
+        raise _Unsupported()
+
+    def _list_or_term(self):
+        if self._peek()[1] != "(":
+            return self._term()
+        self._next()
+        values = []
+        while self._peek()[1] != ")":
+            values.append(self._term())
+        self._next()
+        return values
+
+    def _blank_node(self, object_parser):
+        self._expect("[")
+        properties = self._properties(object_parser, "]")
+        self._expect("]")
+        return properties
+
+
+def parse_request_fast(turtle_string):
+    tokens = _tokenize(turtle_string)
+    if tokens is None:
+        return None
+    try:
+        return _TemplateParser(tokens).parse()
+    except _Unsupported:
+        return None
@@ -0,0 +1,134 @@
+import hashlib
+import os
+import pickle
+import struct
+import zlib
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from engine.policy_store import CompiledPermission, PolicyKey
+from engine.query_templates import QueryTemplate, compile_template
+
+# Policy bundle: policies/*.ttl compiled into PolicyStore records and
+# data/*.txt compiled into query templates, written to one binary file so the
+# engine starts without parsing any turtle (python compile_policies.py).
+#
+#   magic "ODRLBNDL" | format version (uint16) | sha256 of the sources (32 bytes)
+#   | zlib-compressed pickle of {"policies": {file: records},
+#                                 "templates": {file: QueryTemplate}}
+#
+# The hash covers the names and contents of every source file. A bundle whose
+# hash or version does not match the files on disk is stale and not loaded;
+# the engine then compiles the .ttl files as before. The bundle is a local
+# build artifact and is unpickled as such: never load one from elsewhere.
+
+# Source directories and bundle path, shared by the engine and
+# compile_policies.py so both fingerprint the same trees. ODRL_POLICY_DIR /
+# ODRL_QUERY_DIR point them at other policies and queries (e.g. the synthetic
+# corpora of benchmarks/odrl_engine_suite.py).
+ODRL_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+POLICY_DIR = os.environ.get("ODRL_POLICY_DIR", os.path.join(ODRL_DIR, "policies"))
+QUERY_DIR = os.environ.get("ODRL_QUERY_DIR", os.path.join(ODRL_DIR, "data"))
+BUNDLE_PATH = os.environ.get("ODRL_POLICY_BUNDLE", os.path.join(ODRL_DIR, "policies.bundle"))
+
+MAGIC = b"ODRLBNDL"
+BUNDLE_VERSION = 1
+_HEADER = struct.Struct(">8sH32s")
+
+
+@dataclass(frozen=True)
+class PolicyBundle:
+    content_hash: str
+    # {file name: (mtime seen when the bundle was validated, compiled content)}
+    policies: Dict[str, Tuple[int, Dict[PolicyKey, CompiledPermission]]]
+    templates: Dict[str, Tuple[int, QueryTemplate]]
+
+
+def _source_files(policy_dir: str, query_dir: str) -> List[Tuple[str, str, str]]:
+    # (kind, file name, path) of every file the engine compiles, in a fixed order
+    sources = []
+    for kind, directory, suffix in (("policies", policy_dir, ".ttl"), ("data", query_dir, ".txt")):
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name.endswith(suffix) and entry.is_file():
+                    sources.append((kind, entry.name, entry.path))
+    return sorted(sources)
+
+
+def source_state(policy_dir: str, query_dir: str) -> Tuple[bytes, Dict[Tuple[str, str], int]]:
+    # sha256 of the sources and the mtime of each file it was computed from
+    digest = hashlib.sha256()
+    mtimes = {}
+    for kind, name, path in _source_files(policy_dir, query_dir):
+        mtimes[(kind, name)] = os.stat(path).st_mtime_ns
+        with open(path, "rb") as f:
+            content = f.read()
+        digest.update(f"{kind}/{name}\0{len(content)}\0".encode("utf-8"))
+        digest.update(content)
+    return digest.digest(), mtimes
+
+
+def compile_bundle(policy_dir: str, query_dir: str, bundle_path: str) -> str:
+    # Writes the bundle and returns its content hash (hex)
+    from engine.policy_compiler import compile_policy_file
+
+    content_hash, _ = source_state(policy_dir, query_dir)
+    policies = {}
+    templates = {}
+    for kind, name, path in _source_files(policy_dir, query_dir):
+        if kind == "policies":
+            policies[name] = compile_policy_file(path)
+        else:
+            with open(path, "r", encoding="utf-8") as f:
+                templates[name] = compile_template(name, f.read())
+
+    payload = zlib.compress(pickle.dumps({"policies": policies, "templates": templates},
+                                         protocol=pickle.HIGHEST_PROTOCOL))
+    # write then rename, so a running engine never sees half a bundle
+    tmp_path = bundle_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, BUNDLE_VERSION, content_hash))
+        f.write(payload)
+    os.replace(tmp_path, bundle_path)
+    return content_hash.hex()
+
+
+def read_header(bundle_path: str) -> Optional[Tuple[int, str]]:
+    # (format version, content hash) of a bundle file, None if it is not one
+    try:
+        with open(bundle_path, "rb") as f:
+            header = f.read(_HEADER.size)
+    except FileNotFoundError:
+        return None
+    if len(header) != _HEADER.size:
+        return None
+    magic, version, content_hash = _HEADER.unpack(header)
+    if magic != MAGIC:
+        return None
+    return version, content_hash.hex()
+
+
+def load_bundle(bundle_path: str, policy_dir: str, query_dir: str) -> Optional[PolicyBundle]:
+    # Returns the bundle when it is current for the sources, None when it is
+    # missing, stale, from another format version or unreadable
+    header = read_header(bundle_path)
+    if header is None or header[0] != BUNDLE_VERSION:
+        return None
+
+    content_hash, mtimes = source_state(policy_dir, query_dir)
+    if header[1] != content_hash.hex():
+        return None
+
+    try:
+        with open(bundle_path, "rb") as f:
+            f.seek(_HEADER.size)
+            payload = pickle.loads(zlib.decompress(f.read()))
+    except (OSError, zlib.error, pickle.UnpicklingError, EOFError):
+        return None
+
+    return PolicyBundle(
+        content_hash=header[1],
+        policies={name: (mtimes[("policies", name)], records)
+                  for name, records in payload["policies"].items()},
+        templates={name: (mtimes[("data", name)], template)
+                   for name, template in payload["templates"].items()}
+    )
@@ -0,0 +1,88 @@
+import os
+from typing import Dict, List, Tuple
+from rdflib import Graph, Namespace, RDF
+from rdflib.collection import Collection
+from engine.constraints import compile_constraint
+from engine.policy_store import CompiledPermission, CompiledProhibition, PolicyKey, Predicate
+
+# Turns a policy .ttl file into the records the PolicyStore indexes. This is
+# the only part of the engine that needs rdflib for policies; the store
+# imports it on first use, so a store seeded from a policy bundle never does.
+
+ODRL = Namespace("http://www.w3.org/ns/odrl/2/")
+
+def get_local_name(uri):
+    return uri.split("/")[-1]
+
+
+def _operand_values(g, right) -> List[str]:
+    # rdf list -> its members, single term -> [term], missing -> []
+    if right is None:
+        return []
+    if right == RDF.nil or g.value(right, RDF.first) is not None:
+        return [str(v) for v in Collection(g, right)]
+    return [str(right)]
+
+
+def _compile_constraint(g, c) -> Tuple[str, Predicate]:
+    left = g.value(c, ODRL.leftOperand)
+    predicate = compile_constraint(
+        g.value(c, ODRL.operator),
+        _operand_values(g, g.value(c, ODRL.rightOperand))
+    )
+    return get_local_name(str(left)), predicate
+
+
+def compile_policy_file(policy_path: str) -> Dict[PolicyKey, CompiledPermission]:
+    # Parses a policy .ttl once and returns the deciding permission per
+    # (assignee, action, target). Like is_access_allowed, only the first
+    # permission matching a key is considered for a file.
+    g = Graph()
+    g.parse(policy_path, format="turtle")
+    filename = os.path.basename(policy_path)
+
+    compiled = {}
+    for policy in g.subjects(RDF.type, ODRL.Offer):
+        prohibitions = []
+        prohibition_keys = set()
+        for prohibition in g.objects(policy, ODRL.prohibition):
+            constraints = []
+            for c in g.objects(prohibition, ODRL.constraint):
+                if g.value(c, ODRL.leftOperand):
+                    prohibition_keys.add(get_local_name(str(g.value(c, ODRL.leftOperand))))
+                constraints.append(_compile_constraint(g, c))
+            prohibitions.append(CompiledProhibition(
+                action=str(g.value(prohibition, ODRL.action)),
+                constraints=tuple(constraints)
+            ))
+
+        for perm in g.objects(policy, ODRL.permission):
+            targets = [str(t) for t in g.objects(perm, ODRL.target)]
+
+            data_file = None
+            for t_str in targets:
+                if "/sparql/" in t_str:
+                    data_file = t_str.split("/sparql/")[-1] + ".txt"
+
+            allowed_keys = set(prohibition_keys)
+            perm_constraints = []
+            for c in g.objects(perm, ODRL.constraint):
+                left = g.value(c, ODRL.leftOperand)
+                if left:
+                    allowed_keys.add(get_local_name(str(left)))
+                    perm_constraints.append(_compile_constraint(g, c))
+
+            record = CompiledPermission(
+                policy_file=filename,
+                data_file=data_file,
+                allowed_keys=frozenset(allowed_keys),
+                has_prohibitions=bool(prohibitions),
+                prohibitions=tuple(prohibitions),
+                constraints=tuple(perm_constraints)
+            )
+            assignee = str(g.value(perm, ODRL.assignee))
+            action = str(g.value(perm, ODRL.action))
+            for t_str in targets:
+                compiled.setdefault((assignee, action, t_str), record)
+
+    return compiled
@@ -0,0 +1,174 @@
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Optional, Tuple, Union
+from engine.constraints import MembershipPredicate, RangePredicate
+
+Predicate = Union[MembershipPredicate, RangePredicate]
+
+
+# A prohibition reduced to its action and (constraint key, predicate) pairs
+@dataclass(frozen=True)
+class CompiledProhibition:
+    action: str
+    constraints: Tuple[Tuple[str, Predicate], ...]
+
+
+# One odrl:permission of an odrl:Offer with everything is_access_allowed needs
+# precomputed: the query file, the allowed constraint keys, the permission's
+# own constraints and the prohibitions of the enclosing policy.
+@dataclass(frozen=True)
+class CompiledPermission:
+    policy_file: str
+    data_file: Optional[str]
+    allowed_keys: FrozenSet[str]
+    has_prohibitions: bool
+    prohibitions: Tuple[CompiledProhibition, ...]
+    constraints: Tuple[Tuple[str, Predicate], ...] = ()
+
+
+PolicyKey = Tuple[str, str, str]  # (assignee, action, target)
+
+
+def permission_denial(record: CompiledPermission, action: str, constraints: dict) -> Optional[str]:
+    # Why the permission does not grant the request, None when it does. Same
+    # decision as is_access_allowed once a permission has matched, with
+    # constraint operators applied through the compiled predicates
+    if not record.data_file:
+        return "permission has no query target"
+
+    # Request and policy must use exactly the same constraint keys
+    if set(constraints.keys()) != record.allowed_keys:
+        return "constraint keys differ from the policy"
+    if not constraints and record.has_prohibitions:
+        return "policy has prohibitions and the request has no constraints"
+
+    # Permission constraints: every request value must satisfy them, an empty
+    # right operand "()" accepts any value
+    for key, predicate in record.constraints:
+        if predicate.is_wildcard:
+            continue
+        req_vals = constraints.get(key)
+        if not req_vals or not predicate.matches_all(req_vals):
+            return f"constraint {key} not satisfied"
+
+    # Deny if any request value matches a prohibition constraint
+    for prohibition in record.prohibitions:
+        if prohibition.action != action:
+            continue
+        for key, predicate in prohibition.constraints:
+            req_vals = constraints.get(key)
+            if not req_vals:
+                continue
+            if predicate.matches_any(req_vals):
+                return f"prohibited value for {key}"
+
+    return None
+
+
+# Outcome of a decision: the granted query file and the policy it came from,
+# or the reason the first applicable permission gave for denying
+@dataclass(frozen=True)
+class Decision:
+    data_file: Optional[str]
+    policy_file: Optional[str]
+    deny_reason: Optional[str]
+
+
+NO_PERMISSION = "no permission for this assignee, action and target"
+
+
+def decide_permissions(candidates: List[CompiledPermission], action: str, constraints: dict) -> Decision:
+    denied = None
+    for record in candidates:
+        reason = permission_denial(record, action, constraints)
+        if reason is None:
+            return Decision(record.data_file, record.policy_file, None)
+        if denied is None:
+            denied = Decision(None, record.policy_file, reason)
+    return denied or Decision(None, None, NO_PERMISSION)
+
+
+class PolicyStore:
+    # Keeps every policy in a directory compiled in memory, indexed by
+    # (assignee, action, target). refresh() recompiles only the files whose
+    # mtime changed; lookups never touch the disk.
+
+    def __init__(self, policy_dir: str, refresh_interval: float = 0.0):
+        self.policy_dir = policy_dir
+        self.refresh_interval = refresh_interval
+        self._files: Dict[str, Tuple[int, Dict[PolicyKey, CompiledPermission]]] = {}
+        self._index: Dict[PolicyKey, List[CompiledPermission]] = {}
+        self._last_refresh = 0.0
+        self._lock = threading.Lock()
+
+    def refresh(self, force: bool = False) -> bool:
+        # Returns True when the index changed
+        now = time.monotonic()
+        if not force and self._last_refresh and now - self._last_refresh < self.refresh_interval:
+            return False
+
+        with self._lock:
+            seen = {}
+            with os.scandir(self.policy_dir) as entries:
+                for entry in entries:
+                    if entry.name.endswith(".ttl") and entry.is_file():
+                        seen[entry.name] = entry.stat().st_mtime_ns
+
+            changed = False
+            for filename in list(self._files):
+                if filename not in seen:
+                    del self._files[filename]
+                    changed = True
+            for filename, mtime in seen.items():
+                cached = self._files.get(filename)
+                if cached and cached[0] == mtime:
+                    continue
+                # imports rdflib, so only once a file actually needs compiling
+                from engine.policy_compiler import compile_policy_file
+                policy_path = os.path.join(self.policy_dir, filename)
+                self._files[filename] = (mtime, compile_policy_file(policy_path))
+                changed = True
+
+            if changed or not self._last_refresh:
+                self._rebuild_index()
+            self._last_refresh = now
+            return changed
+
+    def seed(self, files: Dict[str, Tuple[int, Dict[PolicyKey, CompiledPermission]]]):
+        # Installs already compiled files ({filename: (mtime, records)}, e.g.
+        # from a policy bundle). Later refreshes recompile only the files whose
+        # mtime differs from the seeded one.
+        with self._lock:
+            self._files = dict(files)
+            self._rebuild_index()
+            self._last_refresh = time.monotonic()
+
+    def _rebuild_index(self):
+        index = {}
+        for filename in sorted(self._files):
+            for key, record in self._files[filename][1].items():
+                index.setdefault(key, []).append(record)
+        # swap in one assignment so concurrent lookups see either index whole
+        self._index = index
+
+    def lookup(self, assignee_uri: str, action: str, target_uri: str) -> List[CompiledPermission]:
+        return self._index.get((assignee_uri, action, target_uri), [])
+
+    def candidates(self, assignee_uri: str, action: str, target_uri: str) -> List[CompiledPermission]:
+        # Permissions that apply to the request, in decision order. Only
+        # policies named after the target apply, as in process_odrl_request
+        target_name = target_uri.split("/")[-1] if "/" in target_uri else target_uri
+        return [record for record in self.lookup(assignee_uri, action, target_uri)
+                if record.policy_file.startswith(target_name)]
+
+    def explain(self, assignee_uri: str, action: str, target_uri: str, constraints: dict) -> Decision:
+        return decide_permissions(self.candidates(assignee_uri, action, target_uri), action, constraints)
+
+    def decide(self, assignee_uri: str, action: str, target_uri: str, constraints: dict) -> Optional[str]:
+        # Returns the query file granted to the request, or None when denied
+        return self.explain(assignee_uri, action, target_uri, constraints).data_file
+
+    def __len__(self):
+        return len(self._files)
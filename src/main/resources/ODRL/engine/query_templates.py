@@ -0,0 +1,137 @@
+import hashlib
+import os
+import re
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+# Parameterised SPARQL query templates (the data/*.txt files).
+#
+# A template declares its parameters in header comments:
+#
+#   #@param drug_id
+#
+# and contains one "VALUES ?drug_id { ... }" block per parameter. The values
+# written in the file are the defaults; bind() swaps in the values a train
+# sends with its request. Templates are split around their VALUES blocks once
+# at load time, so binding is a string join.
+
+_PARAM_DECLARATION = re.compile(r"^\s*#\s*@param\s+\??(\w+)\s*$", re.MULTILINE)
+
+
+def _values_block(name: str):
+    return re.compile(r"VALUES\s+\?" + re.escape(name) + r"\s*\{[^}]*\}")
+
+
+def _sparql_literal(value: str) -> str:
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"')
+               .replace("\n", "\\n").replace("\r", "\\r").replace("\t", "\\t"))
+    return f'"{escaped}"'
+
+
+def fingerprint(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class PreparedQuery:
+    template: str  # query file name
+    text: str
+    fingerprint: str  # sha256 of text: key for caching the parsed query client side
+    template_fingerprint: str
+    bindings: Dict[str, List[str]]
+
+
+@dataclass(frozen=True)
+class QueryTemplate:
+    name: str
+    text: str
+    fingerprint: str
+    parameters: Tuple[str, ...]
+    # literal text interleaved with parameter names: (text, param, text, ...)
+    segments: Tuple[str, ...]
+    # the VALUES blocks as written in the file, one per parameter slot
+    defaults: Tuple[str, ...]
+
+    def bind(self, bindings: Optional[Dict[str, List[str]]] = None) -> PreparedQuery:
+        bindings = bindings or {}
+        unknown = set(bindings) - set(self.parameters)
+        if unknown:
+            raise ValueError(f"Query {self.name} has no parameter(s): {', '.join(sorted(unknown))}")
+        if not bindings:
+            return PreparedQuery(self.name, self.text, self.fingerprint, self.fingerprint, {})
+
+        parts = []
+        for i, segment in enumerate(self.segments):
+            if i % 2 == 0:
+                parts.append(segment)
+                continue
+            if segment in bindings:
+                values = " ".join(_sparql_literal(v) for v in bindings[segment])
+                parts.append(f"VALUES ?{segment} {{{values}}}")
+            else:
+                parts.append(self.defaults[i // 2])
+        text = "".join(parts)
+        return PreparedQuery(self.name, text, fingerprint(text), self.fingerprint, dict(bindings))
+
+
+def compile_template(name: str, text: str) -> QueryTemplate:
+    parameters = tuple(dict.fromkeys(_PARAM_DECLARATION.findall(text)))
+
+    spans = []
+    for param in parameters:
+        matches = list(_values_block(param).finditer(text))
+        if len(matches) != 1:
+            raise ValueError(f"Query {name}: parameter ?{param} needs exactly one VALUES block, found {len(matches)}")
+        spans.append((matches[0].start(), matches[0].end(), param))
+    spans.sort()
+
+    segments = []
+    defaults = []
+    pos = 0
+    for start, end, param in spans:
+        segments.append(text[pos:start])
+        segments.append(param)
+        defaults.append(text[start:end])
+        pos = end
+    segments.append(text[pos:])
+
+    return QueryTemplate(
+        name=name,
+        text=text,
+        fingerprint=fingerprint(text),
+        parameters=parameters,
+        segments=tuple(segments),
+        defaults=tuple(defaults)
+    )
+
+
+class QueryTemplateStore:
+    # Loads each query file once and reloads it only when its mtime changes
+
+    def __init__(self, query_dir: str):
+        self.query_dir = query_dir
+        self._templates: Dict[str, Tuple[int, QueryTemplate]] = {}
+        self._lock = threading.Lock()
+
+    def seed(self, templates: Dict[str, Tuple[int, QueryTemplate]]):
+        # Installs already compiled templates ({file name: (mtime, template)})
+        with self._lock:
+            self._templates.update(templates)
+
+    def get(self, data_file: str) -> Optional[QueryTemplate]:
+        query_path = os.path.join(self.query_dir, data_file)
+        try:
+            mtime = os.stat(query_path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+        cached = self._templates.get(data_file)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        with self._lock:
+            with open(query_path, "r", encoding="utf-8") as f:
+                template = compile_template(data_file, f.read())
+            self._templates[data_file] = (mtime, template)
+            return template
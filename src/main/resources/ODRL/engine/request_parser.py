@@ -1,40 +1,86 @@
-from rdflib import Graph, Namespace, RDF
-from rdflib.collection import Collection
+from engine.fast_request_parser import parse_request_fast
 
-ODRL = Namespace("http://www.w3.org/ns/odrl/2/")
-EX = Namespace("http://example.org/")
+# rdflib is imported on first use: requests in the standard template go
+# through the fast path, so an engine started from a policy bundle never
+# loads it
+ODRL_NS = "http://www.w3.org/ns/odrl/2/"
+EX_NS = "http://example.org/"
 
 def get_local_name(uri):
     return uri.split("/")[-1]
 
-def parse_request(turtle_string):
+def _graph(turtle_string):
+    from rdflib import Graph
     g = Graph()
     g.parse(data=turtle_string, format="turtle")
+    return g
+
+def _request_data(g, req):
+    from rdflib import Namespace
+    from rdflib.collection import Collection
+    ODRL = Namespace(ODRL_NS)
+    EX = Namespace(EX_NS)
+
+    permission = g.value(req, ODRL.permission)
+    if not permission:
+        return None
 
-    for req in g.subjects(RDF.type, ODRL.Request):
-        permission = g.value(req, ODRL.permission)
-        if not permission:
-            continue
+    assignee = g.value(permission, ODRL.assignee)
+    action = g.value(permission, ODRL.action)
+    target = g.value(permission, ODRL.target)
 
-        assignee = g.value(permission, ODRL.assignee)
-        action = g.value(permission, ODRL.action)
-        target = g.value(permission, ODRL.target)
+    data = {
+        "assignee": str(assignee),
+        "action": str(action),
+        "target": str(target),
+        "constraints": {}
+    }
 
-        data = {
-            "assignee": str(assignee),
-            "action": str(action),
-            "target": str(target),
-            "constraints": {}
-        }
+    for constraint in g.objects(permission, ODRL.constraint):
+        left = g.value(constraint, ODRL.leftOperand)
+        right = g.value(constraint, ODRL.rightOperand)
 
-        for constraint in g.objects(permission, ODRL.constraint):
-            left = g.value(constraint, ODRL.leftOperand)
-            right = g.value(constraint, ODRL.rightOperand)
+        key = get_local_name(str(left))
+        values = [str(v) for v in Collection(g, right)]
+        data["constraints"][key] = values
 
-            key = get_local_name(str(left))
-            values = [str(v) for v in Collection(g, right)]
-            data["constraints"][key] = values
+    # Optional values for the query template's parameters, e.g.
+    #   ex:binding [ ex:parameter "drug_id" ; ex:values ("CID100107969") ]
+    data["bindings"] = {}
+    for binding in g.objects(req, EX.binding):
+        name = g.value(binding, EX.parameter)
+        values = g.value(binding, EX.values)
+        data["bindings"][str(name)] = [str(v) for v in Collection(g, values)]
 
+    return data
+
+def parse_request(turtle_string):
+    # Standard single-request template is handled without rdflib
+    data = parse_request_fast(turtle_string)
+    if data is not None:
         return data
+    return parse_request_rdflib(turtle_string)
+
+def parse_request_rdflib(turtle_string):
+    from rdflib import RDF, URIRef
+    g = _graph(turtle_string)
+
+    for req in g.subjects(RDF.type, URIRef(ODRL_NS + "Request")):
+        data = _request_data(g, req)
+        if data:
+            return data
 
     return None
+
+def parse_requests(turtle_string):
+    # Every odrl:Request in one document, keyed by request IRI
+    from rdflib import RDF, URIRef
+    g = _graph(turtle_string)
+
+    requests = {}
+    for req in g.subjects(RDF.type, URIRef(ODRL_NS + "Request")):
+        data = _request_data(g, req)
+        if data:
+            requests[str(req)] = data
+
+    return requests
@@ -1,10 +1,17 @@
+import json
 import sys
-from odrl_executor import process_odrl_request
+from odrl_executor import DENIED_MESSAGE, batch_response, process_odrl_batch, process_odrl_request, read_batch_payload
 
 odrl_request = sys.stdin.read()
 
+# --batch: evaluate every request in the payload and print the decisions as JSON
+if "--batch" in sys.argv[1:]:
+    results = process_odrl_batch(read_batch_payload(odrl_request))
+    print(json.dumps(batch_response(results), ensure_ascii=False))
+    sys.exit(0)
+
 query_str = process_odrl_request(odrl_request)
 if query_str:
     print(query_str)
 else:
-    print("⚠️ Failed to generate query due to policy restrictions.")
+    print(DENIED_MESSAGE)
\ No newline at end of file
@@ -1,51 +1,262 @@
+import hashlib
+import json
 import os
-from typing import Optional
-from rdflib import Graph
-from engine.policy_engine import is_access_allowed
-from engine.request_parser import parse_request
+import threading
+import time
+from typing import Dict, List, Optional, Union
+from engine.decision_audit import AuditLog, DecisionTrace, LatencyHistograms
+from engine.decision_cache import MISSING, DecisionCache
+from engine.policy_bundle import BUNDLE_PATH, POLICY_DIR, QUERY_DIR, load_bundle
+from engine.policy_store import Decision, PolicyStore, decide_permissions
+from engine.query_templates import PreparedQuery, QueryTemplateStore
+from engine.request_parser import parse_request, parse_requests
 
+# Printed / returned to the coordinator when no policy grants the request
+DENIED_MESSAGE = "⚠️ Failed to generate query due to policy restrictions."
 
-def process_odrl_request(request_ttl_path: str) -> Optional[str]:
+# Policies are compiled once per process and kept in memory. policies/ and
+# data/ are checked for changes at most once per ODRL_POLICY_REFRESH_INTERVAL
+# seconds (default 1; 0 checks on every request).
+REFRESH_INTERVAL = float(os.environ.get("ODRL_POLICY_REFRESH_INTERVAL", "1"))
+_policy_store = PolicyStore(POLICY_DIR)
+
+# Decisions per canonical request, cleared whenever policies/ or data/ change
+_decision_cache = DecisionCache(
+    max_size=int(os.environ.get("ODRL_DECISION_CACHE_SIZE", "1024")),
+    ttl=float(os.environ.get("ODRL_DECISION_CACHE_TTL", "300"))
+)
+_data_state = None
+_refresh_lock = threading.Lock()
+_next_refresh = 0.0  # time.monotonic() of the next check
+
+# data/*.txt query templates, loaded once and reloaded when their mtime changes
+_query_templates = QueryTemplateStore(QUERY_DIR)
+
+# Compiled policies and queries from `python compile_policies.py`. Used only
+# when it matches the current policies/ and data/; otherwise the .ttl files
+# are compiled at start-up.
+_bundle = load_bundle(BUNDLE_PATH, POLICY_DIR, QUERY_DIR)
+if _bundle is not None:
+    _policy_store.seed(_bundle.policies)
+    _query_templates.seed(_bundle.templates)
+
+# Per-phase latency of every decision, and an optional JSON lines audit log
+# of decisions (ODRL_AUDIT_LOG=path, written by a background thread)
+_latency = LatencyHistograms()
+_audit_log = None
+if os.environ.get("ODRL_AUDIT_LOG"):
+    _audit_log = AuditLog(
+        os.environ["ODRL_AUDIT_LOG"],
+        flush_interval=float(os.environ.get("ODRL_AUDIT_FLUSH_INTERVAL", "1"))
+    )
+
+# Deny reasons found outside the policy store
+UNPARSABLE_REQUEST = "request could not be parsed"
+MISSING_QUERY = "query file not found"
+
+
+def request_key(request_data: dict) -> tuple:
+    # Canonical, hashable form of a parsed request: constraint order and
+    # value order do not change the decision
+    constraints = tuple(sorted(
+        (key, tuple(sorted(values))) for key, values in request_data["constraints"].items()
+    ))
+    return (request_data["assignee"], request_data["action"], request_data["target"], constraints)
+
+
+def _directory_state(path: str) -> tuple:
+    with os.scandir(path) as entries:
+        return tuple(sorted(
+            (entry.name, entry.stat().st_mtime_ns, entry.stat().st_size) for entry in entries
+        ))
+
+
+def _refresh():
+    # Recompiles changed policy files and drops every cached decision once
+    # anything under policies/ or data/ changed. Between checks requests return
+    # at once, without the lock or the disk. The clear comes after the policy
+    # index is swapped, so a decision taken from the old index is either
+    # cleared or dropped by its stale generation in _decide.
+    global _data_state, _next_refresh
+    if time.monotonic() < _next_refresh:
+        return
+    with _refresh_lock:
+        if time.monotonic() < _next_refresh:
+            return
+        policies_changed = _policy_store.refresh()
+        data_state = _directory_state(QUERY_DIR)
+        if policies_changed or data_state != _data_state:
+            _decision_cache.clear()
+            _data_state = data_state
+        _next_refresh = time.monotonic() + REFRESH_INTERVAL
+
+
+def request_fingerprint(request_data: dict) -> str:
+    # sha256 of the canonical request, the same for every equivalent request
+    return hashlib.sha256(repr(request_key(request_data)).encode("utf-8")).hexdigest()
+
+
+def _decide(request_data: dict, trace: DecisionTrace) -> Decision:
+    key = request_key(request_data)
+    generation = _decision_cache.generation
+    decision = _decision_cache.get(key)
+    if decision is not MISSING:
+        trace.cache_hit = True
+        trace.mark("decision_cache")
+        return decision
+
+    candidates = _policy_store.candidates(
+        assignee_uri=request_data["assignee"],
+        action=request_data["action"],
+        target_uri=request_data["target"]
+    )
+    trace.mark("policy_lookup")
+    decision = decide_permissions(candidates, request_data["action"], request_data["constraints"])
+    trace.mark("constraint_evaluation")
+    _decision_cache.put(key, decision, generation)
+    return decision
+
+
+def _trace_decision(trace: DecisionTrace, request_data: Optional[dict], decision: Optional[Decision],
+                    prepared: Optional[PreparedQuery]):
+    for phase, seconds in trace.timings.items():
+        _latency.record(phase, seconds)
+    _latency.record("total", trace.total)
+    if _audit_log is None:
+        return
+
+    if request_data is None:
+        deny_reason = UNPARSABLE_REQUEST
+    elif prepared is None:
+        deny_reason = decision.deny_reason or MISSING_QUERY
+    else:
+        deny_reason = None
+    _audit_log.record({
+        "time": time.time(),
+        "request": request_fingerprint(request_data) if request_data else None,
+        "assignee": request_data["assignee"] if request_data else None,
+        "action": request_data["action"] if request_data else None,
+        "target": request_data["target"] if request_data else None,
+        "allowed": prepared is not None,
+        "policy_file": decision.policy_file if decision else None,
+        "query_file": decision.data_file if decision else None,
+        "query_fingerprint": prepared.fingerprint if prepared else None,
+        "deny_reason": deny_reason,
+        "cache_hit": trace.cache_hit,
+        "timings_us": {phase: round(seconds * 1e6, 1) for phase, seconds in trace.timings.items()},
+        "total_us": round(trace.total * 1e6, 1)
+    })
+
+
+def cache_stats() -> dict:
+    return _decision_cache.stats()
+
+
+def latency_histograms() -> dict:
+    # {phase: histogram} for parse, refresh, policy_lookup (or decision_cache
+    # on a hit), constraint_evaluation, query_load and total
+    return _latency.to_dict()
+
+
+def audit_log_stats() -> Optional[dict]:
+    return _audit_log.stats() if _audit_log else None
+
+
+def bundle_info() -> dict:
+    return {
+        "path": BUNDLE_PATH,
+        "loaded": _bundle is not None,
+        "content_hash": _bundle.content_hash if _bundle else None
+    }
+
+
+def _prepare_query(data_file: str, bindings: dict) -> Optional[PreparedQuery]:
+    template = _query_templates.get(data_file)
+    if template is None:
+        return None
+    return template.bind(bindings)
+
+
+def prepare_odrl_request(request_ttl_path: str) -> Optional[PreparedQuery]:
+    # Decision plus the granted query with the request's bindings applied.
+    # Raises ValueError when a binding names a parameter the query lacks.
+    trace = DecisionTrace()
     request_data = parse_request(request_ttl_path)
-    BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+    trace.mark("parse")
     if not request_data:
+        _trace_decision(trace, None, None, None)
         return None
 
-    assignee_uri = request_data["assignee"]
-    action = request_data["action"]
-    target = request_data["target"]
-    constraints = request_data["constraints"]
-
-    # Check all available policies
-    policy_dir = os.path.join(BASE_DIR, "policies")
-    result = None
-    target_name = target.split("/")[-1] if "/" in target else target
-    for filename in os.listdir(policy_dir):
-        if not filename.endswith(".ttl"):
-            continue
-        if not filename.startswith(target_name):
-            continue  # Skip policies not related to the current request
-        policy_path = os.path.join(policy_dir, filename)
-        result = is_access_allowed(
-            policy_file=policy_path,
-            assignee_uri=assignee_uri,
-            action=action,
-            target_uri=target,
-            constraints=constraints
-        )
-
-        if result:
-            break
-
-    if not result:
-        return None
+    # Check the compiled policies (recompiles only policy files that changed)
+    _refresh()
+    trace.mark("refresh")
+    decision = _decide(request_data, trace)
 
-    data_file = result
-    query_dir = os.path.join(BASE_DIR, "data")
-    query_path = os.path.join(query_dir, data_file)
+    prepared = None
+    if decision.data_file:
+        prepared = _prepare_query(decision.data_file, request_data.get("bindings"))
+        trace.mark("query_load")
 
-    if not os.path.exists(query_path):
-        return None
+    _trace_decision(trace, request_data, decision, prepared)
+    return prepared
+
+
+def process_odrl_request(request_ttl_path: str) -> Optional[str]:
+    prepared = prepare_odrl_request(request_ttl_path)
+    return prepared.text if prepared else None
+
+
+def read_batch_payload(body: str) -> Union[str, List[str]]:
+    # A batch body is either a JSON list of turtle documents or one turtle
+    # document (turtle is never valid JSON)
+    try:
+        documents = json.loads(body)
+    except ValueError:
+        return body
+    if not isinstance(documents, list) or not all(isinstance(d, str) for d in documents):
+        raise ValueError("Batch body must be a turtle document or a JSON list of turtle documents")
+    return documents
+
+
+def batch_response(results: Dict[str, Optional[PreparedQuery]]) -> dict:
+    return {
+        iri: {
+            "allowed": prepared is not None,
+            "query": prepared.text if prepared else None,
+            "fingerprint": prepared.fingerprint if prepared else None,
+            "template_fingerprint": prepared.template_fingerprint if prepared else None
+        }
+        for iri, prepared in results.items()
+    }
+
+
+def process_odrl_batch(odrl_requests: Union[str, List[str]]) -> Dict[str, Optional[PreparedQuery]]:
+    # Evaluates many requests in one call. Accepts a single turtle document
+    # holding several odrl:Request resources, or a list of turtle documents.
+    # Returns the prepared query (None when denied) keyed by request IRI.
+    if isinstance(odrl_requests, str):
+        parsed = parse_requests(odrl_requests)
+    else:
+        parsed = {}
+        for document in odrl_requests:
+            for iri, request_data in parse_requests(document).items():
+                if iri in parsed:
+                    raise ValueError(f"Duplicate request IRI in batch: {iri}")
+                parsed[iri] = request_data
+
+    _refresh()
+
+    # Identical requests share one cached decision; templates are loaded once.
+    # Parsing and refreshing are shared by the batch and not traced per request.
+    results = {}
+    for iri, request_data in parsed.items():
+        trace = DecisionTrace()
+        decision = _decide(request_data, trace)
+        prepared = None
+        if decision.data_file:
+            prepared = _prepare_query(decision.data_file, request_data.get("bindings"))
+            trace.mark("query_load")
+        _trace_decision(trace, request_data, decision, prepared)
+        results[iri] = prepared
 
-    with open(query_path, "r", encoding="utf-8") as f:
-        return f.read()
+    return results
@@ -0,0 +1,116 @@
+import argparse
+import json
+import os
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from odrl_executor import (DENIED_MESSAGE, audit_log_stats, batch_response, bundle_info, cache_stats, latency_histograms,
+                           prepare_odrl_request, process_odrl_batch, read_batch_payload)
+
+# Resident ODRL decision service. The coordinator starts this once and keeps it
+# warm, so rdflib is imported a single time instead of once per request.
+#
+#   POST /decide        body: ODRL request (turtle)  -> SPARQL query or DENIED_MESSAGE
+#                       (X-Query-Fingerprint / X-Query-Template-Fingerprint
+#                       headers identify the granted query)
+#   POST /decide-batch  body: turtle document with several odrl:Request
+#                       resources, or a JSON list of turtle documents
+#                       -> JSON {request IRI: {"allowed": bool, "query": str|null}}
+#   GET  /health                                     -> "ok"
+#   GET  /stats                                      -> decision cache counters,
+#                                                       policy bundle and audit log
+#                                                       state (JSON)
+#   GET  /latency                                    -> per-phase decision latency
+#                                                       histograms (JSON)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = int(os.environ.get("ODRL_SERVER_PORT", "6061"))
+
+
+class ODRLRequestHandler(BaseHTTPRequestHandler):
+    # keep-alive so clients can reuse one connection for several decisions
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send(200, "ok")
+        elif self.path == "/stats":
+            self._send(200, json.dumps({
+                "decision_cache": cache_stats(),
+                "policy_bundle": bundle_info(),
+                "audit_log": audit_log_stats()
+            }), "application/json")
+        elif self.path == "/latency":
+            self._send(200, json.dumps(latency_histograms()), "application/json")
+        else:
+            self._send(404, "Not found")
+
+    def do_POST(self):
+        if self.path not in ("/decide", "/decide-batch"):
+            self._send(404, "Not found")
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length).decode("utf-8")
+
+        if self.path == "/decide-batch":
+            try:
+                results = process_odrl_batch(read_batch_payload(body))
+            except ValueError as e:
+                self._send(400, f"Invalid batch: {e}")
+                return
+            except Exception as e:
+                self._send(500, f"ODRL engine error: {e}")
+                return
+            self._send(200, json.dumps(batch_response(results), ensure_ascii=False), "application/json")
+            return
+
+        try:
+            prepared = prepare_odrl_request(body)
+        except ValueError as e:
+            self._send(400, f"Invalid request: {e}")
+            return
+        except Exception as e:
+            self._send(500, f"ODRL engine error: {e}")
+            return
+
+        if not prepared:
+            self._send(200, DENIED_MESSAGE)
+            return
+        self._send(200, prepared.text, headers={
+            "X-Query-Fingerprint": prepared.fingerprint,
+            "X-Query-Template-Fingerprint": prepared.template_fingerprint
+        })
+
+    def _send(self, status: int, body: str, content_type: str = "text/plain", headers: dict = None):
+        payload = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        # one line per request on stderr, the coordinator forwards it to its log
+        sys.stderr.write("odrl-server: %s\n" % (format % args))
+
+
+def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+    server = ThreadingHTTPServer((host, port), ODRLRequestHandler)
+    server.daemon_threads = True
+    print(f"ODRL decision server listening on http://{host}:{port}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resident ODRL decision server")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+    serve(args.host, args.port)